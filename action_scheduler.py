@@ -0,0 +1,263 @@
+"""
+Rate-Limit Aware Moderation Action Scheduler
+Central queue for Discord REST actions (deletes, timeouts, kicks, bans, DMs,
+notices and log sends) so moderation stays responsive near the REST limits.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+import discord
+
+from metrics import Metrics, NULL_METRICS
+
+
+SAFETY = 0
+NOTICE = 1
+DM = 2
+
+# Priority of each action kind; unknown kinds are treated as notices.
+PRIORITIES = {
+    'ban': SAFETY,
+    'bulk_ban': SAFETY,
+    'unban': SAFETY,
+    'kick': SAFETY,
+    'timeout': SAFETY,
+    'untimeout': SAFETY,
+    'delete': SAFETY,
+    'bulk_delete': SAFETY,
+    'slowmode': SAFETY,
+    'notice': NOTICE,
+    'log': NOTICE,
+    'dm': DM,
+}
+
+# Kinds that are idempotent, so an identical request (same route, target and
+# parameters) submitted while the first is still pending is merged into it.
+DEDUPLICATED = {'ban', 'unban', 'kick', 'timeout', 'untimeout', 'delete', 'slowmode'}
+
+# Failures that are expected and not worth printing (e.g. users with DMs closed).
+EXPECTED_FAILURES = {'dm': (discord.Forbidden,)}
+
+
+class Action:
+    """A queued REST call."""
+
+    __slots__ = ('kind', 'factory', 'route', 'key', 'future')
+
+    def __init__(self, kind: str, factory: Callable[[], Awaitable], route: Hashable,
+                 key: Optional[Hashable], future: asyncio.Future):
+        self.kind = kind
+        self.factory = factory
+        self.route = route
+        self.key = key
+        self.future = future
+
+
+class RouteState:
+    """Concurrency bookkeeping for one route; actions held back wait in priority order."""
+
+    __slots__ = ('inflight', 'waiting')
+
+    def __init__(self):
+        self.inflight = 0
+        self.waiting = []  # Heap of (priority, seq, action)
+
+
+class ActionScheduler:
+    """
+    Priority scheduler for Discord REST actions.
+
+    Actions run highest priority first (safety actions, then notices, then
+    DMs) with at most `max_concurrency` in flight overall and at most
+    `route_concurrency` per route, e.g. per channel or per guild. Calls that
+    hit a 429 or a 5xx are retried with exponential backoff, honoring
+    `retry_after` when Discord provides it. Each attempt's latency and
+    outcome is recorded in `metrics`.
+    """
+
+    MAX_RETRIES = 5
+    BACKOFF_BASE = 0.5  # Seconds, doubled per attempt
+
+    def __init__(self, max_concurrency: int = 16, route_concurrency: int = 2, metrics: Optional[Metrics] = None):
+        self.max_concurrency = max_concurrency
+        self.route_concurrency = route_concurrency
+        self._heap = []
+        self._seq = itertools.count()
+        self._routes: Dict[Hashable, RouteState] = {}
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._inflight = 0
+        self._tasks = set()
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.deduplicated = 0
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+
+    def submit(self, kind: str, factory: Callable[[], Awaitable], target: Optional[int] = None,
+               route: Optional[Hashable] = None, priority: Optional[int] = None,
+               params: Hashable = None) -> asyncio.Future:
+        """
+        Queue an action and return a future for its result.
+
+        Args:
+            kind: Action kind, e.g. "ban", "delete", "dm" (sets the default priority)
+            factory: Zero-argument callable returning the coroutine to run;
+                called again for each retry
+            target: ID the action applies to, used to merge duplicate actions
+            route: Rate-limit route the action belongs to (defaults to the kind)
+            priority: Override the kind's priority
+            params: The call's other arguments (e.g. guild, timeout duration);
+                only actions with the same kind, route, target and params merge
+
+        The returned future may be awaited or ignored; failures of submitted
+        actions are printed, use `run` to handle them yourself instead.
+        """
+        return self._submit(kind, factory, target, route, priority, params, report=True)
+
+    async def run(self, kind: str, factory: Callable[[], Awaitable], target: Optional[int] = None,
+                  route: Optional[Hashable] = None, priority: Optional[int] = None, params: Hashable = None):
+        """Queue an action and wait for its result (exceptions are re-raised)."""
+        return await asyncio.shield(self._submit(kind, factory, target, route, priority, params, report=False))
+
+    def _submit(self, kind, factory, target, route, priority, params, report) -> asyncio.Future:
+        route = route if route is not None else kind
+        key = (kind, route, target, params) if target is not None and kind in DEDUPLICATED else None
+        if key is not None and key in self._pending:
+            self.deduplicated += 1
+            return self._pending[key]
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(partial(self._report, kind, report))
+        action = Action(kind, factory, route, key, future)
+        if key is not None:
+            self._pending[key] = future
+
+        priority = PRIORITIES.get(kind, NOTICE) if priority is None else priority
+        heapq.heappush(self._heap, (priority, next(self._seq), action))
+        self._pump()
+        return future
+
+    @property
+    def queue_depth(self) -> int:
+        """Actions waiting to start, including those held back by their route."""
+        return len(self._heap) + sum(len(state.waiting) for state in self._routes.values())
+
+    def stats(self) -> Dict:
+        """Get scheduler statistics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "inflight": self._inflight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "deduplicated": self.deduplicated
+        }
+
+    def _pump(self) -> None:
+        while self._heap and self._inflight < self.max_concurrency:
+            entry = heapq.heappop(self._heap)
+            action = entry[2]
+            state = self._routes.get(action.route)
+            if state is None:
+                state = self._routes[action.route] = RouteState()
+            if state.inflight >= self.route_concurrency:
+                heapq.heappush(state.waiting, entry)
+                continue
+            state.inflight += 1
+            self._inflight += 1
+            task = asyncio.get_running_loop().create_task(self._execute(action))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, action: Action) -> None:
+        try:
+            for attempt in range(self.MAX_RETRIES + 1):
+                try:
+                    result = await self._call(action)
+                except discord.RateLimited as e:
+                    if attempt == self.MAX_RETRIES:
+                        raise
+                    delay = e.retry_after
+                except discord.HTTPException as e:
+                    if (e.status != 429 and e.status < 500) or attempt == self.MAX_RETRIES:
+                        raise
+                    delay = self._retry_after(e, attempt)
+                else:
+                    if not action.future.done():
+                        action.future.set_result(result)
+                    return
+                self.retried += 1
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            action.future.cancel()
+            raise
+        except Exception as e:
+            if not action.future.done():
+                action.future.set_exception(e)
+        finally:
+            self._finish(action)
+
+    async def _call(self, action: Action):
+        if not self.metrics.enabled:
+            return await action.factory()
+        started = time.perf_counter()
+        result = 'error'
+        try:
+            value = await action.factory()
+            result = 'ok'
+            return value
+        except discord.RateLimited:
+            result = '429'
+            raise
+        except discord.HTTPException as e:
+            result = str(e.status)
+            raise
+        finally:
+            self.metrics.observe('discord_request_seconds', time.perf_counter() - started, kind=action.kind)
+            self.metrics.inc('discord_requests_total', kind=action.kind, result=result)
+
+    def _retry_after(self, error: discord.HTTPException, attempt: int) -> float:
+        headers = getattr(error.response, 'headers', None) or {}
+        retry_after = headers.get('Retry-After')
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.BACKOFF_BASE * (2 ** attempt) * (1 + random.random() / 2)
+
+    def _finish(self, action: Action) -> None:
+        if action.key is not None and self._pending.get(action.key) is action.future:
+            del self._pending[action.key]
+        state = self._routes[action.route]
+        state.inflight -= 1
+        if state.waiting:
+            heapq.heappush(self._heap, heapq.heappop(state.waiting))
+        elif state.inflight == 0:
+            del self._routes[action.route]
+        self._inflight -= 1
+        self._pump()
+
+    def _report(self, kind: str, report: bool, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.completed += 1
+            return
+        self.failed += 1
+        if report and not isinstance(error, EXPECTED_FAILURES.get(kind, ())):
+            print(f"[ACTION FAILED] {kind}: {error}")
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Wait for queued and in-flight actions to finish."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (self._heap or self._tasks) and loop.time() < deadline:
+            await asyncio.sleep(0.05)
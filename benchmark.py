@@ -0,0 +1,381 @@
+"""
+Guardify Benchmarks
+Latency (p50/p99), throughput and peak memory of the detector, evidence
+logger, dashboard queries, warnings and spam checks on synthetic data,
+with JSON baselines and regression checks.
+
+    python benchmark.py                          # run and print
+    python benchmark.py --save-baseline          # record benchmark_baseline.json
+    python benchmark.py --compare                # fail if slower than the baseline
+    python benchmark.py --log-sizes 10000 1000000 10000000
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from discord_stubs import StubChannel, StubGuild, StubMember, StubMessage
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmark_baseline.json")
+METRICS = ("p50_ms", "p99_ms", "peak_kib")  # Compared against the baseline (lower is better)
+
+CLEAN_WORDS = ("thanks", "great", "game", "tonight", "anyone", "help", "with", "the", "new", "update",
+               "love", "this", "server", "see", "you", "later", "what", "time", "is", "it")
+ABUSIVE_WORDS = ("idiot", "stupid", "hate", "loser", "dumb", "shut", "up", "trash", "pathetic", "worst")
+
+Benchmark = Tuple[str, Callable[[], None], int, int]  # name, operation, iterations, units per operation
+
+
+# ----- Synthetic data -----
+
+def corpus(count: int, words: int, abusive_share: float = 0.3, seed: int = 1) -> List[str]:
+    """`count` messages of `words` words; `abusive_share` of them contain abusive words."""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        pool = CLEAN_WORDS + ABUSIVE_WORDS if rng.random() < abusive_share else CLEAN_WORDS
+        messages.append(" ".join(rng.choice(pool) for _ in range(words)))
+    return messages
+
+
+def fake_message(n: int, content: str) -> StubMessage:
+    """Message `n` of a synthetic stream spread over 5000 users, 50 channels and 20 guilds."""
+    channel = StubChannel(n % 50, StubGuild(n % 20))
+    return StubMessage(content, StubMember(n % 5000, channel.guild), channel, message_id=10 ** 17 + n)
+
+
+def write_log(path: str, records: int) -> None:
+    """Evidence log of `records` cases; the last one is by user "needle"."""
+    template = ('{{"message_id": "{n}", "author_id": "{author}", "author_name": "user{author}", '
+                '"channel_id": "{channel}", "channel_name": "channel-{channel}", "guild_id": "{guild}", '
+                '"guild_name": "Guild {guild}", "content": "you are such an idiot honestly", '
+                '"created_at": "2024-01-01T00:00:00+00:00", "analysis": {{"is_abusive": true, '
+                '"abuse_score": 0.7, "vader_sentiment": -0.6, "severity": "{severity}", '
+                '"detected_keywords": ["idiot"], "vader_details": {{"neg": 0.5, "neu": 0.5, "pos": 0.0, '
+                '"compound": -0.6}}}}, "logged_at": "2024-01-01T00:00:00+00:00", "evidence_hash": "{n:016x}"}}\n')
+    severities = ("low", "medium", "high")
+    with open(path, 'w', encoding='utf-8') as f:
+        for n in range(records - 1):
+            f.write(template.format(n=n, author=n % 5000, channel=n % 50, guild=n % 20, severity=severities[n % 3]))
+        f.write(template.format(n=records, author="needle", channel=0, guild=0, severity="high"))
+
+
+# ----- Measurement -----
+
+def measure(operation: Callable[[], None], iterations: int, units: int = 1,
+            memory_iterations: int = 3) -> Dict:
+    """
+    Time `iterations` calls of `operation`, then trace peak memory over a few more.
+
+    Latencies are per unit (an operation may do `units` pieces of work).
+    """
+    operation()  # Warm up caches and lazy imports
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        operation()
+        samples.append((time.perf_counter_ns() - t0) / units / 1e6)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in range(min(iterations, memory_iterations)):
+        operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 6),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 6),
+        "ops_per_sec": round(iterations * units / elapsed, 1),
+        "peak_kib": round(peak / 1024, 1),
+        "iterations": iterations
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Metrics more than `threshold` (0.25 = 25%) worse than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), result.get(metric)
+            if old and new is not None and new > old * (1 + threshold):
+                regressions.append(f"{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+# ----- Benchmarks -----
+
+def detector_benchmarks(args) -> Iterator[Benchmark]:
+    from bot_enhanced import AbuseDetector
+    from history_scan import _init_worker, analyze_batch
+
+    detector = AbuseDetector()
+    for words in args.message_words:
+        messages = corpus(args.corpus_size, words)
+        position = iter(range(10 ** 9))
+
+        def analyze(messages=messages, position=position):
+            detector.analyze_message(messages[next(position) % len(messages)])
+        yield f"detector.analyze_message[{words}w]", analyze, args.corpus_size, 1
+
+    _init_worker(AbuseDetector)
+    batch = corpus(100, 12)
+    yield "detector.analyze_batch[100x12w]", lambda: analyze_batch(batch), 20, len(batch)
+
+
+def logger_benchmarks(args, work_dir: str) -> Iterator[Benchmark]:
+    from bot_enhanced import ForensicsLogger
+    from rollups import EvidenceRollups
+
+    analysis = {"is_abusive": True, "abuse_score": 0.7, "vader_sentiment": -0.6, "severity": "high",
+                "detected_keywords": ["idiot"], "content_hash": "0" * 16}
+    messages = [fake_message(n, text) for n, text in enumerate(corpus(1000, 12, abusive_share=1.0))]
+    for label, rollups in (("", None), ("+rollups", True)):
+        log_dir = tempfile.mkdtemp(dir=work_dir)
+        logger = ForensicsLogger(log_dir=log_dir,
+                                 rollups=EvidenceRollups(os.path.join(log_dir, "rollups.db")) if rollups else None)
+        position = iter(range(10 ** 9))
+
+        def log(logger=logger, position=position):
+            logger.log_evidence(messages[next(position) % len(messages)], analysis)
+        yield f"logger.log_evidence{label}", log, args.log_writes, 1
+
+
+def query_benchmarks(args, work_dir: str) -> Iterator[Benchmark]:
+    from bot_enhanced import ForensicsLogger
+    from evidence_tail import EvidenceTail
+
+    for records in args.log_sizes:
+        log_dir = tempfile.mkdtemp(dir=work_dir)
+        logger = ForensicsLogger(log_dir=log_dir)
+        write_log(logger.log_file, records)
+        iterations = max(3, min(20, 200_000 // records))
+        label = f"{records // 1000}k" if records < 10 ** 6 else f"{records // 10 ** 6}M"
+
+        yield f"logger.get_user_history[{label}]", lambda logger=logger: logger.get_user_history("needle"), iterations, 1
+        yield f"logger.get_statistics[{label}]", logger.get_statistics, iterations, 1
+
+        def cold(path=logger.log_file):
+            tail = EvidenceTail(path)
+            tail.refresh()
+            tail.statistics("1")
+        yield f"dashboard.stats_cold[{label}]", cold, iterations, 1
+
+        tail = EvidenceTail(logger.log_file)
+        tail.refresh()
+
+        def warm(tail=tail):
+            tail.refresh()
+            tail.statistics("1")
+        yield f"dashboard.stats_warm[{label}]", warm, 1000, 1
+
+
+def warnings_benchmarks(args, work_dir: str) -> Iterator[Benchmark]:
+    from bot_enhanced import ForensicsLogger
+    from shared_state import SharedState
+
+    for existing in args.warning_counts:
+        existing_warnings = {f"{n % 20}:{n}": [{"reason": "spam", "timestamp": "2024-01-01T00:00:00"}]
+                             for n in range(existing)}
+
+        file_logger = ForensicsLogger(log_dir=tempfile.mkdtemp(dir=work_dir))
+        file_logger.warnings = dict(existing_warnings)
+        file_logger.save_warnings()
+
+        state = SharedState(os.path.join(tempfile.mkdtemp(dir=work_dir), "state.db"))
+        with state.conn:
+            state.conn.executemany(
+                "INSERT INTO warnings (guild_id, user_id, reason, timestamp) VALUES (?, ?, ?, ?)",
+                [(key.split(':')[0], key.split(':')[1], "spam", "2024-01-01T00:00:00") for key in existing_warnings]
+            )
+        shared_logger = ForensicsLogger(log_dir=tempfile.mkdtemp(dir=work_dir), state=state)
+
+        for label, logger in (("file", file_logger), ("shared", shared_logger)):
+            def add_remove(logger=logger):
+                logger.add_warning("424242", "1", "benchmark")
+                logger.remove_warning("424242", "1", 0)
+            iterations = max(5, min(100, 500_000 // max(existing, 1)))
+            yield f"warnings.add_remove[{label},{existing}]", add_remove, iterations, 2
+
+
+def spam_benchmarks(args) -> Iterator[Benchmark]:
+    from rate_limiter import HierarchicalRateLimiter
+
+    for users in args.active_users:
+        limiter = HierarchicalRateLimiter(user=(5, 5.0), channel=(50, 10.0), guild=(500, 10.0))
+        clock = iter(range(10 ** 9))
+        for user in range(users):
+            limiter.hit(user % 20, user % 50, user, now=0.0)
+        batch = 1000
+
+        def hits(limiter=limiter, users=users):
+            now = next(clock) * 0.01
+            for n in range(batch):
+                user = (n * 7919) % users
+                limiter.hit(user % 20, user % 50, user, now=now)
+        yield f"spam.hit[{users} users]", hits, 50, batch
+
+
+def codec_benchmarks(args, work_dir: str) -> Iterator[Benchmark]:
+    """Decoding evidence records from JSONL and from the binary encoding, with bytes per record."""
+    from bot_enhanced import AbuseDetector, ForensicsLogger
+    from evidence_codec import EvidenceCodec, LENGTH
+
+    detector = AbuseDetector()
+    logger = ForensicsLogger(log_dir=tempfile.mkdtemp(dir=work_dir))
+    for n, text in enumerate(corpus(args.corpus_size, 12, abusive_share=1.0)):
+        logger.log_evidence(fake_message(n, text), detector.analyze_message(text))
+    with open(logger.log_file, 'rb') as f:
+        lines = f.readlines()
+    codec = EvidenceCodec()
+    records = [codec.encode(json.loads(line)) for line in lines]
+    batch = 100
+
+    def decode_jsonl():
+        for line in lines[:batch]:
+            json.loads(line)
+    decode_jsonl.record_bytes = sum(map(len, lines)) / len(lines)
+    yield "codec.decode[jsonl]", decode_jsonl, 200, batch
+
+    def decode_binary():
+        for record in records[:batch]:
+            codec.decode(record)
+    decode_binary.record_bytes = sum(LENGTH.size + len(record) for record in records) / len(records)
+    yield "codec.decode[binary]", decode_binary, 200, batch
+
+    def peek_binary():
+        for record in records[:batch]:
+            codec.peek(record)
+    yield "codec.peek[binary]", peek_binary, 200, batch
+
+    evidence = [json.loads(line) for line in lines[:batch]]
+    yield "codec.encode[binary]", lambda: [codec.encode(record) for record in evidence], 200, batch
+
+
+def pipeline_benchmarks(args) -> Iterator[Benchmark]:
+    """Guardify.on_message end to end (auto-mod off), with and without metrics."""
+    import asyncio
+    from bot_enhanced import Guardify, intents
+    from discord_stubs import RestSimulator, StubWorld
+    from metrics import Metrics
+
+    loop = asyncio.new_event_loop()
+    texts = corpus(args.corpus_size, 12)
+    batch = 100
+    for label, enabled in (("", False), ("+metrics", True)):
+        world = StubWorld(RestSimulator(latency=0.0, jitter=0.0))
+        bot = Guardify(command_prefix='!', intents=intents, metrics=Metrics(enabled=enabled))
+        world.attach(bot)
+        channels = list(world.channels.values())
+        messages = [world.message(text, 1000 + n % 500, channels[n % len(channels)]) for n, text in enumerate(texts)]
+        position = iter(range(10 ** 9))
+
+        async def handle(bot=bot, messages=messages, position=position):
+            for _ in range(batch):
+                await bot.on_message(messages[next(position) % len(messages)])
+
+        yield f"pipeline.on_message{label}", lambda handle=handle: loop.run_until_complete(handle()), 20, batch
+
+
+def run(args) -> Dict[str, Dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        # Importing bot_enhanced creates the bot and its files in the working directory
+        sys.path.insert(0, REPO_DIR)
+        previous = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            groups = [
+                detector_benchmarks(args),
+                logger_benchmarks(args, work_dir),
+                query_benchmarks(args, work_dir),
+                warnings_benchmarks(args, work_dir),
+                spam_benchmarks(args),
+                codec_benchmarks(args, work_dir),
+                pipeline_benchmarks(args),
+            ]
+            print(f"{'benchmark':<42} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>12} {'peak KiB':>10}")
+            for group in groups:
+                for name, operation, iterations, units in group:
+                    if args.only and args.only not in name:
+                        continue
+                    result = results[name] = measure(operation, iterations, units)
+                    extra = ""
+                    if hasattr(operation, 'record_bytes'):
+                        result["bytes_per_record"] = round(operation.record_bytes, 1)
+                        extra = f" {result['bytes_per_record']:>8.0f} B/record"
+                    print(f"{name:<42} {result['p50_ms']:>10.4f} {result['p99_ms']:>10.4f} "
+                          f"{result['ops_per_sec']:>12.1f} {result['peak_kib']:>10.1f}{extra}")
+        finally:
+            os.chdir(previous)
+    return results
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Guardify performance benchmarks")
+    parser.add_argument("--log-sizes", type=int, nargs="+", default=[10_000],
+                        help="Evidence log sizes for query benchmarks (e.g. 10000 1000000 10000000)")
+    parser.add_argument("--message-words", type=int, nargs="+", default=[5, 30, 200],
+                        help="Message lengths (words) for the detector corpora")
+    parser.add_argument("--corpus-size", type=int, default=300, help="Messages per detector corpus")
+    parser.add_argument("--log-writes", type=int, default=1000, help="log_evidence calls to time")
+    parser.add_argument("--warning-counts", type=int, nargs="+", default=[1000, 10000],
+                        help="Existing warnings for the add/remove benchmarks")
+    parser.add_argument("--active-users", type=int, nargs="+", default=[100, 10000, 100000],
+                        help="Active users for the spam check benchmarks")
+    parser.add_argument("--only", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="Write results as the baseline (default: benchmark_baseline.json)")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, default=None,
+                        help="Compare with a baseline and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+        else:
+            print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count(),
+                    "recorded_at": datetime.now(timezone.utc).isoformat()
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.compare and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,11 @@ from textblob import TextBlob
 import re
 from typing import Dict, List, Optional
 from threading import Thread
-from flask import Flask
+from flask import Flask, Response
+from rate_limiter import HierarchicalRateLimiter, USER, CHANNEL, GUILD
+from deletion_queue import DeletionQueue
+from action_scheduler import ActionScheduler
+from metrics import Metrics, NULL_METRICS, CONTENT_TYPE
 
 
 class AbuseDetector:
@@ -80,8 +84,9 @@ class AbuseDetector:
 class ForensicsLogger:
     """Logs evidence of abusive messages for digital forensics."""
     
-    def __init__(self, log_dir: str = "forensics_logs"):
+    def __init__(self, log_dir: str = "forensics_logs", metrics: Optional[Metrics] = None):
         self.log_dir = log_dir
+        self.metrics = metrics if metrics is not None else NULL_METRICS  # Bytes written
         os.makedirs(log_dir, exist_ok=True)
         self.log_file = os.path.join(log_dir, "abuse_evidence.jsonl")
         
@@ -108,8 +113,10 @@ class ForensicsLogger:
         }
         
         # Append to JSONL file (one JSON object per line)
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(evidence, ensure_ascii=False) + '\n')
+        line = (json.dumps(evidence, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.log_file, 'ab') as f:
+            f.write(line)
+        self.metrics.inc('file_bytes_written_total', len(line), file='evidence_jsonl')
     
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict]:
         """
@@ -180,15 +187,25 @@ class ForensicsLogger:
 class RespectRanger(commands.Bot):
     """Main bot class for Respect Ranger."""
     
-    def __init__(self, *args, **kwargs):
+    FLOOD_SLOWMODE = 10  # Slowmode (seconds) applied when a channel floods
+    
+    def __init__(self, *args, metrics: Optional[Metrics] = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.metrics = metrics if metrics is not None else Metrics(prefix="respect_ranger")  # Served at /metrics
         self.abuse_detector = AbuseDetector()
-        self.forensics_logger = ForensicsLogger()
+        self.forensics_logger = ForensicsLogger(metrics=self.metrics)
         
         # Auto-mod settings
-        self.spam_threshold = 5  # messages per 10 seconds
+        self.rate_limiter = HierarchicalRateLimiter(user=(5, 10.0))  # 5 messages per 10 seconds
         self.caps_threshold = 0.7  # 70% caps in message
-        self.user_messages = {}  # Track message timestamps for spam detection
+        self.actions = ActionScheduler(metrics=self.metrics)  # All moderation REST calls go through here
+        self.deletion_queue = DeletionQueue(window=1.0, scheduler=self.actions)  # Coalesce auto-mod deletes per channel
+        self.metrics.register('queue_depth', "Items waiting in each outbound queue", lambda: {
+            'actions': self.actions.queue_depth,
+            'deletions': self.deletion_queue.queue_depth
+        }, label='queue')
+        self.metrics.register('actions_inflight', "Discord actions currently running",
+                              lambda: self.actions.stats()['inflight'])
     
     async def on_ready(self):
         """Called when the bot is ready."""
@@ -196,23 +213,28 @@ class RespectRanger(commands.Bot):
         print(f'Bot is active in {len(self.guilds)} guilds')
         print(f'Auto-moderation enabled: Abuse detection, spam filter, caps filter')
     
-    def check_spam(self, user_id: int) -> bool:
-        """Check if user is spamming."""
-        now = datetime.utcnow()
-        if user_id not in self.user_messages:
-            self.user_messages[user_id] = []
-        
-        # Clean old messages (older than 10 seconds)
-        self.user_messages[user_id] = [
-            msg_time for msg_time in self.user_messages[user_id]
-            if (now - msg_time).total_seconds() < 10
-        ]
-        
-        # Add current message
-        self.user_messages[user_id].append(now)
+    def check_spam(self, message: discord.Message) -> Optional[str]:
+        """
+        Check if a message exceeds the user, channel or guild rate limit.
         
-        # Check if spam (more than threshold messages in 10 seconds)
-        return len(self.user_messages[user_id]) > self.spam_threshold
+        Returns:
+            The exhausted level ("user", "channel" or "guild"), or None
+        """
+        return self.rate_limiter.hit(message.guild.id, message.channel.id, message.author.id)
+    
+    async def apply_flood_slowmode(self, channel):
+        """Enable slowmode on a channel whose message rate limit is exhausted."""
+        if getattr(channel, 'slowmode_delay', 0) >= self.FLOOD_SLOWMODE:
+            return
+        try:
+            await self.actions.run(
+                'slowmode',
+                lambda: channel.edit(slowmode_delay=self.FLOOD_SLOWMODE, reason="Auto-mod: channel flood"),
+                target=channel.id,
+                route=('channel', channel.id)
+            )
+        except discord.Forbidden:
+            print(f"[ERROR] Cannot enable slowmode in {channel} - missing permissions")
     
     def check_excessive_caps(self, content: str) -> bool:
         """Check if message has excessive caps."""
@@ -224,6 +246,12 @@ class RespectRanger(commands.Bot):
         caps_ratio = sum(1 for c in letters if c.isupper()) / len(letters)
         return caps_ratio > self.caps_threshold
         
+    async def close(self):
+        """Flush pending auto-mod deletions before disconnecting."""
+        await self.deletion_queue.close()
+        await self.actions.close()
+        await super().close()
+        
     async def on_message(self, message: discord.Message):
         """Process every message for abuse detection and auto-moderation."""
         # Ignore bot's own messages
@@ -239,104 +267,105 @@ class RespectRanger(commands.Bot):
             await self.process_commands(message)
             return
         
-        # Check for spam
-        if self.check_spam(message.author.id):
-            try:
-                await message.delete()
-                embed = discord.Embed(
-                    title="🚫 Spam Detected",
-                    description=f"{message.author.mention}, please slow down! Don't spam messages.",
-                    color=discord.Color.red()
-                )
-                warning_msg = await message.channel.send(embed=embed)
-                await warning_msg.delete(delay=5)
-                
-                # Timeout for 2 minutes for spamming
-                await message.author.timeout(timedelta(minutes=2), reason="Auto-mod: Spamming")
+        metrics = self.metrics
+        metrics.inc('messages_total')
+        with metrics.stage('total'):
+            # Check for spam
+            with metrics.stage('spam_check'):
+                spam_level = self.check_spam(message)
+            if spam_level:
+                metrics.inc('spam_hits_total', level=spam_level)
+                self.deletion_queue.delete(message)
+                self.deletion_queue.notify(message.channel, message.author, "🚫 Please slow down! Don't spam messages.")
+                if spam_level == USER:
+                    # Timeout for 2 minutes for spamming
+                    self.actions.submit(
+                        'timeout',
+                        lambda: message.author.timeout(timedelta(minutes=2), reason="Auto-mod: Spamming"),
+                        target=message.author.id,
+                        route=('guild', message.guild.id),
+                        params=timedelta(minutes=2)
+                    )
+                elif spam_level == CHANNEL:
+                    # Channel-wide flood: slow the channel down instead of punishing one user
+                    await self.apply_flood_slowmode(message.channel)
                 return
-            except:
-                pass
-        
-        # Check for excessive caps
-        if self.check_excessive_caps(message.content):
-            try:
-                await message.delete()
-                embed = discord.Embed(
-                    title="🔠 Excessive Caps",
-                    description=f"{message.author.mention}, please don't use excessive CAPS LOCK.",
-                    color=discord.Color.orange()
-                )
-                warning_msg = await message.channel.send(embed=embed)
-                await warning_msg.delete(delay=5)
+            
+            # Check for excessive caps
+            with metrics.stage('caps_check'):
+                excessive_caps = self.check_excessive_caps(message.content)
+            if excessive_caps:
+                metrics.inc('caps_hits_total')
+                self.deletion_queue.delete(message)
+                self.deletion_queue.notify(message.channel, message.author, "🔠 Please don't use excessive CAPS LOCK.")
                 return
-            except:
-                pass
-        
-        # Analyze message for abusive content
-        analysis = self.abuse_detector.analyze_message(message.content)
-        
-        # Auto-moderation for abusive content
-        if analysis['is_abusive']:
-            self.forensics_logger.log_evidence(message, analysis)
-            print(f"[ABUSE DETECTED] {message.author}: {message.content[:50]}... "
-                  f"(Score: {analysis['abuse_score']}, Severity: {analysis['severity']})")
             
-            try:
-                # Delete the abusive message
-                await message.delete()
-                
-                # Load warnings
-                warnings_file = os.path.join(self.forensics_logger.log_dir, "warnings.json")
-                warnings = {}
-                if os.path.exists(warnings_file):
-                    with open(warnings_file, 'r') as f:
-                        warnings = json.load(f)
-                
-                # Add automatic warning
-                user_id = str(message.author.id)
-                if user_id not in warnings:
-                    warnings[user_id] = []
-                
-                warnings[user_id].append({
-                    "warned_by": "AUTO-MOD",
-                    "warned_by_name": "Guardify Auto-Moderation",
-                    "reason": f"Abusive language detected ({analysis['severity']} severity)",
-                    "message_content": message.content[:100],
-                    "timestamp": datetime.utcnow().isoformat()
-                })
-                
-                # Save warnings
-                with open(warnings_file, 'w') as f:
-                    json.dump(warnings, f, indent=2)
-                
-                warning_count = len(warnings[user_id])
-                
-                # Send warning message in channel
-                embed = discord.Embed(
-                    title="⚠️ Abusive Content Detected",
-                    description=f"{message.author.mention}, your message was removed for violating community guidelines.",
-                    color=discord.Color.orange()
-                )
-                embed.add_field(name="Reason", value=f"Abusive language ({analysis['severity']} severity)", inline=False)
-                embed.add_field(name="Total Warnings", value=f"{warning_count}/5", inline=True)
-                
-                # Auto-timeout after 5 warnings
-                if warning_count >= 5:
-                    try:
-                        await message.author.timeout(timedelta(minutes=10), reason="Auto-mod: 5 warnings reached")
-                        embed.add_field(name="Action Taken", value="🔇 Timed out for 10 minutes (5 warnings)", inline=False)
-                        embed.color = discord.Color.red()
-                    except discord.Forbidden:
-                        embed.add_field(name="Note", value="⚠️ Unable to timeout user (insufficient permissions)", inline=False)
-                else:
-                    embed.add_field(name="Warning", value=f"You will be timed out after 5 warnings ({5-warning_count} remaining)", inline=False)
-                
-                warning_msg = await message.channel.send(embed=embed)
-                # Delete warning message after 10 seconds
-                await warning_msg.delete(delay=10)
+            # Analyze message for abusive content
+            with metrics.stage('detection'):
+                analysis = self.abuse_detector.analyze_message(message.content)
+            
+            # Auto-moderation for abusive content
+            if analysis['is_abusive']:
+                metrics.inc('messages_flagged_total')
+                with metrics.stage('evidence_write'):
+                    self.forensics_logger.log_evidence(message, analysis)
+                print(f"[ABUSE DETECTED] {message.author}: {message.content[:50]}... "
+                      f"(Score: {analysis['abuse_score']}, Severity: {analysis['severity']})")
                 
-                # Try to DM the user
                 try:
+                    # Queue the abusive message for (bulk) deletion
+                    self.deletion_queue.delete(message)
+                    
+                    # Load, update and save warnings
+                    with metrics.stage('warning_write'):
+                        warnings_file = os.path.join(self.forensics_logger.log_dir, "warnings.json")
+                        warnings = {}
+                        if os.path.exists(warnings_file):
+                            with open(warnings_file, 'r') as f:
+                                warnings = json.load(f)
+                        
+                        # Add automatic warning
+                        user_id = str(message.author.id)
+                        if user_id not in warnings:
+                            warnings[user_id] = []
+                        
+                        warnings[user_id].append({
+                            "warned_by": "AUTO-MOD",
+                            "warned_by_name": "Guardify Auto-Moderation",
+                            "reason": f"Abusive language detected ({analysis['severity']} severity)",
+                            "message_content": message.content[:100],
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+                        
+                        # Save warnings
+                        with open(warnings_file, 'w') as f:
+                            json.dump(warnings, f, indent=2)
+                            metrics.inc('file_bytes_written_total', f.tell(), file='warnings')
+                    
+                    warning_count = len(warnings[user_id])
+                    
+                    # Queue the warning line for the channel notice
+                    notice = f"Abusive language ({analysis['severity']} severity) · Warnings: {warning_count}/5"
+                    
+                    # Auto-timeout after 5 warnings
+                    if warning_count >= 5:
+                        try:
+                            await self.actions.run(
+                                'timeout',
+                                lambda: message.author.timeout(timedelta(minutes=10), reason="Auto-mod: 5 warnings reached"),
+                                target=message.author.id,
+                                route=('guild', message.guild.id),
+                                params=timedelta(minutes=10)
+                            )
+                            notice += " · 🔇 Timed out for 10 minutes"
+                        except discord.Forbidden:
+                            notice += " · ⚠️ Unable to timeout user (insufficient permissions)"
+                    else:
+                        notice += f" · Timeout after 5 warnings ({5-warning_count} remaining)"
+                    
+                    self.deletion_queue.notify(message.channel, message.author, notice)
+                    
+                    # Try to DM the user (failures such as closed DMs are handled by the scheduler)
                     dm_embed = discord.Embed(
                         title="⚠️ Community Guidelines Violation",
                         description=f"Your message in {message.guild.name} was removed.",
@@ -347,17 +376,15 @@ class RespectRanger(commands.Bot):
                     dm_embed.add_field(name="Warnings", value=f"{warning_count}/5", inline=False)
                     if warning_count >= 5:
                         dm_embed.add_field(name="Action", value="Timed out for 10 minutes", inline=False)
-                    await message.author.send(embed=dm_embed)
-                except:
-                    pass  # User has DMs disabled
-                    
-            except discord.Forbidden:
-                print(f"[ERROR] Cannot delete message or timeout user - missing permissions")
-            except Exception as e:
-                print(f"[ERROR] Auto-mod failed: {e}")
-        
-        # Process commands
-        await self.process_commands(message)
+                    self.actions.submit('dm', lambda: message.author.send(embed=dm_embed), route=('dm', message.author.id))
+                
+                except discord.Forbidden:
+                    print(f"[ERROR] Cannot delete message or timeout user - missing permissions")
+                except Exception as e:
+                    print(f"[ERROR] Auto-mod failed: {e}")
+            
+            # Process commands
+            await self.process_commands(message)
 
 
 # Setup bot with intents
@@ -469,7 +496,12 @@ async def kick(ctx, member: discord.Member, *, reason: str = "No reason provided
     Usage: !kick @user [reason]
     """
     try:
-        await member.kick(reason=f"{reason} | Kicked by {ctx.author}")
+        await bot.actions.run(
+            'kick',
+            lambda: member.kick(reason=f"{reason} | Kicked by {ctx.author}"),
+            target=member.id,
+            route=('guild', ctx.guild.id)
+        )
         embed = discord.Embed(
             title="Member Kicked",
             description=f"{member.mention} has been kicked from the server.",
@@ -492,7 +524,12 @@ async def ban(ctx, member: discord.Member, *, reason: str = "No reason provided"
     Usage: !ban @user [reason]
     """
     try:
-        await member.ban(reason=f"{reason} | Banned by {ctx.author}", delete_message_days=1)
+        await bot.actions.run(
+            'ban',
+            lambda: member.ban(reason=f"{reason} | Banned by {ctx.author}", delete_message_days=1),
+            target=member.id,
+            route=('guild', ctx.guild.id)
+        )
         embed = discord.Embed(
             title="Member Banned",
             description=f"{member.mention} has been banned from the server.",
@@ -516,7 +553,12 @@ async def unban(ctx, user_id: int, *, reason: str = "No reason provided"):
     """
     try:
         user = await bot.fetch_user(user_id)
-        await ctx.guild.unban(user, reason=f"{reason} | Unbanned by {ctx.author}")
+        await bot.actions.run(
+            'unban',
+            lambda: ctx.guild.unban(user, reason=f"{reason} | Unbanned by {ctx.author}"),
+            target=user.id,
+            route=('guild', ctx.guild.id)
+        )
         embed = discord.Embed(
             title="Member Unbanned",
             description=f"{user.mention} has been unbanned from the server.",
@@ -539,7 +581,13 @@ async def timeout(ctx, member: discord.Member, duration: int, *, reason: str = "
     Usage: !timeout @user <minutes> [reason]
     """
     try:
-        await member.timeout(timedelta(minutes=duration), reason=f"{reason} | Timeout by {ctx.author}")
+        await bot.actions.run(
+            'timeout',
+            lambda: member.timeout(timedelta(minutes=duration), reason=f"{reason} | Timeout by {ctx.author}"),
+            target=member.id,
+            route=('guild', ctx.guild.id),
+            params=timedelta(minutes=duration)
+        )
         embed = discord.Embed(
             title="Member Timed Out",
             description=f"{member.mention} has been timed out for {duration} minutes.",
@@ -562,7 +610,12 @@ async def untimeout(ctx, member: discord.Member):
     Usage: !untimeout @user
     """
     try:
-        await member.timeout(None, reason=f"Timeout removed by {ctx.author}")
+        await bot.actions.run(
+            'untimeout',
+            lambda: member.timeout(None, reason=f"Timeout removed by {ctx.author}"),
+            target=member.id,
+            route=('guild', ctx.guild.id)
+        )
         embed = discord.Embed(
             title="Timeout Removed",
             description=f"{member.mention} can now speak again.",
@@ -616,16 +669,13 @@ async def warn(ctx, member: discord.Member, *, reason: str = "No reason provided
     await ctx.send(embed=embed)
     
     # Try to DM the user
-    try:
-        dm_embed = discord.Embed(
-            title="⚠️ Warning",
-            description=f"You have been warned in {ctx.guild.name}",
-            color=discord.Color.gold()
-        )
-        dm_embed.add_field(name="Reason", value=reason, inline=False)
-        await member.send(embed=dm_embed)
-    except:
-        pass
+    dm_embed = discord.Embed(
+        title="⚠️ Warning",
+        description=f"You have been warned in {ctx.guild.name}",
+        color=discord.Color.gold()
+    )
+    dm_embed.add_field(name="Reason", value=reason, inline=False)
+    bot.actions.submit('dm', lambda: member.send(embed=dm_embed), route=('dm', member.id))
 
 
 @bot.command(name='automod')
@@ -634,15 +684,22 @@ async def automod_settings(ctx, setting: str = None, value: str = None):
     """
     View or configure auto-moderation settings.
     Usage: !automod [setting] [value]
-    Settings: spam_threshold, caps_threshold
+    Settings: spam_threshold, channel_threshold, guild_threshold, caps_threshold
     """
+    limits = bot.rate_limiter.limits(ctx.guild.id)
+    
+    def describe(limit):
+        return f"{limit[0]} messages per {limit[1]:g} seconds" if limit else "Disabled"
+    
     if setting is None:
         embed = discord.Embed(
             title="🛡️ Auto-Moderation Settings",
             description="Current auto-moderation configuration",
             color=discord.Color.blue()
         )
-        embed.add_field(name="Spam Threshold", value=f"{bot.spam_threshold} messages per 10 seconds", inline=False)
+        embed.add_field(name="Spam Threshold", value=describe(limits[USER]), inline=False)
+        embed.add_field(name="Channel Threshold", value=describe(limits[CHANNEL]), inline=False)
+        embed.add_field(name="Guild Threshold", value=describe(limits[GUILD]), inline=False)
         embed.add_field(name="Caps Threshold", value=f"{int(bot.caps_threshold * 100)}% caps in message", inline=False)
         embed.add_field(name="Auto-Delete", value="✅ Enabled for abusive content, spam, excessive caps", inline=False)
         embed.add_field(name="Auto-Warn", value="✅ Enabled for abusive content", inline=False)
@@ -650,12 +707,17 @@ async def automod_settings(ctx, setting: str = None, value: str = None):
         embed.set_footer(text="Use !automod <setting> <value> to change")
         await ctx.send(embed=embed)
     else:
-        if setting == "spam_threshold" and value:
+        levels = {"spam_threshold": USER, "channel_threshold": CHANNEL, "guild_threshold": GUILD}
+        if setting in levels and value:
             try:
-                bot.spam_threshold = int(value)
-                await ctx.send(f"✅ Spam threshold set to {value} messages per 10 seconds")
-            except:
-                await ctx.send("❌ Invalid value. Use a number (e.g., !automod spam_threshold 5)")
+                count = int(value)
+                bot.rate_limiter.configure(ctx.guild.id, levels[setting], count or None, 10.0)
+                if count:
+                    await ctx.send(f"✅ {setting.replace('_', ' ').capitalize()} set to {count} messages per 10 seconds")
+                else:
+                    await ctx.send(f"✅ {setting.replace('_', ' ').capitalize()} disabled")
+            except ValueError:
+                await ctx.send(f"❌ Invalid value. Use a number (e.g., !automod {setting} 5, 0 to disable)")
         elif setting == "caps_threshold" and value:
             try:
                 bot.caps_threshold = int(value) / 100
@@ -663,7 +725,7 @@ async def automod_settings(ctx, setting: str = None, value: str = None):
             except:
                 await ctx.send("❌ Invalid value. Use a percentage (e.g., !automod caps_threshold 70)")
         else:
-            await ctx.send("❌ Unknown setting. Available: spam_threshold, caps_threshold")
+            await ctx.send("❌ Unknown setting. Available: spam_threshold, channel_threshold, guild_threshold, caps_threshold")
 
 
 @bot.command(name='clearwarnings')
@@ -762,7 +824,11 @@ async def slowmode(ctx, seconds: int = 0):
         seconds = 21600
     
     try:
-        await ctx.channel.edit(slowmode_delay=seconds)
+        await bot.actions.run(
+            'slowmode',
+            lambda: ctx.channel.edit(slowmode_delay=seconds),
+            route=('channel', ctx.channel.id)
+        )
         if seconds == 0:
             await ctx.send("✅ Slowmode disabled.")
         else:
@@ -921,6 +987,10 @@ def home():
 def health():
     return {"status": "online", "bot": str(bot.user) if bot.is_ready() else "connecting"}
 
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(bot.metrics.render(), content_type=CONTENT_TYPE)
+
 def run_web_server():
     """Run Flask web server in background thread."""
     port = int(os.environ.get('PORT', 10000))
@@ -12,6 +12,8 @@ from discord.ext import commands
 from discord import app_commands
 import json
 import os
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
@@ -21,7 +23,29 @@ import re
 from typing import Dict, List, Optional
 import asyncio
 from collections import defaultdict
-import csv
+import sqlite3
+from rate_limiter import HierarchicalRateLimiter, LEVELS, CHANNEL
+from deletion_queue import DeletionQueue
+from log_outbox import LogOutbox
+from action_scheduler import ActionScheduler, SAFETY
+from mass_actions import FloodTracker, parse_user_ids, fan_out, chunked
+from shared_state import SharedState
+from history_scan import HistoryScanner, create_pool
+from guild_config import GuildConfigStore
+from command_sync import CommandSyncState, sync_if_changed
+from rollups import EvidenceRollups
+from content_store import ContentStore
+from csv_view import CsvView
+from metrics import Metrics, NULL_METRICS, CONTENT_TYPE
+from loop_monitor import LoopMonitor
+from profiler import LiveProfiler, MemoryProfiler, top_functions, SORT_KEYS
+from flask import Flask, Response
+from threading import Lock, Thread
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only, no file locking
+    fcntl = None
 
 
 class AbuseDetector:
@@ -46,7 +70,6 @@ class AbuseDetector:
             'fuck', 'shit', 'bitch', 'ass', 'damn', 'suicide',
             'hurt yourself', 'nobody likes you', 'waste of space'
         ]
-        self.spam_tracker = defaultdict(list)
         self.vader = SentimentIntensityAnalyzer()
         
         # Prevention tips database
@@ -68,12 +91,13 @@ class AbuseDetector:
             ]
         }
         
-    def analyze_message(self, content: str) -> Dict:
+    def analyze_message(self, content: str, keywords: Optional[List[str]] = None) -> Dict:
         """
         Dual AI Sentiment Analysis for Abuse Detection
         
         Combines TextBlob (pattern-based) and VADER (lexicon-based) for
         comprehensive analysis. Returns forensics-grade evidence data.
+        `keywords` replaces the default abusive keyword list (per-guild lexicon).
         """
         content_lower = content.lower()
         
@@ -87,7 +111,7 @@ class AbuseDetector:
         
         # Keyword detection with pattern matching
         detected_keywords = []
-        for keyword in self.abusive_keywords:
+        for keyword in (self.abusive_keywords if keywords is None else keywords):
             pattern = r'\b' + re.escape(keyword) + r'\b'
             if re.search(pattern, content_lower):
                 detected_keywords.append(keyword)
@@ -135,16 +159,6 @@ class AbuseDetector:
         import random
         return random.choice(self.prevention_tips.get(severity, self.prevention_tips['low']))
     
-    def check_spam(self, user_id: int, message_time: datetime) -> bool:
-        """Check if user is spamming."""
-        self.spam_tracker[user_id].append(message_time)
-        
-        # Keep only messages from last 5 seconds
-        cutoff = message_time - timedelta(seconds=5)
-        self.spam_tracker[user_id] = [t for t in self.spam_tracker[user_id] if t > cutoff]
-        
-        # If more than 5 messages in 5 seconds, it's spam
-        return len(self.spam_tracker[user_id]) > 5
 
 
 class ForensicsLogger:
@@ -156,71 +170,111 @@ class ForensicsLogger:
     Designed for academic research and legal documentation purposes.
     """
     
-    def __init__(self, log_dir: str = "forensics_logs"):
+    def __init__(self, log_dir: str = "forensics_logs", state: Optional[SharedState] = None,
+                 rollups: Optional[EvidenceRollups] = None, metrics: Optional[Metrics] = None,
+                 content_store: Optional[ContentStore] = None):
         self.log_dir = log_dir
+        self.state = state  # Shared store for warnings in cluster mode
+        self.rollups = rollups  # Hourly/daily counts for dashboard trend charts
+        self.content_store = content_store  # Message text stored once per distinct text, by SHA-256
+        self.metrics = metrics if metrics is not None else NULL_METRICS  # Bytes written per file
         os.makedirs(log_dir, exist_ok=True)
         self.log_file = os.path.join(log_dir, "abuse_evidence.jsonl")
         self.csv_file = os.path.join(log_dir, "abuse_evidence.csv")
+        self.csv_view = CsvView(self.log_file, self.csv_file, content_store=content_store, metrics=self.metrics)
         self.warnings_file = os.path.join(log_dir, "warnings.json")
         self.interactions_file = os.path.join(log_dir, "user_interactions.json")
+        self.warnings_dirty = False  # Cluster mode: warnings.json is behind the shared store
+        self.write_lock = Lock()  # log_evidence runs in worker threads
+        self.warnings_lock = Lock()  # So does add_warning; guards self.warnings and warnings.json
         self.load_warnings()
         self.user_interactions = defaultdict(list)  # Track user interaction network
         
     def load_warnings(self):
         """Load warning counts from file."""
-        if os.path.exists(self.warnings_file):
+        if self.state is not None:
+            self.warnings = self.state.warnings_snapshot()
+        elif os.path.exists(self.warnings_file):
             with open(self.warnings_file, 'r') as f:
                 self.warnings = json.load(f)
         else:
             self.warnings = {}
     
     def save_warnings(self):
-        """Save warning counts to file."""
+        """Save warning counts to file (in cluster mode, mark them for the next export)."""
+        if self.state is not None:
+            self.warnings_dirty = True  # Exported off the event loop by Guardify.write_shared_state
+            return
         with open(self.warnings_file, 'w') as f:
             json.dump(self.warnings, f, indent=2)
+            self.metrics.inc('file_bytes_written_total', f.tell(), file='warnings')
+    
+    def export_warnings(self):
+        """Write warnings.json from the shared store (cluster mode); other workers write too."""
+        self.state.export_warnings(self.warnings_file)
     
     def add_warning(self, user_id: str, guild_id: str, reason: str) -> int:
         """Add a warning for a user."""
+        if self.state is not None:
+            count = self.state.add_warning(guild_id, user_id, reason, datetime.utcnow().isoformat())
+            self.save_warnings()
+            return count
         key = f"{guild_id}:{user_id}"
-        if key not in self.warnings:
-            self.warnings[key] = []
-        
-        self.warnings[key].append({
-            "reason": reason,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-        self.save_warnings()
-        return len(self.warnings[key])
+        with self.warnings_lock:
+            if key not in self.warnings:
+                self.warnings[key] = []
+            
+            self.warnings[key].append({
+                "reason": reason,
+                "timestamp": datetime.utcnow().isoformat()
+            })
+            self.save_warnings()
+            return len(self.warnings[key])
     
     def get_warnings(self, user_id: str, guild_id: str) -> List[Dict]:
         """Get warnings for a user."""
+        if self.state is not None:
+            return self.state.get_warnings(guild_id, user_id)
         key = f"{guild_id}:{user_id}"
         return self.warnings.get(key, [])
     
     def remove_warning(self, user_id: str, guild_id: str, index: int) -> bool:
         """Remove a specific warning by index."""
+        if self.state is not None:
+            removed = self.state.remove_warning(guild_id, user_id, index)
+            if removed:
+                self.save_warnings()
+            return removed
         key = f"{guild_id}:{user_id}"
-        if key in self.warnings and 0 <= index < len(self.warnings[key]):
-            self.warnings[key].pop(index)
-            if len(self.warnings[key]) == 0:
-                del self.warnings[key]
-            self.save_warnings()
-            return True
+        with self.warnings_lock:
+            if key in self.warnings and 0 <= index < len(self.warnings[key]):
+                self.warnings[key].pop(index)
+                if len(self.warnings[key]) == 0:
+                    del self.warnings[key]
+                self.save_warnings()
+                return True
         return False
     
     def clear_warnings(self, user_id: str, guild_id: str):
         """Clear warnings for a user."""
-        key = f"{guild_id}:{user_id}"
-        if key in self.warnings:
-            del self.warnings[key]
+        if self.state is not None:
+            self.state.clear_warnings(guild_id, user_id)
             self.save_warnings()
+            return
+        key = f"{guild_id}:{user_id}"
+        with self.warnings_lock:
+            if key in self.warnings:
+                del self.warnings[key]
+                self.save_warnings()
         
     def log_evidence(self, message: discord.Message, analysis: Dict) -> None:
         """
         Log forensics evidence with data integrity verification.
         
-        Creates both JSONL and CSV records for research analysis.
+        Appends a JSONL record; the CSV for research analysis is derived
+        from it later by `csv_view`.
         Includes SHA-256 hash for evidence verification and chain of custody.
+        With a content store the JSONL record references the content by hash.
         """
         # Create evidence record with data integrity
         evidence = {
@@ -238,50 +292,82 @@ class ForensicsLogger:
             "evidence_hash": analysis.get('content_hash', hashlib.sha256(message.content.encode()).hexdigest()[:16])
         }
         
-        # Log to JSONL (for detailed records)
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(evidence, ensure_ascii=False) + '\n')
-        
-        # Log to CSV (for visualization and analysis)
-        self.log_to_csv(evidence)
-        
-        # Track user interactions for network analysis
-        if message.guild:
-            self.track_interaction(str(message.author.id), str(message.guild.id))
-    
-    def log_to_csv(self, evidence: Dict) -> None:
-        """Export evidence to CSV for analysis in Excel/pandas."""
-        file_exists = os.path.exists(self.csv_file)
-        
-        with open(self.csv_file, 'a', newline='', encoding='utf-8') as f:
-            fieldnames = [
-                'timestamp', 'message_id', 'author_id', 'author_name',
-                'guild_name', 'channel_name', 'content', 'severity',
-                'abuse_score', 'textblob_sentiment', 'vader_sentiment',
-                'keywords', 'prevention_tip', 'evidence_hash'
-            ]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+        with self.write_lock:
+            # Log to JSONL (for detailed records), content first so readers can resolve it
+            with self.log_lock():
+                record = self.content_store.reference(evidence) if self.content_store is not None else evidence
+                try:
+                    line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+                    with open(self.log_file, 'ab') as f:
+                        f.write(line)
+                except Exception:
+                    if 'content_sha256' in record:
+                        self.content_store.release([record['content_sha256']])  # No record refers to it
+                    raise
+            self.metrics.inc('file_bytes_written_total', len(line), file='evidence_jsonl')
             
-            if not file_exists:
-                writer.writeheader()
+            # Update time-series rollups
+            if self.rollups is not None:
+                try:
+                    self.rollups.add([evidence])
+                except sqlite3.Error as e:
+                    print(f"Failed to update rollups: {e}")
             
-            analysis = evidence.get('analysis', {})
-            writer.writerow({
-                'timestamp': evidence.get('created_at', ''),
-                'message_id': evidence.get('message_id', ''),
-                'author_id': evidence.get('author_id', ''),
-                'author_name': evidence.get('author_name', ''),
-                'guild_name': evidence.get('guild_name', ''),
-                'channel_name': evidence.get('channel_name', ''),
-                'content': evidence.get('content', '')[:500],  # Truncate for CSV
-                'severity': analysis.get('severity', ''),
-                'abuse_score': analysis.get('abuse_score', ''),
-                'textblob_sentiment': analysis.get('textblob_sentiment', ''),
-                'vader_sentiment': analysis.get('vader_sentiment', ''),
-                'keywords': ','.join(analysis.get('detected_keywords', [])),
-                'prevention_tip': analysis.get('prevention_tip', ''),
-                'evidence_hash': evidence.get('evidence_hash', '')
-            })
+            # Track user interactions for network analysis
+            if message.guild:
+                self.track_interaction(str(message.author.id), str(message.guild.id))
+    
+    @contextmanager
+    def log_lock(self):
+        """File lock on the evidence log, so cluster workers don't append while it is purged."""
+        with open(self.log_file + ".lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+    
+    def purge_evidence(self, retention_days: int) -> int:
+        """
+        Remove records logged more than `retention_days` days ago.
+        
+        The log is rewritten without them and their content references are
+        released, so texts only they referred to are deleted from the store.
+        
+        Returns:
+            Number of records removed
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        released = []
+        purged = 0
+        with self.write_lock, self.log_lock():
+            if not os.path.exists(self.log_file):
+                return 0
+            fd, tmp = tempfile.mkstemp(dir=self.log_dir, prefix='.evidence-', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as out, open(self.log_file, 'rb') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                            logged_at = datetime.fromisoformat(record['logged_at'])
+                        except (ValueError, TypeError, KeyError):
+                            out.write(line)  # Keep anything that can't be dated
+                            continue
+                        if logged_at.tzinfo is None:
+                            logged_at = logged_at.replace(tzinfo=timezone.utc)
+                        if logged_at >= cutoff:
+                            out.write(line)
+                            continue
+                        purged += 1
+                        if 'content_sha256' in record:
+                            released.append(record['content_sha256'])
+                if purged:
+                    os.replace(tmp, self.log_file)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        # Only after the records are gone, so no remaining record loses its content
+        if released and self.content_store is not None:
+            self.content_store.release(released)
+        return purged
     
     def track_interaction(self, user_id: str, guild_id: str) -> None:
         """Track user interactions for network visualization."""
@@ -308,6 +394,8 @@ class ForensicsLogger:
                 except json.JSONDecodeError:
                     continue
         
+        if self.content_store is not None:
+            self.content_store.resolve(records)
         return records
     
     def get_statistics(self) -> Dict:
@@ -346,64 +434,224 @@ class ForensicsLogger:
 class Guardify(commands.Bot):
     """Main bot class with enhanced moderation features."""
     
-    def __init__(self, *args, **kwargs):
+    FLOOD_SLOWMODE = 10  # Slowmode (seconds) applied when a channel floods
+    HEARTBEAT_INTERVAL = 30  # Seconds between cluster status updates
+    STATE_FLUSH_INTERVAL = 2  # Seconds between shared counter and warnings.json updates (cluster mode)
+    SCAN_WORKERS = 2  # Detection processes for /scanhistory
+    SCAN_REST_SHARE = 0.1  # Share of the REST budget /scanhistory may use
+    CSV_INTERVAL = 60  # Seconds between background updates of abuse_evidence.csv
+    PURGE_INTERVAL = 3600  # Seconds between evidence retention purges
+    CONFIG_RELOAD_INTERVAL = 5  # Seconds between checks for config file changes
+    
+    def __init__(self, *args, state: Optional[SharedState] = None, worker_id: int = 0,
+                 metrics: Optional[Metrics] = None, evidence_retention_days: Optional[int] = None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.state = state  # Shared with the other workers in cluster mode
+        self.evidence_retention_days = evidence_retention_days  # None: keep evidence forever
+        self.flagged_pending = 0  # Flagged messages not yet added to the shared counter
+        self.worker_id = worker_id
+        self.metrics = metrics if metrics is not None else Metrics()  # Served at /metrics
+        self.loop_monitor = LoopMonitor(metrics=self.metrics)  # Loop lag and blocking calls, see /perf
         self.abuse_detector = AbuseDetector()
-        self.forensics_logger = ForensicsLogger()
-        self.auto_mod_enabled = {}  # Guild-specific auto-mod settings
-        self.log_channels = {}  # Guild-specific log channels
-        self.welcome_channels = {}  # Guild-specific welcome channels
-        self.welcome_messages = {}  # Guild-specific welcome messages
-        self.load_log_channels()
-        self.load_welcome_config()
+        self.forensics_logger = ForensicsLogger(state=state, rollups=EvidenceRollups(), metrics=self.metrics,
+                                                content_store=ContentStore())
+        self.rate_limiter = HierarchicalRateLimiter(user=(5, 5.0))  # 5 messages per 5 seconds
+        self.actions = ActionScheduler(metrics=self.metrics)  # All moderation REST calls go through here
+        self.deletion_queue = DeletionQueue(window=1.0, scheduler=self.actions)  # Coalesce auto-mod deletes per channel
+        self.log_outbox = LogOutbox(self.get_channel, interval=2.0, scheduler=self.actions)  # Batch log channel embeds
+        self.flood_tracker = FloodTracker(window=600)  # Recent message fingerprints for raid response
+        self.history_scanner = None  # Created on first /scanhistory
+        self.history_scans = {}  # Guild ID -> running scan task
+        self.lexicons = {}  # Guild ID -> keyword list, for guilds with lexicon overrides
+        self.config = GuildConfigStore()  # Per-guild settings, cached in memory
+        self.config.import_legacy('forensics_logs/log_channels.json', 'forensics_logs/welcome_config.json')
+        self.config.subscribe(self.on_config_change)
+        self.command_sync = CommandSyncState()  # Hash of the last synced command tree
+        for guild_id in self.config.guilds_with('spam_limits'):
+            self.on_config_change(guild_id, 'spam_limits', self.config.get(guild_id, 'spam_limits'))
+        for guild_id in set(self.config.guilds_with('lexicon_add')) | set(self.config.guilds_with('lexicon_remove')):
+            self.on_config_change(guild_id, 'lexicon_add', None)
+        self.register_metrics()
+        self.profiler = LiveProfiler()  # /profile
+        self.memory_profiler = MemoryProfiler({  # /memprofile; state that grows with traffic
+            'rate_limiter_buckets': lambda: len(self.rate_limiter),
+            'flood_fingerprints': lambda: sum(len(prints) for prints in self.flood_tracker.guilds.values()),
+            'user_interactions': lambda: sum(len(events) for events in self.forensics_logger.user_interactions.values()),
+            'warnings': lambda: sum(len(warns) for warns in self.forensics_logger.warnings.values()),
+            'lexicons': lambda: len(self.lexicons),
+            'discord_messages': lambda: len(self.cached_messages),
+            'discord_users': lambda: len(self.users),
+            'discord_members': lambda: sum(len(guild.members) for guild in self.guilds),
+        })
         
-    def load_log_channels(self):
-        """Load log channels from file."""
-        log_file = 'forensics_logs/log_channels.json'
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                self.log_channels = json.load(f)
-    
-    def save_log_channels(self):
-        """Save log channels to file."""
-        os.makedirs('forensics_logs', exist_ok=True)
-        with open('forensics_logs/log_channels.json', 'w') as f:
-            json.dump(self.log_channels, f, indent=2)
-    
-    def load_welcome_config(self):
-        """Load welcome configuration from file."""
-        welcome_file = 'forensics_logs/welcome_config.json'
-        if os.path.exists(welcome_file):
-            with open(welcome_file, 'r') as f:
-                config = json.load(f)
-                self.welcome_channels = config.get('channels', {})
-                self.welcome_messages = config.get('messages', {})
-    
-    def save_welcome_config(self):
-        """Save welcome configuration to file."""
-        os.makedirs('forensics_logs', exist_ok=True)
-        with open('forensics_logs/welcome_config.json', 'w') as f:
-            json.dump({
-                'channels': self.welcome_channels,
-                'messages': self.welcome_messages
-            }, f, indent=2)
+    def register_metrics(self):
+        """Export queue depths and scheduler counters, read when /metrics is scraped."""
+        self.metrics.register('queue_depth', "Items waiting in each outbound queue", lambda: {
+            'actions': self.actions.queue_depth,
+            'deletions': self.deletion_queue.queue_depth,
+            'log_outbox': self.log_outbox.queue_depth
+        }, label='queue')
+        self.metrics.register('actions_inflight', "Discord actions currently running",
+                              lambda: self.actions.stats()['inflight'])
+        self.metrics.register('actions_total', "Discord actions finished, retried or merged", lambda: {
+            key: value for key, value in self.actions.stats().items()
+            if key in ('completed', 'failed', 'retried', 'deduplicated')
+        }, kind='counter', label='outcome')
+        self.metrics.register('log_embeds_dropped_total', "Log channel embeds dropped",
+                              lambda: self.log_outbox.embeds_dropped, kind='counter')
+        
+    def on_config_change(self, guild_id: int, key: str, value):
+        """Keep derived state in sync with the guild config store."""
+        if key == 'spam_limits':
+            self.rate_limiter.reset(guild_id)
+            for level, limit in value.items():
+                self.rate_limiter.configure(guild_id, level, *(limit or (None,)))
+        elif key in ('lexicon_add', 'lexicon_remove'):
+            added = self.config.get(guild_id, 'lexicon_add')
+            removed = set(self.config.get(guild_id, 'lexicon_remove'))
+            if added or removed:
+                keywords = [k for k in self.abuse_detector.abusive_keywords if k not in removed]
+                self.lexicons[guild_id] = keywords + [k for k in added if k not in keywords]
+            else:
+                self.lexicons.pop(guild_id, None)
+    
+    async def watch_config(self):
+        """Hot-reload guild config changed by other workers or by hand."""
+        while not self.is_closed():
+            await asyncio.sleep(self.CONFIG_RELOAD_INTERVAL)
+            try:
+                self.config.reload_if_changed()
+            except (OSError, ValueError) as e:
+                print(f"Failed to reload guild config: {e}")
     
     async def log_to_channel(self, guild_id: int, embed: discord.Embed):
-        """Send log message to configured log channel."""
-        channel_id = self.log_channels.get(str(guild_id))
+        """Queue log message for the configured log channel (sent in batches)."""
+        channel_id = self.config.get(guild_id, 'log_channel')
         if channel_id:
+            self.log_outbox.put(int(channel_id), embed)
+    
+    def check_spam(self, message: discord.Message) -> Optional[str]:
+        """
+        Check a message against the user, channel and guild rate limits.
+        
+        Returns:
+            The exhausted level ("user", "channel" or "guild"), or None
+        """
+        return self.rate_limiter.hit(
+            message.guild.id,
+            message.channel.id,
+            message.author.id,
+            message.created_at.timestamp()
+        )
+    
+    async def apply_flood_slowmode(self, channel):
+        """Enable slowmode on a channel whose message rate limit is exhausted."""
+        if getattr(channel, 'slowmode_delay', 0) >= self.FLOOD_SLOWMODE:
+            return
+        try:
+            await self.actions.run(
+                'slowmode',
+                lambda: channel.edit(slowmode_delay=self.FLOOD_SLOWMODE, reason="Auto-mod: channel flood"),
+                target=channel.id,
+                route=('channel', channel.id)
+            )
+        except discord.Forbidden:
+            print(f"Cannot enable slowmode in {channel} - missing permissions")
+    
+    def get_history_scanner(self) -> HistoryScanner:
+        """Get the history scanner, starting its detection pool on first use."""
+        if self.history_scanner is None:
+            self.history_scanner = HistoryScanner(
+                create_pool(AbuseDetector, self.SCAN_WORKERS),
+                self.forensics_logger.log_evidence,
+                rest_share=self.SCAN_REST_SHARE
+            )
+        return self.history_scanner
+    
+    async def close(self):
+        """Flush pending auto-mod deletions and logs before disconnecting."""
+        for task in self.history_scans.values():
+            task.cancel()  # Checkpoints are saved per page, so scans resume later
+        if self.history_scanner is not None:
+            self.history_scanner.executor.shutdown(wait=False, cancel_futures=True)
+        self.loop_monitor.stop()
+        await self.deletion_queue.close()
+        await self.log_outbox.close()
+        await self.actions.close()
+        if self.state is not None:
+            await self.write_shared_state()
+        await super().close()
+    
+    async def cluster_heartbeat(self):
+        """Publish this worker's shards and guild count to the shared state."""
+        await self.wait_until_ready()
+        while not self.is_closed():
+            latency = self.latency if self.latency == self.latency else 0.0  # NaN before the first heartbeat
+            self.state.publish_shard_status(self.worker_id, list(self.shard_ids or [0]), len(self.guilds), latency)
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+    
+    async def flush_shared_state(self):
+        """Periodically write batched shared state, off the message path."""
+        while not self.is_closed():
+            await asyncio.sleep(self.STATE_FLUSH_INTERVAL)
+            await self.write_shared_state()
+    
+    async def write_shared_state(self):
+        """Add pending flagged messages to the shared counter and export warnings.json if it changed."""
+        flagged, self.flagged_pending = self.flagged_pending, 0
+        if flagged:
+            try:
+                await asyncio.to_thread(self.state.incr, 'flagged_messages', flagged)
+            except Exception as e:
+                self.flagged_pending += flagged
+                print(f"❌ Failed to update shared counters: {e}")
+        if self.forensics_logger.warnings_dirty:
+            self.forensics_logger.warnings_dirty = False
             try:
-                channel = self.get_channel(int(channel_id))
-                if channel:
-                    await channel.send(embed=embed)
+                await asyncio.to_thread(self.forensics_logger.export_warnings)
             except Exception as e:
-                print(f"Failed to send log to channel: {e}")
+                self.forensics_logger.warnings_dirty = True
+                print(f"❌ Failed to export warnings: {e}")
+    
+    async def materialize_csv(self):
+        """Keep abuse_evidence.csv caught up with the evidence log, off the message path."""
+        while not self.is_closed():
+            try:
+                await asyncio.to_thread(self.forensics_logger.csv_view.materialize)
+            except Exception as e:
+                print(f"❌ Failed to update evidence CSV: {e}")
+            await asyncio.sleep(self.CSV_INTERVAL)
+    
+    async def purge_evidence(self):
+        """Drop evidence older than the retention period, releasing its stored content."""
+        while not self.is_closed():
+            try:
+                purged = await asyncio.to_thread(self.forensics_logger.purge_evidence, self.evidence_retention_days)
+                if purged:
+                    print(f"🗑️ Purged {purged} evidence records older than {self.evidence_retention_days} days")
+            except Exception as e:
+                print(f"❌ Failed to purge evidence: {e}")
+            await asyncio.sleep(self.PURGE_INTERVAL)
     
     async def setup_hook(self):
         """Setup hook for slash commands."""
+        self.loop_monitor.start()
+        self.loop.create_task(self.watch_config())
+        if self.state is None or self.worker_id == 0:
+            self.loop.create_task(self.materialize_csv())  # One worker keeps the shared CSV current
+            if self.evidence_retention_days is not None:
+                self.loop.create_task(self.purge_evidence())
+        if self.state is not None:
+            self.loop.create_task(self.cluster_heartbeat())
+            self.loop.create_task(self.flush_shared_state())
+            if self.worker_id != 0:
+                return  # Worker 0 syncs commands for the whole cluster
         try:
-            synced = await self.tree.sync()
-            print(f"✅ Synced {len(synced)} slash commands")
+            count, elapsed = await sync_if_changed(self.tree, self.application_id, self.command_sync)
+            if count is None:
+                print(f"⏭️ Slash commands unchanged, sync skipped ({elapsed * 1000:.0f} ms)")
+            else:
+                print(f"✅ Synced {count} slash commands ({elapsed * 1000:.0f} ms)")
         except Exception as e:
             print(f"❌ Failed to sync commands: {e}")
         
@@ -453,28 +701,23 @@ class Guardify(commands.Bot):
                 )
                 embed.set_footer(text="Need help? Use /support")
                 
-                try:
-                    await channel.send(embed=embed)
-                except:
-                    pass
+                self.actions.submit('notice', lambda: channel.send(embed=embed), route=('channel', channel.id))
                 break
     
     async def on_member_join(self, member: discord.Member):
         """Send welcome message when a member joins the server."""
-        guild_id = str(member.guild.id)
-        
         # Check if welcome is configured for this guild
-        if guild_id not in self.welcome_channels:
+        channel_id = self.config.get(member.guild.id, 'welcome_channel')
+        if not channel_id:
             return
         
-        channel_id = self.welcome_channels[guild_id]
         channel = self.get_channel(int(channel_id))
         
         if not channel:
             return
         
         # Get custom message or use default
-        custom_message = self.welcome_messages.get(guild_id, "")
+        custom_message = self.config.get(member.guild.id, 'welcome_message') or ""
         
         # Replace placeholders
         if custom_message:
@@ -494,75 +737,84 @@ class Guardify(commands.Bot):
         embed.set_thumbnail(url=member.display_avatar.url)
         embed.set_footer(text=f"Member #{member.guild.member_count}")
         
-        try:
-            await channel.send(embed=embed)
-        except Exception as e:
-            print(f"Failed to send welcome message: {e}")
+        self.actions.submit('notice', lambda: channel.send(embed=embed), route=('channel', channel.id))
         
     async def on_message(self, message: discord.Message):
         """Process every message for abuse detection."""
         if message.author == self.user or message.author.bot:
             return
         
-        # Check for spam
-        if message.guild and self.abuse_detector.check_spam(message.author.id, message.created_at):
-            if self.auto_mod_enabled.get(message.guild.id, False):
-                try:
-                    await message.delete()
-                    await message.channel.send(
-                        f"⚠️ {message.author.mention}, please slow down! (Spam detected)",
-                        delete_after=5
-                    )
-                except:
-                    pass
-        
-        # Analyze message
-        analysis = self.abuse_detector.analyze_message(message.content)
-        
-        # Log and handle if abusive
-        if analysis['is_abusive']:
-            self.forensics_logger.log_evidence(message, analysis)
+        metrics = self.metrics
+        metrics.inc('messages_total')
+        with metrics.stage('total'):
+            # Check for spam
+            with metrics.stage('spam_check'):
+                if message.guild:
+                    self.flood_tracker.record(message.guild.id, message.author.id, message.content)
+                spam_level = self.check_spam(message) if message.guild else None
+            if spam_level:
+                metrics.inc('spam_hits_total', level=spam_level)
+                if self.config.get(message.guild.id, 'auto_mod'):
+                    self.deletion_queue.delete(message)
+                    self.deletion_queue.notify(message.channel, message.author, "please slow down! (Spam detected)")
+                    if spam_level == CHANNEL:
+                        await self.apply_flood_slowmode(message.channel)
             
-            # Auto-moderation if enabled
-            if message.guild and self.auto_mod_enabled.get(message.guild.id, False):
-                await self.handle_abusive_message(message, analysis)
-        
-        await self.process_commands(message)
+            # Analyze message
+            with metrics.stage('detection'):
+                keywords = self.lexicons.get(message.guild.id) if message.guild else None
+                analysis = self.abuse_detector.analyze_message(message.content, keywords)
+            
+            # Log and handle if abusive
+            if analysis['is_abusive']:
+                metrics.inc('messages_flagged_total')
+                with metrics.stage('evidence_write'):
+                    await asyncio.to_thread(self.forensics_logger.log_evidence, message, analysis)
+                if self.state is not None:
+                    self.flagged_pending += 1  # Added to the shared counter in batches
+                
+                # Auto-moderation if enabled
+                if message.guild and self.config.get(message.guild.id, 'auto_mod'):
+                    with metrics.stage('moderation'):
+                        await self.handle_abusive_message(message, analysis)
+            
+            await self.process_commands(message)
     
     async def handle_abusive_message(self, message: discord.Message, analysis: Dict):
         """Handle abusive message with appropriate action."""
         try:
-            # Delete the message
-            await message.delete()
+            # Queue the message for (bulk) deletion
+            self.deletion_queue.delete(message)
             
             # Add warning
-            warning_count = self.forensics_logger.add_warning(
-                str(message.author.id),
-                str(message.guild.id),
-                f"Abusive language (Severity: {analysis['severity']})"
-            )
+            with self.metrics.stage('warning_write'):
+                warning_count = await asyncio.to_thread(
+                    self.forensics_logger.add_warning,
+                    str(message.author.id),
+                    str(message.guild.id),
+                    f"Abusive language (Severity: {analysis['severity']})"
+                )
             
-            # Create warning embed
-            embed = discord.Embed(
-                title="⚠️ Warning Issued",
-                description=f"{message.author.mention}, your message was removed for violating server rules.",
-                color=discord.Color.orange()
-            )
-            embed.add_field(name="Reason", value="Abusive/Inappropriate Language", inline=False)
-            embed.add_field(name="Warnings", value=f"{warning_count}/3", inline=True)
-            embed.add_field(name="Severity", value=analysis['severity'].upper(), inline=True)
+            # Build the user's line for the channel notice
+            notice = f"Abusive/Inappropriate Language ({analysis['severity'].upper()}) · Warnings: {warning_count}/3"
             
             # Take action based on warning count
             if warning_count >= 3:
                 try:
-                    await message.author.timeout(timedelta(hours=1), reason="3 warnings for abusive behavior")
-                    embed.add_field(name="Action", value="⏱️ Timed out for 1 hour", inline=False)
-                except:
-                    pass
+                    await self.actions.run(
+                        'timeout',
+                        lambda: message.author.timeout(timedelta(hours=1), reason="3 warnings for abusive behavior"),
+                        target=message.author.id,
+                        route=('guild', message.guild.id),
+                        params=timedelta(hours=1)
+                    )
+                    notice += " · ⏱️ Timed out for 1 hour"
+                except discord.HTTPException as e:
+                    print(f"Failed to timeout {message.author}: {e}")
             elif warning_count >= 2:
-                embed.set_footer(text="⚠️ Next warning will result in a timeout")
+                notice += " · Next warning will result in a timeout"
             
-            await message.channel.send(embed=embed, delete_after=10)
+            self.deletion_queue.notify(message.channel, message.author, notice)
             
             # Send log to log channel
             log_embed = discord.Embed(
@@ -592,7 +844,34 @@ intents.messages = True
 intents.guilds = True
 intents.members = True
 
-bot = Guardify(command_prefix='!', intents=intents)
+
+class ShardedGuardify(Guardify, commands.AutoShardedBot):
+    """Guardify running a subset of the bot's shards (one cluster worker)."""
+
+
+def create_bot() -> Guardify:
+    """
+    Create the bot, as a cluster worker when cluster.py has set
+    GUARDIFY_SHARD_IDS / GUARDIFY_SHARD_COUNT / GUARDIFY_STATE_DB.
+    Evidence older than GUARDIFY_EVIDENCE_RETENTION_DAYS, if set, is purged.
+    """
+    retention = os.getenv('GUARDIFY_EVIDENCE_RETENTION_DAYS')
+    retention_days = int(retention) if retention else None
+    shard_ids = os.getenv('GUARDIFY_SHARD_IDS')
+    if not shard_ids:
+        return Guardify(command_prefix='!', intents=intents, evidence_retention_days=retention_days)
+    return ShardedGuardify(
+        command_prefix='!',
+        intents=intents,
+        shard_ids=[int(shard_id) for shard_id in shard_ids.split(',')],
+        shard_count=int(os.environ['GUARDIFY_SHARD_COUNT']),
+        state=SharedState(os.getenv('GUARDIFY_STATE_DB', 'forensics_logs/shared_state.db')),
+        worker_id=int(os.getenv('GUARDIFY_WORKER_ID', '0')),
+        evidence_retention_days=retention_days
+    )
+
+
+bot = create_bot()
 
 
 # ============= MODERATION COMMANDS =============
@@ -605,7 +884,8 @@ async def warn(ctx, member: discord.Member, *, reason: str = "No reason provided
         await ctx.send("❌ Cannot warn bots!", ephemeral=True)
         return
     
-    warning_count = bot.forensics_logger.add_warning(
+    warning_count = await asyncio.to_thread(
+        bot.forensics_logger.add_warning,
         str(member.id),
         str(ctx.guild.id),
         reason
@@ -621,8 +901,6 @@ async def warn(ctx, member: discord.Member, *, reason: str = "No reason provided
     embed.add_field(name="Total Warnings", value=f"{warning_count}/3", inline=True)
     embed.add_field(name="Reason", value=reason, inline=False)
     
-    await ctx.send(embed=embed)
-    
     # Log to channel
     log_embed = discord.Embed(
         title="⚠️ User Warned",
@@ -633,20 +911,19 @@ async def warn(ctx, member: discord.Member, *, reason: str = "No reason provided
     log_embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
     log_embed.add_field(name="Warnings", value=f"{warning_count}/3", inline=True)
     log_embed.add_field(name="Reason", value=reason, inline=False)
-    await bot.log_to_channel(ctx.guild.id, log_embed)
     
     # Try to DM the user
-    try:
-        dm_embed = discord.Embed(
-            title=f"⚠️ Warning from {ctx.guild.name}",
-            description=f"You have been warned by a moderator.",
-            color=discord.Color.orange()
-        )
-        dm_embed.add_field(name="Reason", value=reason)
-        dm_embed.add_field(name="Warnings", value=f"{warning_count}/3")
-        await member.send(embed=dm_embed)
-    except:
-        pass
+    dm_embed = discord.Embed(
+        title=f"⚠️ Warning from {ctx.guild.name}",
+        description=f"You have been warned by a moderator.",
+        color=discord.Color.orange()
+    )
+    dm_embed.add_field(name="Reason", value=reason)
+    dm_embed.add_field(name="Warnings", value=f"{warning_count}/3")
+    bot.actions.submit('dm', lambda: member.send(embed=dm_embed), route=('dm', member.id))
+    
+    # Reply and log concurrently (the DM is already queued)
+    await asyncio.gather(ctx.send(embed=embed), bot.log_to_channel(ctx.guild.id, log_embed))
 
 
 @bot.hybrid_command(name='warnings', description='View warnings for a user')
@@ -737,22 +1014,21 @@ async def kick(ctx, member: discord.Member, *, reason: str = "No reason provided
     embed.add_field(name="Reason", value=reason, inline=False)
     
     try:
-        # Try to DM user
+        # Try to DM user (before the kick, and at the kick's priority)
         dm_embed = discord.Embed(
             title=f"Kicked from {ctx.guild.name}",
             description=f"You have been kicked by a moderator.",
             color=discord.Color.red()
         )
         dm_embed.add_field(name="Reason", value=reason)
-        await member.send(embed=dm_embed)
-    except:
-        pass
+        await bot.actions.run('dm', lambda: member.send(embed=dm_embed), route=('dm', member.id), priority=SAFETY)
+    except discord.HTTPException:
+        pass  # User has DMs disabled
     
-    await member.kick(reason=reason)
-    await ctx.send(embed=embed)
+    await bot.actions.run('kick', lambda: member.kick(reason=reason), target=member.id, route=('guild', ctx.guild.id))
     
-    # Log to channel
-    await bot.log_to_channel(ctx.guild.id, embed)
+    # Reply and log to channel concurrently
+    await asyncio.gather(ctx.send(embed=embed), bot.log_to_channel(ctx.guild.id, embed))
 
 
 @bot.hybrid_command(name='ban', description='Ban a user from the server')
@@ -773,21 +1049,26 @@ async def ban(ctx, member: discord.Member, *, reason: str = "No reason provided"
     embed.add_field(name="Reason", value=reason, inline=False)
     
     try:
+        # Try to DM user (before the ban, and at the ban's priority)
         dm_embed = discord.Embed(
             title=f"Banned from {ctx.guild.name}",
             description=f"You have been permanently banned.",
             color=discord.Color.dark_red()
         )
         dm_embed.add_field(name="Reason", value=reason)
-        await member.send(embed=dm_embed)
-    except:
-        pass
-    
-    await member.ban(reason=reason, delete_message_days=1)
-    await ctx.send(embed=embed)
+        await bot.actions.run('dm', lambda: member.send(embed=dm_embed), route=('dm', member.id), priority=SAFETY)
+    except discord.HTTPException:
+        pass  # User has DMs disabled
+    
+    await bot.actions.run(
+        'ban',
+        lambda: member.ban(reason=reason, delete_message_days=1),
+        target=member.id,
+        route=('guild', ctx.guild.id)
+    )
     
-    # Log to channel
-    await bot.log_to_channel(ctx.guild.id, embed)
+    # Reply and log to channel concurrently
+    await asyncio.gather(ctx.send(embed=embed), bot.log_to_channel(ctx.guild.id, embed))
 
 
 @bot.hybrid_command(name='timeout', description='Timeout a user')
@@ -798,7 +1079,13 @@ async def timeout(ctx, member: discord.Member, duration: int, *, reason: str = "
         await ctx.send("❌ You cannot timeout this user!", ephemeral=True)
         return
     
-    await member.timeout(timedelta(minutes=duration), reason=reason)
+    await bot.actions.run(
+        'timeout',
+        lambda: member.timeout(timedelta(minutes=duration), reason=reason),
+        target=member.id,
+        route=('guild', ctx.guild.id),
+        params=timedelta(minutes=duration)
+    )
     
     embed = discord.Embed(
         title="⏱️ User Timed Out",
@@ -809,10 +1096,209 @@ async def timeout(ctx, member: discord.Member, duration: int, *, reason: str = "
     embed.add_field(name="Duration", value=f"{duration} minutes", inline=True)
     embed.add_field(name="Reason", value=reason, inline=False)
     
-    await ctx.send(embed=embed)
+    # Reply and log to channel concurrently
+    await asyncio.gather(ctx.send(embed=embed), bot.log_to_channel(ctx.guild.id, embed))
+
+
+# ============= RAID RESPONSE COMMANDS =============
+
+MASS_ACTION_LIMIT = 1000  # Most users a single mass command will act on
+MASS_ACTION_CONCURRENCY = 25  # Member actions queued per mass command; the guild's route limit paces them
+BULK_BAN_CHUNK = 200  # Discord's bulk ban limit
+
+
+def resolve_mass_targets(ctx, users: str = None, joined_within: int = None, fingerprint: str = None):
+    """
+    Collect user IDs for a mass action from an explicit list, a join window
+    (minutes) and/or a flood fingerprint from /floods.
     
-    # Log to channel
-    await bot.log_to_channel(ctx.guild.id, embed)
+    Returns:
+        (eligible user IDs, number of users skipped for safety)
+    """
+    ids = parse_user_ids(users)
+    if joined_within:
+        cutoff = datetime.now(timezone.utc) - timedelta(minutes=joined_within)
+        ids += [m.id for m in ctx.guild.members if m.joined_at and m.joined_at >= cutoff]
+    if fingerprint:
+        ids += bot.flood_tracker.authors(ctx.guild.id, fingerprint.strip())
+    
+    eligible, skipped, seen = [], 0, set()
+    protected = {ctx.author.id, bot.user.id, ctx.guild.owner_id}
+    for user_id in ids:
+        if user_id in seen:
+            continue
+        seen.add(user_id)
+        member = ctx.guild.get_member(user_id)
+        if user_id in protected or (member and (member.top_role >= ctx.author.top_role
+                                                 or member.top_role >= ctx.guild.me.top_role)):
+            skipped += 1
+            continue
+        eligible.append(user_id)
+    return eligible[:MASS_ACTION_LIMIT], skipped + max(len(eligible) - MASS_ACTION_LIMIT, 0)
+
+
+async def report_mass_progress(status, verb: str, done: int, total: int):
+    """Edit the status message of a running mass action."""
+    try:
+        await status.edit(content=f"⏳ {verb} {done}/{total} users...")
+    except discord.HTTPException:
+        pass
+
+
+async def finish_mass_action(ctx, status, title: str, verb: str, done: int, failed: int,
+                             skipped: int, reason: str, started: float):
+    """Post the summary of a mass action and log it."""
+    embed = discord.Embed(
+        title=title,
+        color=discord.Color.dark_red(),
+        timestamp=datetime.utcnow()
+    )
+    embed.add_field(name=verb, value=str(done), inline=True)
+    embed.add_field(name="Failed", value=str(failed), inline=True)
+    embed.add_field(name="Skipped", value=str(skipped), inline=True)
+    embed.add_field(name="Moderator", value=ctx.author.mention, inline=True)
+    embed.add_field(name="Duration", value=f"{asyncio.get_running_loop().time() - started:.1f}s", inline=True)
+    embed.add_field(name="Reason", value=reason, inline=False)
+    
+    async def update_status():
+        try:
+            await status.edit(content=None, embed=embed)
+        except discord.HTTPException:
+            await ctx.send(embed=embed)
+    
+    await asyncio.gather(update_status(), bot.log_to_channel(ctx.guild.id, embed))
+
+
+@bot.hybrid_command(name='massban', description='Ban many users at once (raid response)')
+@commands.has_permissions(ban_members=True)
+async def massban(ctx, users: str = None, joined_within: int = None, fingerprint: str = None,
+                  *, reason: str = "Raid"):
+    """Ban users by list of mentions/IDs, by join window (minutes) or by /floods fingerprint."""
+    targets, skipped = resolve_mass_targets(ctx, users, joined_within, fingerprint)
+    if not targets:
+        await ctx.send("❌ No eligible users matched.", ephemeral=True)
+        return
+    
+    started = asyncio.get_running_loop().time()
+    status = await ctx.send(f"⏳ Banning 0/{len(targets)} users...")
+    banned, failed = 0, 0
+    
+    for chunk in chunked(targets, BULK_BAN_CHUNK):
+        try:
+            result = await bot.actions.run(
+                'bulk_ban',
+                lambda chunk=chunk: ctx.guild.bulk_ban(
+                    [discord.Object(id=user_id) for user_id in chunk],
+                    reason=f"{reason} | Mass ban by {ctx.author}",
+                    delete_message_seconds=86400
+                ),
+                route=('guild', ctx.guild.id)
+            )
+            banned += len(result.banned)
+            failed += len(result.failed)
+        except discord.Forbidden:
+            # Bulk ban also needs Manage Server; fall back to individual bans
+            done, errors = await fan_out(
+                chunk,
+                lambda user_id: bot.actions.run(
+                    'ban',
+                    lambda: ctx.guild.ban(discord.Object(id=user_id), reason=f"{reason} | Mass ban by {ctx.author}",
+                                          delete_message_seconds=86400),
+                    target=user_id,
+                    route=('guild', ctx.guild.id)
+                ),
+                concurrency=MASS_ACTION_CONCURRENCY,
+                progress=lambda d, t: report_mass_progress(status, "Banning", banned + d, len(targets))
+            )
+            banned += len(done)
+            failed += len(errors)
+        await report_mass_progress(status, "Banning", banned + failed, len(targets))
+    
+    await finish_mass_action(ctx, status, "🔨 Mass Ban Complete", "Banned", banned, failed, skipped, reason, started)
+
+
+@bot.hybrid_command(name='masskick', description='Kick many users at once (raid response)')
+@commands.has_permissions(kick_members=True)
+async def masskick(ctx, users: str = None, joined_within: int = None, fingerprint: str = None,
+                   *, reason: str = "Raid"):
+    """Kick users by list of mentions/IDs, by join window (minutes) or by /floods fingerprint."""
+    targets, skipped = resolve_mass_targets(ctx, users, joined_within, fingerprint)
+    members = [m for m in map(ctx.guild.get_member, targets) if m]
+    skipped += len(targets) - len(members)
+    if not members:
+        await ctx.send("❌ No eligible members matched.", ephemeral=True)
+        return
+    
+    started = asyncio.get_running_loop().time()
+    status = await ctx.send(f"⏳ Kicking 0/{len(members)} users...")
+    kicked, failed = await fan_out(
+        members,
+        lambda member: bot.actions.run(
+            'kick',
+            lambda: member.kick(reason=f"{reason} | Mass kick by {ctx.author}"),
+            target=member.id,
+            route=('guild', ctx.guild.id)
+        ),
+        concurrency=MASS_ACTION_CONCURRENCY,
+        progress=lambda done, total: report_mass_progress(status, "Kicking", done, total)
+    )
+    
+    await finish_mass_action(ctx, status, "👢 Mass Kick Complete", "Kicked", len(kicked), len(failed),
+                             skipped, reason, started)
+
+
+@bot.hybrid_command(name='masstimeout', description='Timeout many users at once (raid response)')
+@commands.has_permissions(moderate_members=True)
+async def masstimeout(ctx, duration: int, users: str = None, joined_within: int = None,
+                      fingerprint: str = None, *, reason: str = "Raid"):
+    """Timeout users (duration in minutes) by list, join window (minutes) or /floods fingerprint."""
+    targets, skipped = resolve_mass_targets(ctx, users, joined_within, fingerprint)
+    members = [m for m in map(ctx.guild.get_member, targets) if m]
+    skipped += len(targets) - len(members)
+    if not members:
+        await ctx.send("❌ No eligible members matched.", ephemeral=True)
+        return
+    
+    started = asyncio.get_running_loop().time()
+    status = await ctx.send(f"⏳ Timing out 0/{len(members)} users...")
+    timed_out, failed = await fan_out(
+        members,
+        lambda member: bot.actions.run(
+            'timeout',
+            lambda: member.timeout(timedelta(minutes=duration), reason=f"{reason} | Mass timeout by {ctx.author}"),
+            target=member.id,
+            route=('guild', ctx.guild.id),
+            params=timedelta(minutes=duration)
+        ),
+        concurrency=MASS_ACTION_CONCURRENCY,
+        progress=lambda done, total: report_mass_progress(status, "Timing out", done, total)
+    )
+    
+    await finish_mass_action(ctx, status, "⏱️ Mass Timeout Complete", "Timed out", len(timed_out), len(failed),
+                             skipped, reason, started)
+
+
+@bot.hybrid_command(name='floods', description='Show repeated messages posted by many users')
+@commands.has_permissions(manage_messages=True)
+async def floods(ctx):
+    """List recent flood fingerprints for use with the mass commands."""
+    top = bot.flood_tracker.top(ctx.guild.id, limit=5)
+    top = [item for item in top if item[1] > 1]
+    
+    embed = discord.Embed(
+        title="🌊 Recent Floods",
+        color=discord.Color.blue()
+    )
+    if not top:
+        embed.description = "No repeated messages from multiple users in the last 10 minutes."
+    for key, authors, sample in top:
+        embed.add_field(
+            name=f"`{key}` - {authors} users",
+            value=sample or "(no text)",
+            inline=False
+        )
+    embed.set_footer(text="Use /massban fingerprint:<id> or /masstimeout fingerprint:<id>")
+    await ctx.send(embed=embed)
 
 
 @bot.hybrid_command(name='purge', description='Delete multiple messages')
@@ -897,6 +1383,87 @@ async def history(ctx, user: discord.User, limit: int = 5):
     await ctx.send(embed=embed)
 
 
+@bot.hybrid_command(name='scanhistory', description='Scan existing channel history for abuse')
+@commands.has_permissions(administrator=True)
+async def scanhistory(ctx, channel: discord.TextChannel = None, limit: int = None, restart: bool = False):
+    """Scan one channel (or all readable channels) for abuse, resuming from the last checkpoint."""
+    if limit is not None and limit < 1:
+        await ctx.send("❌ The limit must be at least 1 message.", ephemeral=True)
+        return
+    
+    running = bot.history_scans.get(ctx.guild.id)
+    if running and not running.done():
+        await ctx.send("❌ A history scan is already running in this server.", ephemeral=True)
+        return
+    
+    if channel:
+        channels = [channel]
+    else:
+        channels = [c for c in ctx.guild.text_channels if c.permissions_for(ctx.guild.me).read_message_history]
+    if not channels:
+        await ctx.send("❌ No channels I can read.", ephemeral=True)
+        return
+    
+    scanner = bot.get_history_scanner()
+    if restart:
+        for target in channels:
+            scanner.checkpoints.reset(target.id)
+    
+    status = await ctx.send(f"⏳ Scanning history of {len(channels)} channel(s)...")
+    bot.history_scans[ctx.guild.id] = asyncio.get_running_loop().create_task(
+        run_history_scan(ctx, status, scanner, channels, limit)
+    )
+
+
+async def run_history_scan(ctx, status, scanner: HistoryScanner, channels: List, limit: Optional[int]):
+    """Scan channels one after another, reporting progress and a per-channel summary."""
+    results = []
+    last_report = 0.0
+    
+    for position, channel in enumerate(channels, 1):
+        async def progress(channel_id, checkpoint):
+            nonlocal last_report
+            now = asyncio.get_running_loop().time()
+            if now - last_report < 5:
+                return
+            last_report = now
+            try:
+                await status.edit(content=f"⏳ Scanning {channel.mention} ({position}/{len(channels)}): "
+                                          f"{checkpoint['scanned']} messages, {checkpoint['flagged']} flagged")
+            except discord.HTTPException:
+                pass
+        
+        try:
+            results.append((channel, await scanner.scan_channel(channel, limit, progress)))
+        except discord.Forbidden:
+            results.append((channel, None))
+    
+    lines = []
+    for channel, checkpoint in results:
+        if checkpoint is None:
+            lines.append(f"{channel.mention} - ❌ no access")
+            continue
+        severity = checkpoint['severity']
+        state = "✅ complete" if checkpoint['done'] else "⏸️ partial (run again to continue)"
+        lines.append(
+            f"{channel.mention} - {checkpoint['scanned']} scanned, {checkpoint['flagged']} flagged "
+            f"(🔴 {severity['high']} · 🟡 {severity['medium']} · 🟢 {severity['low']}) - {state}"
+        )
+    
+    embed = discord.Embed(
+        title="🔎 History Scan Complete",
+        description="\n".join(lines)[:4000],
+        color=discord.Color.blue(),
+        timestamp=datetime.utcnow()
+    )
+    embed.set_footer(text="Flagged messages are logged as evidence; see /history and /stats")
+    try:
+        await status.edit(content=None, embed=embed)
+    except discord.HTTPException:
+        await ctx.channel.send(embed=embed)
+    await bot.log_to_channel(ctx.guild.id, embed)
+
+
 @bot.hybrid_command(name='stats', description='View moderation statistics')
 @commands.has_permissions(manage_messages=True)
 async def stats(ctx):
@@ -922,9 +1489,147 @@ async def stats(ctx):
         inline=False
     )
     
+    outbox = bot.log_outbox.stats()
+    embed.add_field(
+        name="📬 Log Delivery",
+        value=f"Queued: {outbox['queue_depth']}\n"
+              f"Sent: {outbox['embeds_sent']} embeds in {outbox['messages_sent']} messages\n"
+              f"Avg send latency: {outbox['avg_send_latency'] * 1000:.0f} ms",
+        inline=False
+    )
+    
+    actions = bot.actions.stats()
+    embed.add_field(
+        name="⚙️ Action Queue",
+        value=f"Queued: {actions['queue_depth']} · In flight: {actions['inflight']}\n"
+              f"Completed: {actions['completed']} · Failed: {actions['failed']}\n"
+              f"Retried: {actions['retried']} · Merged duplicates: {actions['deduplicated']}",
+        inline=False
+    )
+    
+    if bot.state is not None:
+        cluster = bot.state.cluster_status()
+        embed.add_field(
+            name="🌐 Cluster",
+            value=f"Workers: {len(cluster['workers'])} · Shards: {cluster['shards']}\n"
+                  f"Servers: {cluster['guilds']}\n"
+                  f"Flagged messages (all shards): {bot.state.counter('flagged_messages') + bot.flagged_pending}",
+            inline=False
+        )
+    
     await ctx.send(embed=embed)
 
 
+@bot.hybrid_command(name='perf', description='Show event loop lag and recent blocking calls (bot owner only)')
+@commands.is_owner()
+async def perf(ctx):
+    """Show event loop lag and what blocked it."""
+    perf = bot.loop_monitor.stats()
+    
+    embed = discord.Embed(
+        title="⏱️ Event Loop Performance",
+        color=discord.Color.red() if perf['lag_p99_ms'] >= perf['threshold_ms'] else discord.Color.green(),
+        timestamp=datetime.utcnow()
+    )
+    
+    embed.add_field(
+        name="🔁 Loop Lag (last minute)",
+        value=f"p50: {perf['lag_p50_ms']:.1f} ms · p99: {perf['lag_p99_ms']:.1f} ms\n"
+              f"Max since start: {perf['lag_max_ms']:.0f} ms",
+        inline=False
+    )
+    
+    sites = "\n".join(f"`{site}` ×{count}" for site, count in perf['top_sites'])
+    embed.add_field(
+        name=f"🧱 Stalls over {perf['threshold_ms']} ms: {perf['stalls']}",
+        value=sites or "None recorded",
+        inline=False
+    )
+    
+    last = perf['last_stall']
+    if last:
+        stack = "".join(last['stack'])[-900:]
+        embed.add_field(
+            name=f"📍 Last Stall ({last['duration_ms']:.0f} ms)",
+            value=f"```\n{stack}```",
+            inline=False
+        )
+    
+    await ctx.send(embed=embed, ephemeral=True)
+
+
+@bot.hybrid_command(name='profile', description='Profile live traffic for a number of seconds (bot owner only)')
+@commands.is_owner()
+async def profile(ctx, seconds: int = 30, sort: str = 'cumulative'):
+    """Run cProfile over live traffic and post the top functions and the .pstats file."""
+    if sort not in SORT_KEYS:
+        await ctx.send(f"❌ Sort by one of: {', '.join(SORT_KEYS)}", ephemeral=True)
+        return
+    seconds = max(1, min(seconds, 300))
+    await ctx.defer(ephemeral=True)
+    
+    try:
+        stats, path = await bot.profiler.profile(seconds)
+    except (RuntimeError, ValueError) as e:
+        await ctx.send(f"❌ {e}", ephemeral=True)
+        return
+    
+    rows = top_functions(stats, limit=15, sort=sort)
+    table = "\n".join(f"{row['cumtime']:>8.3f} {row['tottime']:>8.3f} {row['calls']:>8} {row['function'][:60]}"
+                      for row in rows)
+    embed = discord.Embed(
+        title=f"🔬 Profile: {seconds}s of live traffic",
+        description=f"```\n{'cumtime':>8} {'tottime':>8} {'calls':>8} function\n{table}```"[:4000],
+        color=discord.Color.blue(),
+        timestamp=datetime.utcnow()
+    )
+    embed.set_footer(text=f"Sorted by {sort} · open the attachment with python -m pstats")
+    
+    await ctx.send(embed=embed, file=discord.File(path, filename=os.path.basename(path)), ephemeral=True)
+
+
+@bot.hybrid_command(name='memprofile', description='Trace memory growth by allocation site (bot owner only)')
+@commands.is_owner()
+async def memprofile(ctx, action: str = 'diff'):
+    """Start tracing memory, report growth since the start, or stop tracing."""
+    action = action.lower()
+    if action not in ['start', 'diff', 'stop']:
+        await ctx.send("❌ Use: `/memprofile start`, `/memprofile diff` or `/memprofile stop`", ephemeral=True)
+        return
+    
+    if action == 'start':
+        bot.memory_profiler.start()
+        await ctx.send("🧠 Memory tracing started. Run `/memprofile diff` later to see what grew.", ephemeral=True)
+        return
+    if action == 'stop':
+        bot.memory_profiler.stop()
+        await ctx.send("🧠 Memory tracing stopped.", ephemeral=True)
+        return
+    
+    try:
+        report = bot.memory_profiler.diff()
+    except RuntimeError as e:
+        await ctx.send(f"❌ {e}", ephemeral=True)
+        return
+    
+    embed = discord.Embed(
+        title=f"🧠 Memory Growth over {report['elapsed'] / 60:.1f} min",
+        description=f"Traced: {report['traced_bytes'] / 2 ** 20:.1f} MiB · Peak: {report['peak_bytes'] / 2 ** 20:.1f} MiB",
+        color=discord.Color.blue(),
+        timestamp=datetime.utcnow()
+    )
+    
+    sites = "\n".join(f"+{item['size_diff'] / 1024:,.0f} KiB ({item['count_diff']:+,} blocks) {item['site']}"
+                      for item in report['growth'])
+    embed.add_field(name="📈 Top Allocation Sites", value=f"```\n{sites[:1000]}```" if sites else "No growth", inline=False)
+    
+    points = "\n".join(f"{name}: {point['entries']:,} ({point['change']:+,})"
+                       for name, point in report['growth_points'].items())
+    embed.add_field(name="📦 Tracked State", value=f"```\n{points[:1000]}```", inline=False)
+    
+    await ctx.send(embed=embed, ephemeral=True)
+
+
 @bot.hybrid_command(name='export', description='Export forensics data for analysis')
 @commands.has_permissions(administrator=True)
 async def export_data(ctx):
@@ -934,6 +1639,8 @@ async def export_data(ctx):
     Perfect for importing into Excel, pandas, or data visualization tools.
     """
     csv_path = bot.forensics_logger.csv_file
+    await ctx.defer()
+    await asyncio.to_thread(bot.forensics_logger.csv_view.materialize)  # Include cases since the last update
     
     if not os.path.exists(csv_path):
         await ctx.send("❌ No evidence data available to export.", ephemeral=True)
@@ -1045,23 +1752,17 @@ async def setwelcome(ctx, channel: discord.TextChannel = None, *, message: str =
     """
     if channel is None:
         # Clear welcome
-        if str(ctx.guild.id) in bot.welcome_channels:
-            del bot.welcome_channels[str(ctx.guild.id)]
-            if str(ctx.guild.id) in bot.welcome_messages:
-                del bot.welcome_messages[str(ctx.guild.id)]
-            bot.save_welcome_config()
+        if bot.config.get(ctx.guild.id, 'welcome_channel'):
+            bot.config.update(ctx.guild.id, welcome_channel=None, welcome_message=None)
             await ctx.send("✅ Welcome messages disabled.", ephemeral=True)
         else:
             await ctx.send("❌ Welcome messages are not currently enabled.", ephemeral=True)
     else:
-        # Set welcome channel
-        bot.welcome_channels[str(ctx.guild.id)] = str(channel.id)
-        
-        # Set custom message if provided
+        # Set welcome channel, and the custom message if provided
         if message:
-            bot.welcome_messages[str(ctx.guild.id)] = message
-        
-        bot.save_welcome_config()
+            bot.config.update(ctx.guild.id, welcome_channel=channel.id, welcome_message=message)
+        else:
+            bot.config.set(ctx.guild.id, 'welcome_channel', channel.id)
         
         embed = discord.Embed(
             title="✅ Welcome Messages Enabled",
@@ -1103,16 +1804,14 @@ async def setlog(ctx, channel: discord.TextChannel = None):
     """Set or clear the log channel."""
     if channel is None:
         # Clear log channel
-        if str(ctx.guild.id) in bot.log_channels:
-            del bot.log_channels[str(ctx.guild.id)]
-            bot.save_log_channels()
+        if bot.config.get(ctx.guild.id, 'log_channel'):
+            bot.config.set(ctx.guild.id, 'log_channel', None)
             await ctx.send("✅ Log channel cleared. Moderation logs will no longer be posted.", ephemeral=True)
         else:
             await ctx.send("❌ No log channel is currently set.", ephemeral=True)
     else:
         # Set log channel
-        bot.log_channels[str(ctx.guild.id)] = str(channel.id)
-        bot.save_log_channels()
+        bot.config.set(ctx.guild.id, 'log_channel', channel.id)
         
         embed = discord.Embed(
             title="✅ Log Channel Set",
@@ -1139,7 +1838,7 @@ async def automod(ctx, action: str):
         await ctx.send("❌ Use: `/automod enable` or `/automod disable`", ephemeral=True)
         return
     
-    bot.auto_mod_enabled[ctx.guild.id] = (action.lower() == 'enable')
+    bot.config.set(ctx.guild.id, 'auto_mod', action.lower() == 'enable')
     
     embed = discord.Embed(
         title="🛡️ Auto-Moderation " + ("Enabled" if action.lower() == 'enable' else "Disabled"),
@@ -1150,13 +1849,82 @@ async def automod(ctx, action: str):
     await ctx.send(embed=embed)
 
 
+@bot.hybrid_command(name='spamlimit', description='View or set spam rate limits')
+@commands.has_permissions(administrator=True)
+async def spamlimit(ctx, level: str = None, messages: int = None, seconds: float = 10.0):
+    """View or set the user, channel or guild message rate limit (0 messages disables)."""
+    if level is None:
+        limits = bot.rate_limiter.limits(ctx.guild.id)
+        embed = discord.Embed(
+            title="🚦 Spam Rate Limits",
+            color=discord.Color.blue()
+        )
+        for name in LEVELS:
+            limit = limits[name]
+            value = f"{limit[0]} messages per {limit[1]:g} seconds" if limit else "Disabled"
+            embed.add_field(name=name.title(), value=value, inline=False)
+        embed.set_footer(text="Use /spamlimit <user|channel|guild> <messages> [seconds] to change")
+        await ctx.send(embed=embed)
+        return
+    
+    if level.lower() not in LEVELS or messages is None or messages < 0 or seconds <= 0:
+        await ctx.send("❌ Use: `/spamlimit <user|channel|guild> <messages> [seconds]`", ephemeral=True)
+        return
+    
+    limits = dict(bot.config.get(ctx.guild.id, 'spam_limits'))
+    limits[level.lower()] = [messages, seconds] if messages else None
+    bot.config.set(ctx.guild.id, 'spam_limits', limits)  # Applied to the rate limiter on change
+    if messages:
+        await ctx.send(f"✅ {level.title()} limit set to {messages} messages per {seconds:g} seconds")
+    else:
+        await ctx.send(f"✅ {level.title()} limit disabled")
+
+
+@bot.hybrid_command(name='lexicon', description='View or change the abusive keyword list for this server')
+@commands.has_permissions(administrator=True)
+async def lexicon(ctx, action: str = None, *, word: str = None):
+    """Add or remove keywords for this server, or reset to the default list."""
+    added = list(bot.config.get(ctx.guild.id, 'lexicon_add'))
+    removed = list(bot.config.get(ctx.guild.id, 'lexicon_remove'))
+    
+    if action is None:
+        embed = discord.Embed(
+            title="📖 Server Lexicon",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="➕ Added", value=", ".join(added) or "None", inline=False)
+        embed.add_field(name="➖ Removed", value=", ".join(removed) or "None", inline=False)
+        embed.set_footer(text="Use /lexicon <add|remove> <word> or /lexicon reset")
+        await ctx.send(embed=embed)
+        return
+    
+    action = action.lower()
+    if action == 'reset':
+        bot.config.update(ctx.guild.id, lexicon_add=None, lexicon_remove=None)
+        await ctx.send("✅ Lexicon reset to the default keyword list.")
+        return
+    if action not in ('add', 'remove') or not word:
+        await ctx.send("❌ Use: `/lexicon <add|remove> <word>` or `/lexicon reset`", ephemeral=True)
+        return
+    
+    word = word.lower().strip()
+    if action == 'add':
+        added = added + [word] if word not in added else added
+        removed = [w for w in removed if w != word]
+    else:
+        removed = removed + [word] if word not in removed else removed
+        added = [w for w in added if w != word]
+    bot.config.update(ctx.guild.id, lexicon_add=added or None, lexicon_remove=removed or None)
+    await ctx.send(f"✅ `{word}` {'added to' if action == 'add' else 'removed from'} this server's lexicon.")
+
+
 @bot.command(name='sync')
 @commands.is_owner()
 async def sync(ctx):
-    """Manually sync slash commands (Owner only)."""
+    """Manually sync slash commands, even if unchanged (Owner only)."""
     try:
-        synced = await bot.tree.sync()
-        await ctx.send(f"✅ Synced {len(synced)} commands!")
+        count, elapsed = await sync_if_changed(bot.tree, bot.application_id, bot.command_sync, force=True)
+        await ctx.send(f"✅ Synced {count} commands in {elapsed:.1f}s!")
     except Exception as e:
         await ctx.send(f"❌ Failed to sync: {e}")
 
@@ -1181,11 +1949,23 @@ async def help_command(ctx):
         inline=False
     )
     
+    embed.add_field(
+        name="🚨 Raid Response",
+        value="`/floods` - Show repeated messages from many users\n"
+              "`/massban` - Ban by list, join window or fingerprint\n"
+              "`/masskick` - Kick by list, join window or fingerprint\n"
+              "`/masstimeout` - Timeout by list, join window or fingerprint",
+        inline=False
+    )
+    
     embed.add_field(
         name="🔍 Detection Commands",
         value="`/scan` - Scan a message\n"
               "`/history` - View abuse history\n"
+              "`/scanhistory` - Scan existing channel history\n"
               "`/stats` - View statistics\n"
+              "`/perf` - Event loop lag and blocking calls (owner)\n"
+              "`/profile` · `/memprofile` - Live CPU and memory profiling (owner)\n"
               "`/warnings` - View user warnings\n"
               "`/clearwarnings` - Clear all warnings",
         inline=False
@@ -1195,6 +1975,8 @@ async def help_command(ctx):
         name="⚙️ Settings",
         value="`/automod enable/disable` - Toggle auto-moderation\n"
               "`/setlog #channel` - Set moderation log channel\n"
+              "`/spamlimit` - View or set spam rate limits\n"
+              "`/lexicon` - Customize abusive keywords\n"
               "`/setwelcome #channel [message]` - Set welcome messages",
         inline=False
     )
@@ -1213,6 +1995,32 @@ async def help_command(ctx):
     await ctx.send(embed=embed)
 
 
+# Health and metrics server, enabled by setting GUARDIFY_METRICS_PORT
+app = Flask('guardify')
+
+@app.route('/health')
+def health():
+    return {"status": "online", "bot": str(bot.user) if bot.is_ready() else "connecting", "worker": bot.worker_id}
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(bot.metrics.render(), content_type=CONTENT_TYPE)
+
+def start_metrics_server() -> Optional[Thread]:
+    """
+    Serve /health and /metrics in a background thread on GUARDIFY_METRICS_PORT.
+    Cluster workers listen on that port plus their worker ID.
+    """
+    port = os.getenv('GUARDIFY_METRICS_PORT')
+    if not port:
+        return None
+    port = int(port) + bot.worker_id
+    server_thread = Thread(target=app.run, kwargs={'host': '0.0.0.0', 'port': port}, daemon=True)
+    server_thread.start()
+    print(f"Metrics server started on port {port}")
+    return server_thread
+
+
 def main():
     """Main entry point."""
     token = os.getenv('DISCORD_BOT_TOKEN')
@@ -1228,6 +2036,7 @@ def main():
         print("ERROR: Discord bot token not found!")
         return
     
+    start_metrics_server()
     bot.run(token)
 
 
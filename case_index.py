@@ -0,0 +1,206 @@
+"""
+Evidence Case Index
+SQLite index over the evidence log (guild, time, author, channel, severity
+and the record's byte offset) for keyset-paginated case browsing.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    offset INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL,
+    guild_id TEXT,
+    logged_at TEXT NOT NULL,
+    author_id TEXT,
+    channel_id TEXT,
+    severity TEXT
+);
+CREATE INDEX IF NOT EXISTS cases_guild ON cases (guild_id, logged_at, offset);
+CREATE INDEX IF NOT EXISTS cases_author ON cases (guild_id, author_id, logged_at, offset);
+CREATE INDEX IF NOT EXISTS cases_channel ON cases (guild_id, channel_id, logged_at, offset);
+CREATE INDEX IF NOT EXISTS cases_severity ON cases (guild_id, severity, logged_at, offset);
+CREATE INDEX IF NOT EXISTS cases_time ON cases (logged_at, offset);
+CREATE TABLE IF NOT EXISTS index_meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+FILTERS = {'severity': 'severity', 'user': 'author_id', 'channel': 'channel_id'}
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(logged_at: str, offset: int) -> str:
+    """Opaque cursor for the position after a case."""
+    return base64.urlsafe_b64encode(f"{logged_at}|{offset}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """Inverse of `encode_cursor`; ValueError if the cursor is malformed."""
+    try:
+        logged_at, _, offset = base64.urlsafe_b64decode(cursor.encode()).decode().rpartition('|')
+        return logged_at, int(offset)
+    except (UnicodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def end_of(until: str) -> str:
+    """Exclusive logged_at bound for `until`: the next day's start for a bare date."""
+    try:
+        return (date.fromisoformat(until) + timedelta(days=1)).isoformat()
+    except ValueError:
+        return until  # A time
+
+
+class CaseIndex:
+    """
+    Persistent index of the evidence log, newest case first.
+
+    `refresh()` indexes only lines appended since the last call (the read
+    offset survives restarts); a replaced or truncated log is reindexed.
+    `page()` walks an index in (logged_at, offset) order from a cursor, so
+    every page costs O(page size) no matter how deep the moderator scrolls.
+    Records themselves stay in the log and are read back by byte offset.
+    """
+
+    def __init__(self, log_path: str, path: str = "forensics_logs/case_index.db", content_store=None):
+        self.log_path = log_path
+        self.path = path
+        self.content_store = content_store  # Resolves records that reference their content by hash
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()  # One connection shared by request threads
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _meta(self, name: str) -> Optional[int]:
+        row = self.conn.execute("SELECT value FROM index_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self) -> int:
+        """
+        Index new log lines.
+
+        Returns:
+            Number of cases added
+        """
+        with self.lock:
+            try:
+                stat = os.stat(self.log_path)
+            except FileNotFoundError:
+                return 0
+            offset = self._meta('offset') or 0
+            reset = stat.st_ino != self._meta('inode') or stat.st_size < offset
+            if reset:
+                offset = 0
+            elif stat.st_size == offset:
+                return 0
+
+            rows = []
+            with open(self.log_path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # The bot is mid-write; index it next time
+                    start, offset = offset, offset + len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if not isinstance(record, dict):
+                        continue
+                    rows.append((
+                        start, len(line), record.get('guild_id'), record.get('logged_at') or '',
+                        record.get('author_id'), record.get('channel_id'),
+                        (record.get('analysis') or {}).get('severity')
+                    ))
+
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                if reset:
+                    self.conn.execute("DELETE FROM cases")
+                self.conn.executemany("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO index_meta (name, value) VALUES (?, ?)",
+                    [('offset', offset), ('inode', stat.st_ino)]
+                )
+            return len(rows)
+
+    def page(self, guild_id: Optional[str] = None, cursor: Optional[str] = None, limit: int = 50,
+             since: Optional[str] = None, until: Optional[str] = None, **filters) -> Dict:
+        """
+        One page of cases, newest first.
+
+        `filters` may hold severity, user (author ID) and channel (channel ID);
+        `since`/`until` bound logged_at: ISO times (inclusive/exclusive), or
+        dates, whose whole day is included.
+
+        Returns:
+            {"cases": [...], "next_cursor": cursor for the next page or None}
+        """
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        where, params = [], []
+        if guild_id:
+            where.append("guild_id = ?")
+            params.append(str(guild_id))
+        for name, value in filters.items():
+            if value is not None:
+                where.append(f"{FILTERS[name]} = ?")
+                params.append(str(value))
+        if since:
+            where.append("logged_at >= ?")
+            params.append(since)
+        if until:
+            where.append("logged_at < ?")
+            params.append(end_of(until))
+        if cursor:
+            where.append("(logged_at, offset) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        sql = "SELECT offset, length, logged_at FROM cases"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY logged_at DESC, offset DESC LIMIT ?"
+
+        with self.lock:
+            rows = self.conn.execute(sql, params + [limit + 1]).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        cases = self._read(rows)
+        next_cursor = encode_cursor(rows[-1][2], rows[-1][0]) if more else None
+        return {"cases": cases, "next_cursor": next_cursor}
+
+    def _read(self, rows: List[Tuple[int, int, str]]) -> List[Dict]:
+        cases = []
+        if not rows:
+            return cases
+        try:
+            with open(self.log_path, 'rb') as f:
+                for offset, length, _ in rows:
+                    f.seek(offset)
+                    try:
+                        cases.append(json.loads(f.read(length)))
+                    except ValueError:
+                        continue  # Log replaced since the last refresh
+        except FileNotFoundError:
+            pass
+        if self.content_store is not None:
+            self.content_store.resolve(cases)
+        return cases
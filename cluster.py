@@ -0,0 +1,180 @@
+"""
+Guardify Cluster Launcher
+Runs the bot as several worker processes, each owning a range of gateway
+shards, with moderation state shared through a SQLite WAL store.
+
+Usage:
+    python cluster.py --workers 4 --shards 16
+    python cluster.py --workers 2              # shard count from Discord
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import time
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+
+DEFAULT_STATE_PATH = "forensics_logs/shared_state.db"
+
+
+def shard_ranges(shard_count: int, workers: int) -> List[List[int]]:
+    """Split shard IDs 0..shard_count-1 into `workers` contiguous ranges."""
+    if shard_count < 1 or workers < 1:
+        raise ValueError("shard_count and workers must be positive")
+    workers = min(workers, shard_count)
+    base, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker_id in range(workers):
+        size = base + (1 if worker_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def recommended_shards(token: str) -> int:
+    """Ask Discord how many shards the bot should use."""
+    response = requests.get(
+        "https://discord.com/api/v10/gateway/bot",
+        headers={"Authorization": f"Bot {token}"},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()["shards"]
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def run_worker(worker_id: int, shard_ids: List[int], shard_count: int, token: str, state_path: str) -> None:
+    """
+    Worker process entry point: start Guardify on a range of shards.
+
+    The bot module reads its cluster settings from the environment when it
+    is imported, so they are set before the import.
+    """
+    os.environ["GUARDIFY_WORKER_ID"] = str(worker_id)
+    os.environ["GUARDIFY_SHARD_IDS"] = ",".join(map(str, shard_ids))
+    os.environ["GUARDIFY_SHARD_COUNT"] = str(shard_count)
+    os.environ["GUARDIFY_STATE_DB"] = state_path
+    signal.signal(signal.SIGTERM, _interrupt)  # Let bot.run() close the bot gracefully
+
+    import bot_enhanced
+    bot_enhanced.start_metrics_server()  # On GUARDIFY_METRICS_PORT + worker_id, if set
+    bot_enhanced.bot.run(token)
+
+
+class ClusterLauncher:
+    """
+    Starts and supervises the worker processes of a cluster.
+
+    Workers that exit unexpectedly are restarted after `restart_delay`
+    seconds. `target` is the worker entry point, called as
+    `target(worker_id, shard_ids, shard_count, token, state_path)`; tests
+    pass a stub in place of a real gateway connection.
+    """
+
+    def __init__(self, token: str, shard_count: int, workers: int,
+                 state_path: str = DEFAULT_STATE_PATH,
+                 target: Callable = run_worker, restart_delay: float = 5.0):
+        self.token = token
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count, workers)
+        self.state_path = state_path
+        self.target = target
+        self.restart_delay = restart_delay
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.restarts = 0
+        self.stopping = False
+
+    def _spawn(self, worker_id: int) -> None:
+        process = self.context.Process(
+            target=self.target,
+            args=(worker_id, self.ranges[worker_id], self.shard_count, self.token, self.state_path),
+            name=f"guardify-worker-{worker_id}",
+            daemon=False
+        )
+        process.start()
+        self.processes[worker_id] = process
+        print(f"[CLUSTER] Worker {worker_id} started (pid {process.pid}, shards {self.ranges[worker_id]})")
+
+    def start(self) -> None:
+        """Start every worker."""
+        for worker_id in range(len(self.ranges)):
+            self._spawn(worker_id)
+
+    def poll(self) -> None:
+        """Restart workers that have exited (unless the cluster is stopping)."""
+        for worker_id, process in list(self.processes.items()):
+            if process.is_alive() or self.stopping:
+                continue
+            print(f"[CLUSTER] Worker {worker_id} exited with code {process.exitcode}, restarting")
+            self.restarts += 1
+            time.sleep(self.restart_delay)
+            self._spawn(worker_id)
+
+    def supervise(self, interval: float = 1.0, until: Optional[Callable[[], bool]] = None) -> None:
+        """Keep workers running until stopped (or until `until()` is true)."""
+        while not self.stopping and not (until and until()):
+            self.poll()
+            time.sleep(interval)
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Ask every worker to shut down cleanly, killing any that do not."""
+        self.stopping = True
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM; the worker closes its bot gracefully
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+
+def load_token() -> Optional[str]:
+    """Bot token from DISCORD_BOT_TOKEN or config.json."""
+    token = os.getenv('DISCORD_BOT_TOKEN')
+    if not token and os.path.exists('config.json'):
+        with open('config.json', 'r') as f:
+            token = json.load(f).get('bot_token')
+    return token
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run Guardify as a multi-process sharded cluster")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--shards", type=int, default=None, help="Total shard count (default: Discord's recommendation)")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="Shared state database path")
+    args = parser.parse_args()
+
+    token = load_token()
+    if not token:
+        print("ERROR: Discord bot token not found!")
+        return
+
+    shard_count = args.shards or recommended_shards(token)
+    launcher = ClusterLauncher(token, shard_count, args.workers, state_path=args.state)
+    print(f"[CLUSTER] {shard_count} shards across {len(launcher.ranges)} workers")
+
+    def handle_signal(signum, frame):
+        launcher.stopping = True
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    launcher.start()
+    launcher.supervise()
+    launcher.stop()
+
+
+if __name__ == "__main__":
+    main()
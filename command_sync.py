@@ -0,0 +1,79 @@
+"""
+Slash Command Sync Tracking
+Hashes the application command tree and only syncs it with Discord when the
+hash differs from the last successful sync.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+
+def tree_hash(tree) -> str:
+    """
+    Stable hash of every command in a CommandTree.
+
+    Uses the same payloads `tree.sync()` sends (names, descriptions,
+    parameters, permissions), sorted so registration order does not matter.
+    """
+    payloads = [command.to_dict(tree) for command in tree.get_commands()]
+    payloads.sort(key=lambda payload: (payload.get('type', 1), payload['name']))
+    encoded = json.dumps(payloads, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class CommandSyncState:
+    """Last synced command tree hash per application, stored in a JSON file."""
+
+    def __init__(self, path: str = "forensics_logs/command_sync.json"):
+        self.path = path
+
+    def load(self) -> Dict:
+        """All recorded syncs, keyed by application ID."""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}  # Unreadable state just means one extra sync
+
+    def last_hash(self, application_id) -> Optional[str]:
+        """Hash of the last successful sync for an application."""
+        return self.load().get(str(application_id), {}).get('hash')
+
+    def record(self, application_id, digest: str, count: int) -> None:
+        """Remember a successful sync."""
+        state = self.load()
+        state[str(application_id)] = {
+            'hash': digest,
+            'commands': count,
+            'synced_at': datetime.now(timezone.utc).isoformat()
+        }
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.command_sync-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+async def sync_if_changed(tree, application_id, state: CommandSyncState,
+                          force: bool = False) -> Tuple[Optional[int], float]:
+    """
+    Sync the global command tree unless it matches the last synced hash.
+
+    Returns:
+        (number of synced commands or None if skipped, seconds taken)
+    """
+    started = time.perf_counter()
+    digest = tree_hash(tree)
+    if not force and state.last_hash(application_id) == digest:
+        return None, time.perf_counter() - started
+    synced = await tree.sync()
+    state.record(application_id, digest, len(synced))
+    return len(synced), time.perf_counter() - started
@@ -0,0 +1,216 @@
+"""
+Content-Addressed Evidence Content
+Message content stored once per distinct text, keyed by its full SHA-256,
+with reference counts. Evidence records carry `content_sha256` instead of
+the text, so a raid logging the same message thousands of times stores it
+once.
+
+    python content_store.py forensics_logs/abuse_evidence.jsonl   # dedup ratio of an existing log
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+PURGED = "[content purged]"  # Shown for a record whose content is no longer stored
+HASH_SIZE = 64  # Hex characters of the reference that replaces a text in the log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    refs INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ContentStore:
+    """
+    Blob table shared by the bot (writer) and the dashboard (reader).
+
+    `put()` stores a text or adds a reference to it; `release()` drops
+    references when records are purged and deletes a text once nothing
+    refers to it. `resolve()` puts the text back into records read from
+    the log, so readers see the same records as before. Every text is
+    stored by default, including the short ones raids repeat; texts
+    shorter than `min_size` bytes stay inline in the record. The database
+    is opened on first use.
+    """
+
+    def __init__(self, path: str = "forensics_logs/content.db", busy_timeout: float = 5.0, min_size: int = 0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.min_size = min_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                       isolation_level=None, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(SCHEMA)
+                self._conn = conn
+            return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def put(self, content: str) -> str:
+        """Store `content` (or add a reference to it). Returns its SHA-256."""
+        digest = content_hash(content)
+        self.conn.execute(
+            "INSERT INTO blobs (sha256, content, size, refs) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT (sha256) DO UPDATE SET refs = refs + 1",
+            (digest, content, len(content.encode('utf-8')))
+        )
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        row = self.conn.execute("SELECT content FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, str]:
+        """Content for each stored digest (missing ones are left out)."""
+        found = {}
+        unique = list(set(digests))
+        for start in range(0, len(unique), 500):  # Stay under SQLite's bound parameter limit
+            chunk = unique[start:start + 500]
+            found.update(self.conn.execute(
+                f"SELECT sha256, content FROM blobs WHERE sha256 IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return found
+
+    def release(self, digests: Iterable[str]) -> int:
+        """
+        Drop one reference per digest (e.g. for records removed by retention).
+
+        Returns:
+            Number of texts deleted because nothing refers to them any more
+        """
+        counts = Counter(digests)
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.executemany("UPDATE blobs SET refs = refs - ? WHERE sha256 = ?",
+                                  [(count, digest) for digest, count in counts.items()])
+            return self.conn.execute("DELETE FROM blobs WHERE refs <= 0").rowcount
+
+    def reference(self, record: Dict) -> Dict:
+        """Store a record's content and return a copy with `content_sha256` in its place."""
+        content = record.get('content')
+        if not isinstance(content, str) or len(content.encode('utf-8')) < self.min_size:
+            return record
+        referenced = {}
+        for key, value in record.items():
+            if key == 'content':
+                referenced['content_sha256'] = self.put(value)
+            else:
+                referenced[key] = value
+        return referenced
+
+    def resolve(self, records: List[Dict]) -> List[Dict]:
+        """Fill in `content` for records that reference it by hash (in place). Returns the records."""
+        pending = [record for record in records if 'content' not in record and 'content_sha256' in record]
+        if pending:
+            found = self.get_many(record['content_sha256'] for record in pending)
+            for record in pending:
+                record['content'] = found.get(record['content_sha256'], PURGED)
+        return records
+
+    def stats(self) -> Dict:
+        """Stored texts, references, stored bytes and bytes as if every record held its own copy."""
+        blobs, refs, stored, referenced = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(refs), 0), COALESCE(SUM(size), 0), COALESCE(SUM(size * refs), 0) FROM blobs"
+        ).fetchone()
+        return {
+            "blobs": blobs,
+            "references": refs,
+            "stored_bytes": stored,
+            "referenced_bytes": referenced,
+            "dedup_ratio": round(referenced / stored, 2) if stored else 1.0
+        }
+
+
+def dedup_report(log_path: str, min_size: int = 0) -> Dict:
+    """
+    How much an existing JSONL log would shrink if its content were stored once per text.
+
+    Only inline texts a store with `min_size` would move are counted;
+    `log_bytes_saved` is net of the hash each record keeps instead.
+    """
+    sizes = {}
+    records = content_bytes = 0
+    with open(log_path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            content = record.get('content') if isinstance(record, dict) else None
+            if not isinstance(content, str):
+                continue
+            size = len(content.encode('utf-8'))
+            if size < min_size:
+                continue  # Would stay inline
+            records += 1
+            content_bytes += size
+            sizes[content_hash(content)] = size
+    unique_bytes = sum(sizes.values())
+    return {
+        "records": records,
+        "unique_contents": len(sizes),
+        "content_bytes": content_bytes,
+        "unique_bytes": unique_bytes,
+        "log_bytes_saved": content_bytes - records * HASH_SIZE,
+        "dedup_ratio": round(content_bytes / unique_bytes, 2) if unique_bytes else 1.0
+    }
+
+
+def main():
+    """Command line entry point: report the dedup ratio of an evidence log."""
+    parser = argparse.ArgumentParser(description="Content dedup ratio of an evidence log")
+    parser.add_argument("log", nargs="?", default="forensics_logs/abuse_evidence.jsonl", help="Evidence log path")
+    parser.add_argument("--store", default=None, help="Content store to report on as well "
+                                                      "(default: content.db next to the log)")
+    parser.add_argument("--min-size", type=int, default=0, help="Count only texts of at least this many bytes, "
+                                                                "like a store with that min_size")
+    args = parser.parse_args()
+
+    report = dedup_report(args.log, min_size=args.min_size)
+    print(f"Inline records:   {report['records']:,}")
+    print(f"Distinct content: {report['unique_contents']:,}")
+    print(f"Content bytes:    {report['content_bytes']:,} -> {report['unique_bytes']:,} stored once")
+    print(f"Log bytes saved:  {report['log_bytes_saved']:,} (net of the hashes)")
+    print(f"Dedup ratio:      {report['dedup_ratio']}x")
+
+    path = args.store or os.path.join(os.path.dirname(args.log), "content.db")
+    if os.path.exists(path):
+        store = ContentStore(path)
+        stats = store.stats()
+        store.close()
+        print(f"\nContent store:    {stats['references']:,} references to {stats['blobs']:,} texts")
+        print(f"Content bytes:    {stats['referenced_bytes']:,} -> {stats['stored_bytes']:,} stored")
+        print(f"Dedup ratio:      {stats['dedup_ratio']}x")
+
+
+if __name__ == "__main__":
+    main()
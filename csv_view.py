@@ -0,0 +1,191 @@
+"""
+Evidence CSV View
+abuse_evidence.csv derived from the JSONL evidence log instead of being
+written alongside it: new records are appended from a stored checkpoint,
+in the background or on demand (e.g. before /export).
+
+    python csv_view.py                      # bring forensics_logs/abuse_evidence.csv up to date
+    python csv_view.py --rebuild            # regenerate it from the whole log
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from metrics import Metrics, NULL_METRICS
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only, no file locking
+    fcntl = None
+
+
+FIELDNAMES = [
+    'timestamp', 'message_id', 'author_id', 'author_name',
+    'guild_name', 'channel_name', 'content', 'severity',
+    'abuse_score', 'textblob_sentiment', 'vader_sentiment',
+    'keywords', 'prevention_tip', 'evidence_hash'
+]
+BATCH = 500  # Records resolved and written at a time
+
+
+def csv_row(evidence: Dict) -> Dict:
+    """The CSV row for one evidence record."""
+    analysis = evidence.get('analysis', {})
+    return {
+        'timestamp': evidence.get('created_at', ''),
+        'message_id': evidence.get('message_id', ''),
+        'author_id': evidence.get('author_id', ''),
+        'author_name': evidence.get('author_name', ''),
+        'guild_name': evidence.get('guild_name', ''),
+        'channel_name': evidence.get('channel_name', ''),
+        'content': (evidence.get('content') or '')[:500],  # Truncate for CSV
+        'severity': analysis.get('severity', ''),
+        'abuse_score': analysis.get('abuse_score', ''),
+        'textblob_sentiment': analysis.get('textblob_sentiment', ''),
+        'vader_sentiment': analysis.get('vader_sentiment', ''),
+        'keywords': ','.join(analysis.get('detected_keywords', [])),
+        'prevention_tip': analysis.get('prevention_tip', ''),
+        'evidence_hash': evidence.get('evidence_hash', '')
+    }
+
+
+class CsvView:
+    """
+    Incrementally materialized CSV of the evidence log.
+
+    The checkpoint records the log's inode, the byte offset read up to and
+    the CSV size at that point. `materialize()` appends rows for complete
+    lines past the offset. Rows left by an interrupted run (CSV bigger than
+    the checkpoint says) are truncated away; a missing or shrunk CSV, a
+    replaced or truncated log, or no checkpoint at all means a rebuild from
+    the start of the log. A file lock keeps cluster workers from
+    materializing at the same time.
+    """
+
+    def __init__(self, log_path: str, csv_path: str, content_store=None,
+                 checkpoint_path: Optional[str] = None, metrics: Optional[Metrics] = None):
+        self.log_path = log_path
+        self.csv_path = csv_path
+        self.content_store = content_store  # Resolves records that reference their content by hash
+        self.checkpoint_path = checkpoint_path or csv_path + ".checkpoint"
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.lock = threading.Lock()
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_checkpoint(self, checkpoint: Dict) -> None:
+        directory = os.path.dirname(self.checkpoint_path) or '.'
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.csv_view-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def materialize(self, rebuild: bool = False) -> int:
+        """
+        Bring the CSV up to date with the log.
+
+        Returns:
+            Number of rows written
+        """
+        with self.lock:
+            lock_file = open(self.checkpoint_path + ".lock", 'a')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                return self._materialize(rebuild)
+            finally:
+                lock_file.close()  # Releases the flock
+
+    def _materialize(self, rebuild: bool) -> int:
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return 0
+        checkpoint = self._load_checkpoint()
+        try:
+            csv_size = os.path.getsize(self.csv_path)
+        except FileNotFoundError:
+            csv_size = -1
+        rebuild = (rebuild or checkpoint is None or checkpoint.get('inode') != stat.st_ino
+                   or stat.st_size < checkpoint.get('offset', 0) or csv_size < checkpoint.get('csv_size', 0))
+
+        if rebuild:
+            directory = os.path.dirname(self.csv_path) or '.'
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.csv_view-', suffix='.tmp')
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as out:
+                csv.DictWriter(out, fieldnames=FIELDNAMES).writeheader()
+                offset, written = self._append(out, 0)
+                size = out.tell()
+            os.replace(tmp, self.csv_path)
+            self.metrics.inc('file_bytes_written_total', size, file='evidence_csv')
+        else:
+            if stat.st_size == checkpoint['offset'] and csv_size == checkpoint['csv_size']:
+                return 0
+            with open(self.csv_path, 'r+', newline='', encoding='utf-8') as out:
+                out.truncate(checkpoint['csv_size'])  # Drop rows from an interrupted run
+                out.seek(checkpoint['csv_size'])
+                offset, written = self._append(out, checkpoint['offset'])
+                size = out.tell()
+            self.metrics.inc('file_bytes_written_total', size - checkpoint['csv_size'], file='evidence_csv')
+
+        self._save_checkpoint({'inode': stat.st_ino, 'offset': offset, 'csv_size': size})
+        return written
+
+    def _append(self, out: TextIO, offset: int) -> Tuple[int, int]:
+        """Write rows for complete log lines from `offset`. Returns (new offset, rows written)."""
+        writer = csv.DictWriter(out, fieldnames=FIELDNAMES)
+        written = 0
+        batch: List[Dict] = []
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # The bot is mid-write; pick it up next time
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    batch.append(record)
+                if len(batch) >= BATCH:
+                    written += self._write(writer, batch)
+                    batch = []
+        written += self._write(writer, batch)
+        return offset, written
+
+    def _write(self, writer: csv.DictWriter, records: List[Dict]) -> int:
+        if self.content_store is not None:
+            self.content_store.resolve(records)
+        writer.writerows(csv_row(record) for record in records)
+        return len(records)
+
+
+def main():
+    """Command line entry point: materialize the evidence CSV."""
+    parser = argparse.ArgumentParser(description="Bring abuse_evidence.csv up to date with the evidence log")
+    parser.add_argument("--log-dir", default="forensics_logs", help="Directory holding abuse_evidence.jsonl")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the CSV from the whole log")
+    args = parser.parse_args()
+
+    from content_store import ContentStore
+    store_path = os.path.join(args.log_dir, "content.db")
+    store = ContentStore(store_path) if os.path.exists(store_path) else None
+    view = CsvView(os.path.join(args.log_dir, "abuse_evidence.jsonl"),
+                   os.path.join(args.log_dir, "abuse_evidence.csv"), content_store=store)
+    written = view.materialize(rebuild=args.rebuild)
+    print(f"[CSV] Wrote {written} rows to {view.csv_path}" if written else "[CSV] Already up to date")
+
+
+if __name__ == "__main__":
+    main()
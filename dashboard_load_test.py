@@ -0,0 +1,130 @@
+"""
+Dashboard Load Test
+Starts the production dashboard (gunicorn, see wsgi.py) with 1, 4 and 8
+workers against a synthetic evidence log and measures /api/stats
+requests per second.
+
+    python dashboard_load_test.py --workers 1 4 8 --duration 10
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+
+
+def write_evidence(logs_dir: str, cases: int, guilds: int) -> None:
+    """Synthetic evidence log and warnings file."""
+    with open(os.path.join(logs_dir, "abuse_evidence.jsonl"), 'w') as f:
+        for n in range(cases):
+            f.write(json.dumps(fake_case(n, guilds)) + "\n")
+    warnings = {f"{n % guilds}:{n}": [{"reason": "spam", "timestamp": "2024-01-01T00:00:00"}] * (n % 5 + 1)
+                for n in range(cases // 10)}
+    with open(os.path.join(logs_dir, "warnings.json"), 'w') as f:
+        json.dump(warnings, f)
+
+
+def fake_case(n: int, guilds: int) -> dict:
+    return {
+        "message_id": str(n),
+        "author_id": str(n % 997),
+        "author_name": f"user{n % 997}",
+        "channel_id": str(n % 13),
+        "channel_name": f"channel-{n % 13}",
+        "guild_id": str(n % guilds),
+        "guild_name": f"Guild {n % guilds}",
+        "content": "you are an idiot " * 5,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "analysis": {"severity": random.choice(("low", "medium", "high")), "abuse_score": 0.6,
+                     "vader_details": {"neg": 0.6, "neu": 0.4, "pos": 0.0, "compound": -0.7}},
+        "logged_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Dashboard did not start")
+
+
+def run(workers: int, args, logs_dir: str) -> float:
+    """Requests per second served by `workers` gunicorn workers."""
+    env = dict(os.environ, GUARDIFY_LOGS_DIR=logs_dir, DASHBOARD_SECRET_KEY="load-test",
+               DASHBOARD_WORKERS=str(workers), DASHBOARD_BIND=f"127.0.0.1:{args.port}")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_up(f"{base}/api/stats")
+        stop = threading.Event()
+        counts = []
+
+        def client(i: int) -> None:
+            session = requests.Session()
+            done = 0
+            while not stop.is_set():
+                path = "/api/stats" if i % 2 else f"/api/stats/{done % args.guilds}"
+                if session.get(base + path, timeout=10).status_code == 200:
+                    done += 1
+            counts.append(done)
+
+        def writer() -> None:
+            # New evidence keeps invalidating the cache, as a live bot would
+            n = args.cases
+            path = os.path.join(logs_dir, "abuse_evidence.jsonl")
+            while not stop.wait(args.append_interval):
+                with open(path, 'a') as f:
+                    f.write(json.dumps(fake_case(n, args.guilds)) + "\n")
+                n += 1
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(args.concurrency)]
+        threads.append(threading.Thread(target=writer))
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return sum(counts) / (time.monotonic() - started)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Measure dashboard /api/stats throughput per worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="Worker counts to test")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--cases", type=int, default=20000, help="Cases in the synthetic evidence log")
+    parser.add_argument("--guilds", type=int, default=20, help="Guilds the cases are spread over")
+    parser.add_argument("--append-interval", type=float, default=1.0, help="Seconds between new cases")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the test server")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as logs_dir:
+        write_evidence(logs_dir, args.cases, args.guilds)
+        print(f"{'workers':>8} {'req/s':>10}")
+        for workers in args.workers:
+            print(f"{workers:>8} {run(workers, args, logs_dir):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
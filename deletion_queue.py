@@ -0,0 +1,165 @@
+"""
+Coalesced Auto-Moderation Deletions
+Collects messages removed by auto-moderation per channel and deletes them in
+bulk, so a raid costs one bulk-delete call per channel per window instead of
+one call per message.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import discord
+
+
+class ChannelBatch:
+    """Messages and user notices waiting to be flushed for one channel."""
+
+    __slots__ = ('channel', 'messages', 'notices', 'task')
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.messages: Dict[int, discord.Message] = {}
+        self.notices: Dict[int, List] = {}  # user_id -> [mention, reason, count]
+        self.task = None
+
+
+class DeletionQueue:
+    """
+    Per-channel deletion queue for auto-moderated messages.
+
+    Messages queued within `window` seconds of each other are removed with a
+    single `channel.delete_messages` call (up to 100 per call). Messages older
+    than 14 days cannot be bulk deleted and fall back to single deletes. User
+    notices queued in the same window are merged into one channel notice.
+
+    When a `scheduler` (ActionScheduler) is given, the REST calls are
+    submitted to it; otherwise they are awaited directly.
+    """
+
+    BULK_LIMIT = 100
+    BULK_MAX_AGE = timedelta(days=14)
+    NOTICE_LINES = 15  # Users listed in one notice before summarizing the rest
+
+    def __init__(self, window: float = 1.0, notice_lifetime: float = 10.0, scheduler=None):
+        self.window = window
+        self.notice_lifetime = notice_lifetime
+        self.scheduler = scheduler
+        self.batches: Dict[int, ChannelBatch] = {}
+        self._tasks = set()  # Early flushes of full batches, kept referenced until done
+
+    async def _run(self, kind: str, factory, target=None, route=None):
+        if self.scheduler is None:
+            return await factory()
+        return await self.scheduler.run(kind, factory, target=target, route=route)
+
+    def _batch(self, channel) -> ChannelBatch:
+        batch = self.batches.get(channel.id)
+        if batch is None:
+            batch = self.batches[channel.id] = ChannelBatch(channel)
+            batch.task = asyncio.get_running_loop().create_task(self._flush_later(channel.id))
+        return batch
+
+    def delete(self, message: discord.Message) -> None:
+        """Queue a message for deletion. Queuing the same message twice is a no-op."""
+        batch = self._batch(message.channel)
+        batch.messages[message.id] = message
+        if len(batch.messages) >= self.BULK_LIMIT:
+            batch.task.cancel()
+            task = asyncio.get_running_loop().create_task(self.flush(message.channel.id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def notify(self, channel, member, reason: str) -> None:
+        """Queue a notice to a user, merged with others in the channel's next notice."""
+        batch = self._batch(channel)
+        notice = batch.notices.get(member.id)
+        if notice is None:
+            batch.notices[member.id] = [member.mention, reason, 1]
+        else:
+            notice[1] = reason
+            notice[2] += 1
+
+    async def _flush_later(self, channel_id: int):
+        await asyncio.sleep(self.window)
+        await self.flush(channel_id)
+
+    async def flush(self, channel_id: int) -> None:
+        """Delete queued messages and send the coalesced notice for a channel."""
+        batch = self.batches.pop(channel_id, None)
+        if batch is None:
+            return
+
+        removed = await self._delete(batch)
+        if not removed:
+            print(f"[ERROR] Cannot delete messages in {batch.channel} - missing permissions")
+        if batch.notices:
+            await self._send_notice(batch, removed)  # Warnings reach the users even if nothing was deleted
+
+    async def _delete(self, batch: ChannelBatch) -> bool:
+        """Delete a batch's messages. Returns False if the bot may not delete in the channel."""
+        channel_id = batch.channel.id
+        cutoff = datetime.now(timezone.utc) - self.BULK_MAX_AGE + timedelta(minutes=1)
+        recent = [m for m in batch.messages.values() if m.created_at > cutoff]
+        old = [m for m in batch.messages.values() if m.created_at <= cutoff]
+
+        for start in range(0, len(recent), self.BULK_LIMIT):
+            chunk = recent[start:start + self.BULK_LIMIT]
+            if len(chunk) == 1:
+                old.extend(chunk)
+                continue
+            try:
+                await self._run(
+                    'bulk_delete',
+                    lambda chunk=chunk: batch.channel.delete_messages(chunk, reason="Auto-mod"),
+                    route=('channel', channel_id)
+                )
+            except discord.Forbidden:
+                return False
+            except discord.HTTPException:
+                old.extend(chunk)  # Retry individually
+
+        for message in old:
+            try:
+                await self._run('delete', message.delete, target=message.id, route=('channel', channel_id))
+            except discord.NotFound:
+                pass
+            except discord.Forbidden:
+                return False
+        return True
+
+    async def _send_notice(self, batch: ChannelBatch, removed: bool = True) -> None:
+        lines = []
+        for mention, reason, count in list(batch.notices.values())[:self.NOTICE_LINES]:
+            suffix = f" (x{count})" if count > 1 else ""
+            lines.append(f"{mention} - {reason}{suffix}")
+        hidden = len(batch.notices) - self.NOTICE_LINES
+        if hidden > 0:
+            lines.append(f"...and {hidden} more users")
+
+        embed = discord.Embed(
+            title="⚠️ Messages Removed" if removed else "⚠️ Auto-Mod Warning",
+            description="\n".join(lines),
+            color=discord.Color.orange()
+        )
+        try:
+            await self._run(
+                'notice',
+                lambda: batch.channel.send(embed=embed, delete_after=self.notice_lifetime),
+                route=('channel', batch.channel.id)
+            )
+        except discord.HTTPException as e:
+            print(f"Failed to send auto-mod notice: {e}")
+
+    @property
+    def queue_depth(self) -> int:
+        """Messages waiting to be deleted across all channels."""
+        return sum(len(batch.messages) for batch in self.batches.values())
+
+    async def close(self) -> None:
+        """Flush every pending channel immediately."""
+        for channel_id in list(self.batches):
+            batch = self.batches.get(channel_id)
+            if batch and batch.task:
+                batch.task.cancel()
+            await self.flush(channel_id)
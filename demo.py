@@ -4,6 +4,7 @@ This script demonstrates the abuse detection without requiring Discord connectio
 """
 
 from bot import AbuseDetector, ForensicsLogger
+from discord_stubs import StubChannel, StubGuild, StubMember, StubMessage
 import json
 
 
@@ -56,36 +57,8 @@ def demo_forensics_logging():
     # Create a temporary logger
     logger = ForensicsLogger(log_dir="demo_logs")
     
-    # Create mock message
-    class MockMessage:
-        def __init__(self, msg_id, author_id, author_name, content):
-            from datetime import datetime
-            self.id = msg_id
-            self.content = content
-            self.created_at = datetime.now()
-            
-            class MockAuthor:
-                def __init__(self, uid, name):
-                    self.id = uid
-                    self.name = name
-                def __str__(self):
-                    return self.name
-            
-            class MockChannel:
-                def __init__(self):
-                    self.id = 123456
-                    self.name = "general"
-                def __str__(self):
-                    return "general"
-            
-            class MockGuild:
-                def __init__(self):
-                    self.id = 999888
-                    self.name = "Demo Server"
-            
-            self.author = MockAuthor(author_id, author_name)
-            self.channel = MockChannel()
-            self.guild = MockGuild()
+    # Stand-ins for the Discord objects a real message carries
+    channel = StubChannel(123456, StubGuild(999888, "Demo Server"), name="general")
     
     # Simulate logging some abusive messages
     detector = AbuseDetector()
@@ -99,7 +72,7 @@ def demo_forensics_logging():
     print("Logging abusive messages...\n")
     
     for msg_id, author_id, author_name, content in messages:
-        mock_msg = MockMessage(msg_id, author_id, author_name, content)
+        mock_msg = StubMessage(content, StubMember(author_id, name=author_name), channel, message_id=msg_id)
         analysis = detector.analyze_message(content)
         
         if analysis['is_abusive']:
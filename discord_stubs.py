@@ -0,0 +1,185 @@
+"""
+Discord Stubs
+Offline stand-ins for the discord.py objects the bots touch (guilds,
+channels, members, messages), with REST calls answered by a simulator that
+adds configurable latency and errors instead of talking to Discord.
+"""
+
+import asyncio
+import itertools
+import random
+from collections import defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import discord
+
+
+class RestSimulator:
+    """
+    Fake Discord REST API.
+
+    Every call sleeps for `latency` ± `jitter` seconds and fails with a
+    500 HTTPException at `error_rate`. Calls are counted per kind so a run
+    can report how much REST traffic it would have caused.
+    """
+
+    def __init__(self, latency: float = 0.08, jitter: float = 0.04, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.errors = 0
+        self.inflight = 0
+        self.max_inflight = 0
+
+    async def call(self, kind: str, result=None):
+        """Simulate one REST call of `kind` and return `result`."""
+        self.calls[kind] += 1
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(max(0.0, self.random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                raise discord.HTTPException(SimpleNamespace(status=500, reason="Simulated error"), "Simulated error")
+            return result
+        finally:
+            self.inflight -= 1
+
+    def stats(self) -> Dict:
+        """Get call counts for the simulated API."""
+        return {
+            "calls": dict(self.calls),
+            "total_calls": sum(self.calls.values()),
+            "errors": self.errors,
+            "max_inflight": self.max_inflight
+        }
+
+
+class StubGuild:
+    """Guild with an ID and a name."""
+
+    def __init__(self, guild_id: int, name: str = None):
+        self.id = guild_id
+        self.name = name or f"Guild {guild_id}"
+
+    def __str__(self):
+        return self.name
+
+
+class StubChannel:
+    """Text channel supporting send, bulk delete and edit."""
+
+    def __init__(self, channel_id: int, guild: StubGuild, rest: RestSimulator = None, name: str = None):
+        self.id = channel_id
+        self.guild = guild
+        self.rest = rest or RestSimulator(latency=0.0, jitter=0.0)
+        self.name = name or f"channel-{channel_id}"
+        self.slowmode_delay = 0
+        self.mention = f"<#{channel_id}>"
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, content=None, **kwargs):
+        return await self.rest.call('send')
+
+    async def delete_messages(self, messages: List, reason: str = None):
+        return await self.rest.call('bulk_delete')
+
+    async def edit(self, slowmode_delay: int = None, reason: str = None, **kwargs):
+        await self.rest.call('channel_edit')
+        if slowmode_delay is not None:
+            self.slowmode_delay = slowmode_delay
+
+
+class StubMember:
+    """Guild member supporting timeouts and DMs."""
+
+    def __init__(self, user_id: int, guild: StubGuild = None, rest: RestSimulator = None,
+                 name: str = None, bot: bool = False, moderator: bool = False):
+        self.id = user_id
+        self.guild = guild
+        self.rest = rest or RestSimulator(latency=0.0, jitter=0.0)
+        self.name = name or f"user{user_id}"
+        self.bot = bot
+        self.mention = f"<@{user_id}>"
+        self.guild_permissions = SimpleNamespace(administrator=moderator, manage_messages=moderator)
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return getattr(other, 'id', None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    async def timeout(self, until, reason: str = None):
+        return await self.rest.call('timeout')
+
+    async def send(self, content=None, **kwargs):
+        return await self.rest.call('dm')
+
+
+class StubMessage:
+    """Message as delivered by the gateway, deletable through the simulator."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, content: str, author: StubMember, channel: StubChannel,
+                 message_id: int = None, created_at: datetime = None):
+        self.id = message_id if message_id is not None else next(self._ids)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+        self.created_at = created_at or datetime.now(timezone.utc)
+        self._state = None  # Read by commands.Context; no command is ever invoked
+
+    async def delete(self, delay: float = None):
+        return await self.channel.rest.call('delete')
+
+
+class StubWorld:
+    """
+    Guilds, channels and members sharing one REST simulator.
+
+    Also serves as the bot's channel resolver (`get_channel`) and provides
+    the bot user, so a bot that never logged in can handle messages.
+    """
+
+    def __init__(self, rest: RestSimulator = None, guilds: int = 1, channels_per_guild: int = 5):
+        self.rest = rest or RestSimulator()
+        self.guilds = [StubGuild(900000 + g) for g in range(guilds)]
+        self.channels = {}
+        for guild in self.guilds:
+            for c in range(channels_per_guild):
+                channel = StubChannel(guild.id * 100 + c, guild, self.rest)
+                self.channels[channel.id] = channel
+        self.members: Dict[int, StubMember] = {}
+        self.user = StubMember(1, rest=self.rest, name="Guardify", bot=True)
+
+    def get_channel(self, channel_id: int) -> Optional[StubChannel]:
+        return self.channels.get(channel_id)
+
+    def member(self, user_id: int, guild: StubGuild) -> StubMember:
+        """The member with `user_id`, created on first use."""
+        member = self.members.get(user_id)
+        if member is None:
+            member = self.members[user_id] = StubMember(user_id, guild, self.rest)
+        return member
+
+    def message(self, content: str, user_id: int, channel: StubChannel) -> StubMessage:
+        """A new message from member `user_id` in `channel`."""
+        return StubMessage(content, self.member(user_id, channel.guild), channel)
+
+    def attach(self, bot) -> None:
+        """Point an unconnected bot at this world: bot user, channel lookups."""
+        bot._connection.user = self.user
+        if hasattr(bot, 'log_outbox'):
+            bot.log_outbox.resolve_channel = self.get_channel
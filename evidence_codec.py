@@ -0,0 +1,294 @@
+"""
+Compact Evidence Records
+Binary encoding of evidence records: a fixed-layout header with integer
+ids, epoch timestamps and float32 scores, followed by the message content
+and keyword ids. Repeated strings (keywords, names, prevention tips) are
+stored once in a string table. The decoder gives back the dict that
+ForensicsLogger.log_evidence writes as JSONL.
+
+    python evidence_codec.py forensics_logs/abuse_evidence.jsonl   # size and decode speed vs JSONL
+"""
+
+import argparse
+import json
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+VERSION = 1
+SEVERITIES = ("low", "medium", "high")
+NONE_ID = 0xFFFFFFFF  # String id for a missing name (DMs have no guild)
+
+FLAG_ABUSIVE = 0x01
+FLAG_GUILD = 0x02
+FLAG_REFERENCE = 0x04  # Content is a SHA-256 into the content store (see content_store.py)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# version, flags, severity | message, author, channel, guild ids | created_at, logged_at, analysed
+# (microseconds since the epoch) | abuse, textblob, vader, combined, vader neg/neu/pos/compound |
+# content hash, evidence hash | author, channel, guild name and prevention tip string ids |
+# keyword count, content length
+HEADER = struct.Struct('<BBBx4q3q8f8s8s4IHI')
+PEEK = struct.Struct('<BBBx4q2q')  # Leading part of HEADER, up to logged_at
+LENGTH = struct.Struct('<I')  # Record length prefix in a file
+
+
+class StringTable:
+    """
+    Append-only string <-> id table.
+
+    With a `path`, strings are kept one JSON string per line and new ones
+    are appended as they are assigned, so ids stay valid for every record
+    already written.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        string = json.loads(line)
+                        self.ids.setdefault(string, len(self.strings))
+                        self.strings.append(string)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def id(self, string: Optional[str]) -> int:
+        """Id of `string`, assigning (and persisting) a new one if needed."""
+        if string is None:
+            return NONE_ID
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(string, ensure_ascii=False) + '\n')
+        return string_id
+
+    def string(self, string_id: int) -> Optional[str]:
+        return None if string_id == NONE_ID else self.strings[string_id]
+
+
+def to_micros(timestamp: str) -> int:
+    """UTC ISO timestamp -> microseconds since the epoch."""
+    moment = datetime.fromisoformat(timestamp)
+    if moment.utcoffset() != timedelta(0):
+        raise ValueError(f"Timestamp is not UTC: {timestamp}")
+    return (moment - EPOCH) // MICROSECOND
+
+
+@lru_cache(maxsize=4096)
+def _iso_second(seconds: int) -> str:
+    return (EPOCH + timedelta(seconds=seconds)).isoformat()[:19]
+
+
+def from_micros(micros: int) -> str:
+    """Microseconds since the epoch -> the ISO timestamp datetime.isoformat() gives."""
+    seconds, fraction = divmod(micros, 1_000_000)
+    # Timestamps within a record, and across a burst of records, share seconds
+    if fraction:
+        return f"{_iso_second(seconds)}.{fraction:06d}+00:00"
+    return f"{_iso_second(seconds)}+00:00"
+
+
+class EvidenceCodec:
+    """
+    Encoder/decoder for evidence records.
+
+    A record takes about 130 bytes plus its content, against roughly 1 KB
+    of JSONL. Scores are float32 and are rounded back to the precision the
+    detector rounds them to (3 places, 4 for VADER details), so decoding
+    reproduces the original values. `encode` raises ValueError for a record
+    it cannot represent exactly (missing analysis fields, non-UTC
+    timestamps, hashes that are not 16 hex digits).
+    """
+
+    def __init__(self, table: Optional[StringTable] = None):
+        self.table = table if table is not None else StringTable()
+
+    def encode(self, evidence: Dict) -> bytes:
+        """Encode one evidence record."""
+        table = self.table
+        try:
+            analysis = evidence['analysis']
+            vader = analysis['vader_details']
+            if 'content' in evidence:
+                content = evidence['content'].encode('utf-8')
+                flags = 0
+            else:
+                content = bytes.fromhex(evidence['content_sha256'])
+                flags = FLAG_REFERENCE
+            keywords = analysis['detected_keywords']
+            flags |= (FLAG_ABUSIVE if analysis['is_abusive'] else 0) | (FLAG_GUILD if evidence['guild_id'] else 0)
+            header = HEADER.pack(
+                VERSION, flags, SEVERITIES.index(analysis['severity']),
+                int(evidence['message_id']), int(evidence['author_id']),
+                int(evidence['channel_id']), int(evidence['guild_id'] or 0),
+                to_micros(evidence['created_at']), to_micros(evidence['logged_at']),
+                to_micros(analysis['timestamp']),
+                analysis['abuse_score'], analysis['textblob_sentiment'],
+                analysis['vader_sentiment'], analysis['combined_sentiment'],
+                vader['neg'], vader['neu'], vader['pos'], vader['compound'],
+                self._hash(analysis['content_hash']), self._hash(evidence['evidence_hash']),
+                table.id(evidence['author_name']), table.id(evidence['channel_name']),
+                table.id(evidence['guild_name']), table.id(analysis['prevention_tip']),
+                len(keywords), len(content)
+            )
+        except (KeyError, TypeError, struct.error) as e:
+            raise ValueError(f"Record cannot be encoded: {e!r}") from e
+        return header + content + struct.pack(f'<{len(keywords)}I', *map(table.id, keywords))
+
+    @staticmethod
+    def _hash(digest: str) -> bytes:
+        raw = bytes.fromhex(digest)
+        if len(raw) != 8:
+            raise ValueError(f"Expected a 16 hex digit hash, got {digest!r}")
+        return raw
+
+    def decode(self, data: bytes, offset: int = 0) -> Dict:
+        """Decode the record starting at `offset`, in the dict shape written to JSONL."""
+        (version, flags, severity, message_id, author_id, channel_id, guild_id,
+         created_at, logged_at, analysed_at, abuse, textblob, vader, combined,
+         neg, neu, pos, compound, content_hash, evidence_hash,
+         author_name, channel_name, guild_name, tip, keyword_count, content_length) = HEADER.unpack_from(data, offset)
+        if version != VERSION:
+            raise ValueError(f"Unsupported record version {version}")
+        start = offset + HEADER.size
+        end = start + content_length
+        string = self.table.string
+        has_guild = flags & FLAG_GUILD
+        if flags & FLAG_REFERENCE:
+            content_key, content = "content_sha256", data[start:end].hex()
+        else:
+            content_key, content = "content", data[start:end].decode('utf-8')
+        return {
+            "message_id": str(message_id),
+            "author_id": str(author_id),
+            "author_name": string(author_name),
+            "channel_id": str(channel_id),
+            "channel_name": string(channel_name),
+            "guild_id": str(guild_id) if has_guild else None,
+            "guild_name": string(guild_name),
+            content_key: content,
+            "created_at": from_micros(created_at),
+            "analysis": {
+                "is_abusive": bool(flags & FLAG_ABUSIVE),
+                "abuse_score": round(abuse, 3),
+                "textblob_sentiment": round(textblob, 3),
+                "vader_sentiment": round(vader, 3),
+                "combined_sentiment": round(combined, 3),
+                "vader_details": {
+                    "neg": round(neg, 4),
+                    "neu": round(neu, 4),
+                    "pos": round(pos, 4),
+                    "compound": round(compound, 4)
+                },
+                "detected_keywords": [string(k) for k in struct.unpack_from(f'<{keyword_count}I', data, end)],
+                "severity": SEVERITIES[severity],
+                "prevention_tip": string(tip),
+                "timestamp": from_micros(analysed_at),
+                "content_hash": content_hash.hex()
+            },
+            "logged_at": from_micros(logged_at),
+            "evidence_hash": evidence_hash.hex()
+        }
+
+    @staticmethod
+    def peek(data: bytes, offset: int = 0) -> Dict:
+        """Ids, severity and logged_at of a record without decoding the rest (for filtered scans)."""
+        _, flags, severity, message_id, author_id, channel_id, guild_id, _, logged_at = PEEK.unpack_from(data, offset)
+        return {
+            "message_id": str(message_id),
+            "author_id": str(author_id),
+            "channel_id": str(channel_id),
+            "guild_id": str(guild_id) if flags & FLAG_GUILD else None,
+            "severity": SEVERITIES[severity],
+            "logged_at": logged_at
+        }
+
+    def write(self, f: BinaryIO, evidence: Dict) -> int:
+        """Append one length-prefixed record to a binary file. Returns bytes written."""
+        record = self.encode(evidence)
+        f.write(LENGTH.pack(len(record)) + record)
+        return LENGTH.size + len(record)
+
+    def iter_file(self, f: BinaryIO) -> Iterator[Dict]:
+        """Decode every record in a file of length-prefixed records."""
+        data = f.read()
+        offset = 0
+        while offset + LENGTH.size <= len(data):
+            (length,) = LENGTH.unpack_from(data, offset)
+            offset += LENGTH.size
+            if offset + length > len(data):
+                break  # Partial record at the end of the file
+            yield self.decode(data, offset)
+            offset += length
+
+
+def compare_log(path: str) -> Dict:
+    """Size and decode time of a JSONL evidence log against its binary encoding."""
+    codec = EvidenceCodec()
+    lines = []
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                lines.append(line)
+
+    records, skipped = [], 0
+    for line in lines:
+        try:
+            records.append(codec.encode(json.loads(line)))
+        except ValueError:
+            skipped += 1
+    jsonl_bytes = sum(len(line) for line in lines)
+    binary_bytes = sum(LENGTH.size + len(record) for record in records)
+    table_bytes = sum(len(json.dumps(s, ensure_ascii=False).encode('utf-8')) + 1 for s in codec.table.strings)
+
+    started = time.perf_counter()
+    for line in lines:
+        json.loads(line)
+    jsonl_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for record in records:
+        codec.decode(record)
+    binary_seconds = time.perf_counter() - started
+
+    return {
+        "records": len(lines),
+        "skipped": skipped,
+        "jsonl_bytes": jsonl_bytes,
+        "binary_bytes": binary_bytes,
+        "table_bytes": table_bytes,
+        "jsonl_decode_us": round(jsonl_seconds / max(len(lines), 1) * 1e6, 2),
+        "binary_decode_us": round(binary_seconds / max(len(records), 1) * 1e6, 2)
+    }
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare an evidence log with its binary encoding")
+    parser.add_argument("log", nargs="?", default="forensics_logs/abuse_evidence.jsonl", help="JSONL evidence log")
+    args = parser.parse_args()
+
+    report = compare_log(args.log)
+    encoded = report["records"] - report["skipped"]
+    print(f"Records:        {report['records']:,} ({report['skipped']:,} not encodable)")
+    print(f"JSONL:          {report['jsonl_bytes']:,} bytes ({report['jsonl_bytes'] / max(report['records'], 1):,.0f}/record)")
+    print(f"Binary:         {report['binary_bytes']:,} bytes ({report['binary_bytes'] / max(encoded, 1):,.0f}/record)"
+          f" + {report['table_bytes']:,} bytes of strings")
+    print(f"Decode JSONL:   {report['jsonl_decode_us']} us/record")
+    print(f"Decode binary:  {report['binary_decode_us']} us/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Incremental Evidence Log Statistics
+Follows abuse_evidence.jsonl from the last byte offset and keeps running
+per-guild aggregates, so dashboard requests cost O(new records).
+"""
+
+import heapq
+import itertools
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+SEVERITIES = ("low", "medium", "high")
+
+
+class CaseAggregate:
+    """Running statistics for one guild (or for all guilds)."""
+
+    __slots__ = ('total_cases', 'severity', 'users', 'guilds', 'recent')
+
+    def __init__(self):
+        self.total_cases = 0
+        self.severity = {severity: 0 for severity in SEVERITIES}
+        self.users = set()
+        self.guilds = set()
+        self.recent = []  # Min-heap of (logged_at, seq, record), newest `recent_limit` kept
+
+    def add(self, record: Dict, seq: int, recent_limit: int) -> None:
+        self.total_cases += 1
+        severity = record.get('analysis', {}).get('severity', 'low')
+        if severity in self.severity:
+            self.severity[severity] += 1
+        self.users.add(record.get('author_id'))
+        if record.get('guild_id'):
+            self.guilds.add(record.get('guild_id'))
+
+        entry = (record.get('logged_at', ''), seq, record)
+        if len(self.recent) < recent_limit:
+            heapq.heappush(self.recent, entry)
+        elif entry > self.recent[0]:
+            heapq.heapreplace(self.recent, entry)
+
+    def summary(self) -> Dict:
+        return {
+            "total_cases": self.total_cases,
+            "severity_breakdown": dict(self.severity),
+            "unique_users": len(self.users),
+            "unique_guilds": len(self.guilds),
+            "recent_cases": [record for _, _, record in sorted(self.recent, reverse=True)]
+        }
+
+
+class EvidenceTail:
+    """
+    Tail-follower for the evidence log with per-guild aggregates.
+
+    `refresh()` reads only bytes appended since the last call. If the file
+    was replaced (different inode) or truncated (smaller than the offset),
+    the aggregates are rebuilt from the start. A trailing line without a
+    newline is left for the next refresh, since the bot may be mid-write.
+
+    Listeners registered with `subscribe(callback)` are called as
+    `callback(records, rebuilt, offsets)` with each batch of new records,
+    whichever caller's refresh read them; `rebuilt` is True after a
+    rotation and `offsets` holds the byte offset just past each record.
+    Records that reference their content by hash are resolved through
+    `content_store` before anyone sees them.
+    """
+
+    def __init__(self, path: str, recent_limit: int = 10, content_store=None):
+        self.path = path
+        self.recent_limit = recent_limit
+        self.content_store = content_store
+        self.lock = threading.RLock()  # Listeners may read statistics
+        self.listeners: List[Callable] = []
+        self._seq = itertools.count()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.inode = None
+        self.all = CaseAggregate()
+        self.by_guild: Dict[str, CaseAggregate] = {}
+
+    def subscribe(self, callback: Callable) -> None:
+        """Call `callback(records, rebuilt, offsets)` with every batch of new records."""
+        self.listeners.append(callback)
+
+    def refresh(self) -> List[Dict]:
+        """Read new records and fold them into the aggregates. Returns the new records."""
+        with self.lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                if self.inode is not None:
+                    self._reset()
+                    for callback in self.listeners:
+                        callback([], True, [])
+                return []
+            rebuilt = False
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                rebuilt = self.inode is not None
+                self._reset()
+                self.inode = stat.st_ino
+            if stat.st_size == self.offset and not rebuilt:
+                return []
+
+            records = []
+            offsets = []
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self.offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict):
+                        records.append(record)
+                        offsets.append(self.offset)
+            if self.content_store is not None:
+                self.content_store.resolve(records)
+            for record in records:
+                self._add(record)
+            if records or rebuilt:
+                for callback in self.listeners:
+                    callback(records, rebuilt, offsets)
+            return records
+
+    def _add(self, record: Dict) -> None:
+        seq = next(self._seq)
+        self.all.add(record, seq, self.recent_limit)
+        guild_id = record.get('guild_id')
+        if guild_id:
+            aggregate = self.by_guild.get(str(guild_id))
+            if aggregate is None:
+                aggregate = self.by_guild[str(guild_id)] = CaseAggregate()
+            aggregate.add(record, seq, self.recent_limit)
+
+    def statistics(self, guild_id: Optional[str] = None) -> Dict:
+        """Statistics for one guild, or for all guilds when `guild_id` is None."""
+        with self.lock:
+            if not guild_id:
+                return self.all.summary()
+            aggregate = self.by_guild.get(str(guild_id))
+            return aggregate.summary() if aggregate else CaseAggregate().summary()
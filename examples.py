@@ -4,7 +4,7 @@ Demonstrates various use cases and API interactions
 """
 
 from bot import AbuseDetector, ForensicsLogger
-from datetime import datetime
+from discord_stubs import StubChannel, StubGuild, StubMember, StubMessage
 import json
 
 
@@ -64,35 +64,8 @@ def example_forensics_workflow():
     detector = AbuseDetector()
     logger = ForensicsLogger(log_dir="example_logs")
     
-    # Mock message class
-    class Message:
-        def __init__(self, content, author_id, author_name):
-            self.id = 12345
-            self.content = content
-            self.created_at = datetime.now()
-            
-            class Author:
-                def __init__(self, uid, name):
-                    self.id = uid
-                    self.name = name
-                def __str__(self):
-                    return self.name
-            
-            class Channel:
-                def __init__(self):
-                    self.id = 111
-                    self.name = "general"
-                def __str__(self):
-                    return "general"
-            
-            class Guild:
-                def __init__(self):
-                    self.id = 999
-                    self.name = "Example Server"
-            
-            self.author = Author(author_id, author_name)
-            self.channel = Channel()
-            self.guild = Guild()
+    # Stand-ins for the Discord objects a real message carries
+    channel = StubChannel(111, StubGuild(999, "Example Server"), name="general")
     
     # Simulate message processing
     messages = [
@@ -103,7 +76,7 @@ def example_forensics_workflow():
     
     print("Processing messages:\n")
     for content, author_id, author_name in messages:
-        msg = Message(content, author_id, author_name)
+        msg = StubMessage(content, StubMember(author_id, name=author_name), channel, message_id=12345)
         analysis = detector.analyze_message(content)
         
         print(f"Message: '{content}' by {author_name}")
@@ -167,32 +140,9 @@ def example_user_tracking():
     detector = AbuseDetector()
     logger = ForensicsLogger(log_dir="example_logs")
     
-    # Mock user
-    class Message:
-        def __init__(self, content, msg_id):
-            self.id = msg_id
-            self.content = content
-            self.created_at = datetime.now()
-            
-            class Author:
-                id = 5555
-                name = "TrackedUser"
-                def __str__(self):
-                    return "TrackedUser#1234"
-            
-            class Channel:
-                id = 111
-                name = "chat"
-                def __str__(self):
-                    return "chat"
-            
-            class Guild:
-                id = 999
-                name = "Test Server"
-            
-            self.author = Author()
-            self.channel = Channel()
-            self.guild = Guild()
+    # Stand-ins for the tracked user and their channel
+    author = StubMember(5555, name="TrackedUser#1234")
+    channel = StubChannel(111, StubGuild(999, "Test Server"), name="chat")
     
     # Simulate user messages over time
     user_messages = [
@@ -203,7 +153,7 @@ def example_user_tracking():
     
     print("Tracking user 'TrackedUser#1234':\n")
     for i, content in enumerate(user_messages, 1):
-        msg = Message(content, 1000 + i)
+        msg = StubMessage(content, author, channel, message_id=1000 + i)
         analysis = detector.analyze_message(content)
         
         if analysis['is_abusive']:
@@ -0,0 +1,274 @@
+"""
+Guild Configuration Store
+Per-guild settings (auto-mod, log channel, welcome, spam limits, lexicon
+overrides) served from memory, persisted as a snapshot plus an append-only
+journal, and hot-reloaded when another process changes the files.
+"""
+
+import copy
+import json
+import os
+import tempfile
+from typing import Callable, Dict, List
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process only, no file locking
+    fcntl = None
+
+
+DEFAULTS = {
+    'auto_mod': False,
+    'log_channel': None,
+    'welcome_channel': None,
+    'welcome_message': None,
+    'spam_limits': {},  # level -> [messages, seconds], or None when disabled
+    'lexicon_add': [],
+    'lexicon_remove': [],
+}
+
+
+class GuildConfigStore:
+    """
+    Cached guild configuration with atomic, incremental writes.
+
+    Reads never touch disk. Each change is appended to `<path>.journal` as
+    one JSON line; once the journal holds `compact_after` entries it is
+    folded into the snapshot at `path`, which is replaced atomically.
+
+    Listeners registered with `subscribe(callback)` are called as
+    `callback(guild_id, key, value)` for every change, including changes
+    picked up by `reload_if_changed()` from other processes.
+    """
+
+    def __init__(self, path: str = "forensics_logs/guild_config.json", compact_after: int = 500):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.compact_after = compact_after
+        self.guilds: Dict[str, Dict] = {}
+        self.listeners: List[Callable] = []
+        self._snapshot_sig = None
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # ----- Reads (memory only) -----
+
+    def get(self, guild_id, key: str):
+        """Get a guild setting (the key's default if it was never set). Do not mutate the result."""
+        value = self.guilds.get(str(guild_id), {}).get(key)
+        return DEFAULTS[key] if value is None else value
+
+    def guild(self, guild_id) -> Dict:
+        """All settings of a guild, with defaults filled in."""
+        settings = copy.deepcopy(DEFAULTS)
+        settings.update(copy.deepcopy(self.guilds.get(str(guild_id), {})))
+        return settings
+
+    def guilds_with(self, key: str) -> Dict[int, object]:
+        """Every guild that has a key set: {guild_id: value}."""
+        return {int(guild_id): settings[key] for guild_id, settings in self.guilds.items() if key in settings}
+
+    def subscribe(self, callback: Callable) -> None:
+        """Call `callback(guild_id, key, value)` whenever a setting changes."""
+        self.listeners.append(callback)
+
+    # ----- Writes -----
+
+    def set(self, guild_id, key: str, value) -> None:
+        """Set a guild setting; None resets it to the default."""
+        self.update(guild_id, **{key: value})
+
+    def update(self, guild_id, **values) -> None:
+        """Set several settings of a guild in one journal entry."""
+        unknown = set(values) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown guild setting(s): {', '.join(sorted(unknown))}")
+        entry = json.dumps({"guild": str(guild_id), "set": values}) + "\n"
+        values = json.loads(entry)['set']  # Keep the cache independent of the caller's objects
+
+        with self._locked():
+            self._catch_up()
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(entry)
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_offset = f.tell()
+            self._journal_ino = os.stat(self.journal_path).st_ino
+            self._journal_entries += 1
+            self._apply(str(guild_id), values)
+            if self._journal_entries >= self.compact_after:
+                self._compact()
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot."""
+        with self._locked():
+            self._catch_up()
+            self._compact()
+
+    def import_legacy(self, log_channels_path: str, welcome_path: str) -> bool:
+        """
+        One-time import of the old log_channels.json / welcome_config.json.
+
+        Returns:
+            True if anything was imported
+        """
+        if self.guilds:
+            return False
+        imported = {}
+        if os.path.exists(log_channels_path):
+            with open(log_channels_path, 'r') as f:
+                for guild_id, channel_id in json.load(f).items():
+                    imported.setdefault(guild_id, {})['log_channel'] = int(channel_id)
+        if os.path.exists(welcome_path):
+            with open(welcome_path, 'r') as f:
+                welcome = json.load(f)
+            for guild_id, channel_id in welcome.get('channels', {}).items():
+                imported.setdefault(guild_id, {})['welcome_channel'] = int(channel_id)
+            for guild_id, message in welcome.get('messages', {}).items():
+                imported.setdefault(guild_id, {})['welcome_message'] = message
+        for guild_id, values in imported.items():
+            self.update(guild_id, **values)
+        return bool(imported)
+
+    # ----- Hot reload -----
+
+    def reload_if_changed(self) -> bool:
+        """
+        Pick up changes written by other processes (or by hand).
+
+        Cheap when nothing changed: two stat calls. New journal lines are
+        applied incrementally; a replaced snapshot or journal is reloaded.
+
+        Returns:
+            True if anything changed
+        """
+        with self._locked():
+            return self._catch_up()
+
+    def _catch_up(self) -> bool:
+        if self._signature(self.path) != self._snapshot_sig:
+            return self._reload()
+        try:
+            stat = os.stat(self.journal_path)
+        except FileNotFoundError:
+            return self._reload() if self._journal_offset else False
+        if stat.st_ino != self._journal_ino or stat.st_size < self._journal_offset:
+            return self._reload()
+        if stat.st_size == self._journal_offset:
+            return False
+        return self._read_journal() > 0
+
+    def _reload(self) -> bool:
+        old = self.guilds
+        self._load()
+        changed = False
+        for guild_id in set(old) | set(self.guilds):
+            before, after = old.get(guild_id, {}), self.guilds.get(guild_id, {})
+            for key in set(before) | set(after):
+                if before.get(key) != after.get(key):
+                    changed = True
+                    self._notify(guild_id, key, after.get(key))
+        return changed
+
+    # ----- Internals -----
+
+    def _locked(self):
+        return _FileLock(self.lock_path)
+
+    @staticmethod
+    def _signature(path: str):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _load(self) -> None:
+        self.guilds = {}
+        self._snapshot_sig = self._signature(self.path)
+        if self._snapshot_sig is not None:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.guilds = json.load(f).get('guilds', {})
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._journal_ino = None
+        if os.path.exists(self.journal_path):
+            self._journal_ino = os.stat(self.journal_path).st_ino
+            self._read_journal(notify=False)
+
+    def _read_journal(self, notify: bool = True) -> int:
+        applied = 0
+        with open(self.journal_path, 'rb') as f:
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partially written entry; read it next time
+                self._journal_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._journal_entries += 1
+                applied += 1
+                self._apply(entry['guild'], entry['set'], notify)
+        return applied
+
+    def _apply(self, guild_id: str, values: Dict, notify: bool = True) -> None:
+        settings = self.guilds.setdefault(guild_id, {})
+        for key, value in values.items():
+            if value is None:
+                settings.pop(key, None)
+            else:
+                settings[key] = value
+            if notify:
+                self._notify(guild_id, key, value)
+        if not settings:
+            del self.guilds[guild_id]
+
+    def _notify(self, guild_id: str, key: str, value) -> None:
+        value = DEFAULTS.get(key) if value is None else value
+        for callback in self.listeners:
+            try:
+                callback(int(guild_id), key, value)
+            except Exception as e:
+                print(f"Guild config listener failed for {key}: {e}")
+
+    def _compact(self) -> None:
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.guild_config-', suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"guilds": self.guilds}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        open(self.journal_path, 'w').close()
+        self._snapshot_sig = self._signature(self.path)
+        self._journal_ino = os.stat(self.journal_path).st_ino
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+
+class _FileLock:
+    """Exclusive lock shared by every process using the same config file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.file = open(self.path, 'a')
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.file is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+            self.file.close()
+            self.file = None
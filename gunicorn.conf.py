@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for the web dashboard (see wsgi.py).
+Override with DASHBOARD_BIND, DASHBOARD_WORKERS and DASHBOARD_THREADS
+(and DASHBOARD_MAX_STREAMS, see below).
+"""
+
+import os
+
+bind = os.environ.get('DASHBOARD_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('DASHBOARD_WORKERS', os.cpu_count() or 1))
+
+# Threaded workers: every open live feed (/api/stream) holds one thread. Each worker
+# accepts at most DASHBOARD_MAX_STREAMS feeds (default: half the threads); dashboards
+# beyond that get a 503 and poll /api/stats instead, so API requests keep a thread.
+worker_class = 'gthread'
+threads = int(os.environ.get('DASHBOARD_THREADS', 16))
+
+keepalive = 5
+accesslog = None
@@ -0,0 +1,167 @@
+"""
+Retroactive Channel History Scan
+Runs abuse detection over existing channel history in pages, with a
+checkpoint per channel so an interrupted scan resumes where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+
+PAGE_SIZE = 100  # Messages per history request (Discord's maximum)
+
+_detector = None
+
+
+def _init_worker(detector_factory: Callable) -> None:
+    """Pool initializer: build one detector per worker."""
+    global _detector
+    _detector = detector_factory()
+
+
+def analyze_batch(contents: List[str]) -> List[Dict]:
+    """Analyze a page of message contents in a pool worker."""
+    return [_detector.analyze_message(content) for content in contents]
+
+
+def create_pool(detector_factory: Callable, workers: Optional[int] = None) -> Executor:
+    """Process pool whose workers each hold a detector from `detector_factory`."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(detector_factory,))
+
+
+class ScanCheckpoints:
+    """
+    Last processed message per channel, stored in a JSON file.
+
+    The file is replaced atomically after every page, so a crash never
+    leaves it half written.
+    """
+
+    def __init__(self, path: str = "forensics_logs/scan_checkpoints.json"):
+        self.path = path
+        self.channels: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.channels = json.load(f)
+
+    def get(self, channel_id: int) -> Dict:
+        """Checkpoint for a channel (a fresh one if it was never scanned)."""
+        return self.channels.setdefault(str(channel_id), {
+            "last_message_id": None,
+            "scanned": 0,
+            "flagged": 0,
+            "severity": {"low": 0, "medium": 0, "high": 0},
+            "done": False
+        })
+
+    def reset(self, channel_id: int) -> None:
+        """Forget a channel's progress so the next scan starts from the beginning."""
+        self.channels.pop(str(channel_id), None)
+        self.save()
+
+    def save(self) -> None:
+        """Atomically write all checkpoints."""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.scan-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.channels, f)
+        os.replace(tmp, self.path)
+
+
+class HistoryScanner:
+    """
+    Scans channel history oldest-first, one page of 100 messages at a time.
+
+    Pages are analyzed in `executor` (a process pool from `create_pool`)
+    while the next page is being fetched. History requests are paced to
+    `rest_share` of a `rest_budget` requests-per-second budget, so a scan
+    leaves room for moderation actions. Abusive messages are logged through
+    `log_evidence(message, analysis)`, called in a worker thread.
+    """
+
+    def __init__(self, executor: Executor, log_evidence: Callable,
+                 checkpoints: Optional[ScanCheckpoints] = None,
+                 rest_budget: float = 50.0, rest_share: float = 0.1):
+        if not 0 < rest_share <= 1:
+            raise ValueError("rest_share must be in (0, 1]")
+        self.executor = executor
+        self.log_evidence = log_evidence
+        self.checkpoints = checkpoints or ScanCheckpoints()
+        self.min_interval = 1.0 / (rest_budget * rest_share)
+        self._next_request = 0.0
+
+    async def _fetch(self, channel, after: Optional[int]) -> List[discord.Message]:
+        delay = self._next_request - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_request = max(self._next_request, time.monotonic()) + self.min_interval
+        after = discord.Object(id=after) if after else None
+        return [m async for m in channel.history(limit=PAGE_SIZE, after=after, oldest_first=True)]
+
+    async def scan_channel(self, channel, max_messages: Optional[int] = None,
+                           progress: Optional[Callable[[int, Dict], Awaitable]] = None) -> Dict:
+        """
+        Scan a channel from its checkpoint onwards.
+
+        `progress(channel_id, checkpoint)` is awaited after every page.
+
+        Returns:
+            The channel's checkpoint (scanned/flagged counts and severity breakdown)
+        """
+        if max_messages is not None and max_messages < 1:
+            raise ValueError("max_messages must be at least 1")
+        checkpoint = self.checkpoints.get(channel.id)
+        checkpoint["done"] = False
+        loop = asyncio.get_running_loop()
+        scanned_now = 0
+
+        page = await self._fetch(channel, checkpoint["last_message_id"])
+        while page:
+            full = len(page) == PAGE_SIZE  # A short page is the end of the channel
+            if max_messages is not None:
+                page = page[:max_messages - scanned_now]
+                if not page:
+                    break  # Nothing left to index the next fetch from
+            more = full and (max_messages is None or scanned_now + len(page) < max_messages)
+            # Fetch the next page while this one is analyzed
+            next_page = loop.create_task(self._fetch(channel, page[-1].id)) if more else None
+            try:
+                batch = [m for m in page if m.content and not m.author.bot]
+                analyses = await loop.run_in_executor(self.executor, analyze_batch, [m.content for m in batch])
+            except BaseException:
+                if next_page:
+                    next_page.cancel()
+                raise
+
+            for message, analysis in zip(batch, analyses):
+                if analysis['is_abusive']:
+                    analysis['source'] = 'history_scan'
+                    await asyncio.to_thread(self.log_evidence, message, analysis)
+                    checkpoint["flagged"] += 1
+                    checkpoint["severity"][analysis['severity']] += 1
+
+            checkpoint["last_message_id"] = page[-1].id
+            checkpoint["scanned"] += len(page)
+            scanned_now += len(page)
+            self.checkpoints.save()
+            if progress:
+                await progress(channel.id, checkpoint)
+            if next_page is None:
+                if full:
+                    break  # Stopped at max_messages, more history remains
+                page = []
+            else:
+                page = await next_page
+        else:
+            checkpoint["done"] = True
+            self.checkpoints.save()
+
+        return checkpoint
@@ -0,0 +1,248 @@
+"""
+Dashboard Live Feed
+One background follower turns evidence log and warnings.json changes into
+events; every server-sent events (SSE) client reads from the same buffer.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from evidence_tail import EvidenceTail
+
+
+ALL_GUILDS = '*'  # Audience key of dashboards showing every guild
+
+# Case fields the dashboard templates display
+CASE_FIELDS = ('message_id', 'author_id', 'author_name', 'guild_id', 'guild_name',
+               'channel_name', 'content', 'created_at', 'logged_at')
+
+# (evidence log inode, byte offset in it, warnings.json version); the same in every worker
+Position = Tuple[int, int, int]
+OFFSET, WARNINGS = 1, 2  # Position component each kind of event advances
+
+
+def event_id(position: Position) -> str:
+    return '-'.join(str(part) for part in position)
+
+
+def parse_event_id(text: Optional[str]) -> Optional[Position]:
+    """The position in a Last-Event-ID, or None if it is missing or malformed."""
+    try:
+        position = tuple(int(part) for part in text.split('-'))
+    except (AttributeError, ValueError):
+        return None
+    return position if len(position) == 3 and min(position) >= 0 else None
+
+
+class Event:
+    """One feed event, delivered to dashboards whose key is in `audience` (None: all)."""
+
+    __slots__ = ('position', 'component', 'kind', 'audience', 'data')
+
+    def __init__(self, position: Position, component: int, kind: str,
+                 audience: Optional[Tuple[str, ...]], data: Dict):
+        self.position = position
+        self.component = component
+        self.kind = kind
+        self.audience = audience
+        self.data = data
+
+    @property
+    def id(self) -> str:
+        return event_id(self.position)
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.kind}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class LiveFeed:
+    """
+    Event buffer shared by all dashboard streams.
+
+    A single follower thread checks the evidence log and warnings file every
+    `poll_interval` seconds and publishes:
+      - "case": a new case (to its guild and to all-guild dashboards)
+      - "counters": the updated totals of each guild touched by a batch
+      - "warning": a member's new warning count
+    A "reset" is sent instead when a client's position can't be resumed
+    (the log was rotated, or its events fell out of the buffer); clients
+    should reload everything.
+
+    Event IDs are positions in the shared files: the log's inode and the
+    byte offset past the case, plus the warnings.json version. Every
+    dashboard worker derives the same IDs, so a client reconnecting to a
+    different worker resumes from its Last-Event-ID. The last `history`
+    events are kept for that. Work per event is independent of how many
+    dashboards are open; idle streams just wait on a condition variable.
+    """
+
+    def __init__(self, evidence_tail: EvidenceTail, warnings_path: str,
+                 poll_interval: float = 1.0, history: int = 1000):
+        self.tail = evidence_tail
+        self.warnings_path = warnings_path
+        self.poll_interval = poll_interval
+        self.events = deque(maxlen=history)
+        self.condition = threading.Condition()
+        self.position: Position = (0, 0, 0)
+        self.floor: Position = (0, 0, 0)  # Clients behind this may have missed dropped events
+        self._warnings_sig = None
+        self._warning_counts: Optional[Dict[str, int]] = None
+        self._thread = None
+        self.tail.subscribe(self._on_records)
+
+    # ----- Publishing -----
+
+    def _publish(self, batch: List[Tuple[Position, int, str, Optional[Tuple[str, ...]], Dict]]) -> None:
+        with self.condition:
+            for position, component, kind, audience, data in batch:
+                if len(self.events) == self.events.maxlen:
+                    self.floor = self.events[0].position
+                self.events.append(Event(position, component, kind, audience, data))
+                self.position = position
+            self.condition.notify_all()
+
+    def _on_records(self, records: List[Dict], rebuilt: bool, offsets: List[int]) -> None:
+        inode, warnings = self.tail.inode or 0, self.position[WARNINGS]
+        if rebuilt:
+            with self.condition:
+                self.events.clear()
+                self.position = self.floor = (inode, self.tail.offset, warnings)
+                self.condition.notify_all()
+            return
+        batch = []
+        touched = set()
+        for record, offset in zip(records, offsets):
+            guild_id = str(record['guild_id']) if record.get('guild_id') else None
+            case = {field: record.get(field) for field in CASE_FIELDS}
+            case['analysis'] = {'severity': record.get('analysis', {}).get('severity', 'low')}
+            audience = (guild_id, ALL_GUILDS) if guild_id else (ALL_GUILDS,)
+            batch.append(((inode, offset, warnings), OFFSET, 'case', audience, case))
+            if guild_id:
+                touched.add(guild_id)
+        for scope in sorted(touched) + [ALL_GUILDS]:
+            stats = self.tail.statistics(None if scope == ALL_GUILDS else scope)
+            stats.pop('recent_cases')
+            batch.append(((inode, offsets[-1], warnings), OFFSET, 'counters', (scope,), stats))
+        self._publish(batch)
+
+    def check_warnings(self) -> None:
+        """Publish warning count changes if warnings.json was rewritten."""
+        try:
+            stat = os.stat(self.warnings_path)
+        except FileNotFoundError:
+            return
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._warnings_sig:
+            return
+        try:
+            with open(self.warnings_path, 'r') as f:
+                warnings = json.load(f)
+        except (OSError, ValueError):
+            return  # Mid-write; try again next poll
+        self._warnings_sig = signature
+        # The file's mtime, kept increasing if two rewrites land in the same clock tick
+        version = max(stat.st_mtime_ns, self.position[WARNINGS] + 1)
+
+        counts = {key: len(warns) for key, warns in warnings.items()}
+        previous, self._warning_counts = self._warning_counts, counts
+        if previous is None:
+            # First look: nothing to compare against, and nothing earlier to resume from
+            with self.condition:
+                self.position = self.position[:WARNINGS] + (version,)
+                self.floor = self.floor[:WARNINGS] + (version,)
+            return
+        position = self.position[:WARNINGS] + (version,)
+        batch = []
+        for key in set(previous) | set(counts):
+            if previous.get(key) != counts.get(key):
+                guild_id, _, user_id = key.partition(':')
+                data = {'guild_id': guild_id, 'user_id': user_id, 'count': counts.get(key, 0)}
+                batch.append((position, WARNINGS, 'warning', (guild_id, ALL_GUILDS), data))
+        if batch:
+            self._publish(batch)
+
+    def poll(self) -> None:
+        """Check both files once."""
+        self.tail.refresh()
+        self.check_warnings()
+
+    def _follow(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Live feed poll failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Start the follower thread (once)."""
+        with self.condition:
+            if self._thread is None:
+                self.poll()  # Baseline, so only later changes are published and resumes line up
+                self._thread = threading.Thread(target=self._follow, name="live-feed", daemon=True)
+                self._thread.start()
+
+    # ----- Subscribing -----
+
+    def _stale(self, position: Position) -> bool:
+        """Whether events after `position` can't be replayed from this buffer."""
+        inode, offset, warnings = position
+        if inode and inode != self.position[0]:
+            return True  # Rotated log (inode 0: connected before there was a log)
+        if offset < self.floor[OFFSET] or warnings < self.floor[WARNINGS]:
+            return True  # Events dropped from the buffer
+        if offset > self.position[OFFSET]:
+            try:
+                return offset > os.path.getsize(self.tail.path)  # Truncated; otherwise we are just behind
+            except OSError:
+                return True
+        return False
+
+    def _pending(self, position: Position, audience: str) -> List[Event]:
+        return [event for event in self.events
+                if event.position[event.component] > position[event.component]
+                and (event.audience is None or audience in event.audience)]
+
+    def events_after(self, position: Position, audience: str,
+                     timeout: float) -> Tuple[Optional[List[Event]], Position]:
+        """
+        Wait up to `timeout` seconds for events after `position`.
+
+        Returns:
+            (events for `audience` or None if `position` can't be resumed, new position)
+        """
+        with self.condition:
+            if self._stale(position):
+                return None, self.position
+            pending = self._pending(position, audience)
+            if not pending:
+                self.condition.wait(timeout)
+                if self._stale(position):
+                    return None, self.position
+                pending = self._pending(position, audience)
+            # Past everything seen here, but not back to where a lagging worker is
+            return pending, (self.position[0], max(position[OFFSET], self.position[OFFSET]),
+                             max(position[WARNINGS], self.position[WARNINGS]))
+
+    def stream(self, guild_id: Optional[str], last_event_id: Optional[str] = None,
+               heartbeat: float = 15.0) -> Iterator[str]:
+        """Server-sent events for one dashboard, resuming after `last_event_id` if given."""
+        audience = str(guild_id) if guild_id else ALL_GUILDS
+        position = parse_event_id(last_event_id) or self.position
+        yield f"retry: 3000\n\n"
+        last_sent = time.monotonic()
+        while True:
+            events, position = self.events_after(position, audience, heartbeat)
+            if events is None:
+                yield f"id: {event_id(position)}\nevent: reset\ndata: {{}}\n\n"
+            elif events:
+                yield "".join(event.encode() for event in events)
+            elif time.monotonic() - last_sent >= heartbeat:
+                yield ": heartbeat\n\n"
+            else:
+                continue  # Only other guilds' events; keep waiting
+            last_sent = time.monotonic()
@@ -0,0 +1,313 @@
+"""
+Offline Load Generator
+Replays a mix of clean, abusive, spam-burst and raid traffic through a
+bot's on_message at a target rate, with Discord's REST API simulated (see
+discord_stubs.py), and reports end-to-end latency, event-loop lag, queue
+depths and dropped work. Useful for sizing instances before deploying.
+
+    python load_generator.py --rate 200 --duration 30
+    python load_generator.py --bot respect_ranger --mix clean=0.7,abusive=0.2,raid=0.1
+    python load_generator.py --rest-latency 0.3 --rest-errors 0.05 --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from typing import Dict, Iterator, List
+
+from benchmark import corpus
+from discord_stubs import RestSimulator, StubWorld, StubMessage
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = {"clean": 0.85, "abusive": 0.1, "spam": 0.04, "raid": 0.01}
+BOTS = ("guardify", "respect_ranger")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "clean=0.8,abusive=0.2" into normalized weights."""
+    mix = {}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown traffic kind {kind!r} (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[kind] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Traffic mix weights must add up to more than 0")
+    return {kind: weight / total for kind, weight in mix.items()}
+
+
+def percentiles(samples: List[float]) -> Dict:
+    """p50/p99/max of `samples` (seconds) in milliseconds."""
+    if not samples:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    samples = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3)
+    }
+
+
+def create_bot(name: str, world: StubWorld):
+    """
+    An unconnected bot wired to `world`, with auto-mod and a log channel
+    enabled in every stub guild. Must be called from the working directory
+    the bot should write its logs to.
+    """
+    if name == "guardify":
+        from bot_enhanced import Guardify, intents
+        bot = Guardify(command_prefix='!', intents=intents)
+        for guild in world.guilds:
+            log_channel = next(c for c in world.channels.values() if c.guild is guild)
+            bot.config.update(guild.id, auto_mod=True, log_channel=log_channel.id)
+    elif name == "respect_ranger":
+        from bot import RespectRanger, intents
+        bot = RespectRanger(command_prefix='!', intents=intents)
+    else:
+        raise ValueError(f"Unknown bot {name!r} (expected one of {', '.join(BOTS)})")
+    world.attach(bot)
+    return bot
+
+
+class LoadGenerator:
+    """
+    Open-loop traffic source for one bot.
+
+    Messages are dispatched on schedule whether or not earlier ones have
+    been handled, each in its own task as discord.py does for gateway
+    events, so a saturated bot shows up as growing latency and queues
+    rather than as a lower send rate. Latency is measured from a message's
+    scheduled arrival to the end of its on_message call; moderation
+    actions queued by the handler are covered by the queue depths.
+    """
+
+    def __init__(self, bot, world: StubWorld, rate: float = 100.0, duration: float = 10.0,
+                 mix: Dict[str, float] = None, burst: int = 8, raid_size: int = 50,
+                 members: int = 2000, words: int = 12, seed: int = 1, sample_interval: float = 0.05):
+        self.bot = bot
+        self.world = world
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.burst = burst
+        self.raid_size = raid_size
+        self.members = members
+        self.random = random.Random(seed)
+        self.sample_interval = sample_interval
+        self.clean = corpus(500, words, abusive_share=0.0, seed=seed)
+        self.abusive = corpus(500, words, abusive_share=1.0, seed=seed + 1)
+        self.channels = list(world.channels.values())
+        self.next_raider = 10 ** 6
+
+        self.latencies: List[float] = []
+        self.loop_lag: List[float] = []
+        self.queue_samples: Dict[str, List[int]] = {"handlers": [], "actions": [], "deletions": [], "log_outbox": []}
+        self.sent: Dict[str, int] = {kind: 0 for kind in DEFAULT_MIX}
+        self.handler_errors = 0
+        self.inflight = 0
+
+    def events(self) -> Iterator[List[StubMessage]]:
+        """Endless traffic: each event is one message, a spam burst or a raid wave."""
+        kinds, weights = zip(*self.mix.items())
+        while True:
+            kind = self.random.choices(kinds, weights)[0]
+            channel = self.random.choice(self.channels)
+            user_id = 1000 + self.random.randrange(self.members)
+            if kind == "clean":
+                messages = [self.world.message(self.random.choice(self.clean), user_id, channel)]
+            elif kind == "abusive":
+                messages = [self.world.message(self.random.choice(self.abusive), user_id, channel)]
+            elif kind == "spam":
+                content = self.random.choice(self.clean)
+                messages = [self.world.message(content, user_id, channel) for _ in range(self.burst)]
+            else:
+                # Fresh accounts posting the same text across the guild's channels
+                content = self.random.choice(self.abusive)
+                channels = [c for c in self.channels if c.guild is channel.guild]
+                messages = []
+                for _ in range(self.raid_size):
+                    self.next_raider += 1
+                    messages.append(self.world.message(content, self.next_raider, self.random.choice(channels)))
+            self.sent[kind] += len(messages)
+            yield messages
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current backlog of each queue the bot feeds."""
+        bot = self.bot
+        outbox = getattr(bot, 'log_outbox', None)
+        return {
+            "handlers": self.inflight,
+            "actions": bot.actions.queue_depth,
+            "deletions": bot.deletion_queue.queue_depth,
+            "log_outbox": outbox.queue_depth if outbox is not None else 0
+        }
+
+    async def _handle(self, message: StubMessage, due: float) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await self.bot.on_message(message)
+        except Exception:
+            self.handler_errors += 1
+        finally:
+            self.latencies.append(loop.time() - due)
+            self.inflight -= 1
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.sample_interval)
+            self.loop_lag.append(max(0.0, loop.time() - started - self.sample_interval))
+            for queue, depth in self.queue_depths().items():
+                self.queue_samples[queue].append(depth)
+
+    async def _drain(self) -> None:
+        await self.bot.deletion_queue.close()
+        if getattr(self.bot, 'log_outbox', None) is not None:
+            await self.bot.log_outbox.close()
+        await self.bot.actions.close()
+
+    async def run(self, drain_timeout: float = 30.0) -> Dict:
+        """Generate traffic for `duration` seconds, wait for the backlog, and report."""
+        loop = asyncio.get_running_loop()
+        sampler = loop.create_task(self._sample())
+        monitor = getattr(self.bot, 'loop_monitor', None)  # Names the calls that block the loop
+        if monitor is not None:
+            monitor.start()
+        handlers = set()
+        dispatched = 0
+        started = loop.time()
+        for messages in self.events():
+            due = started + dispatched / self.rate
+            if due >= started + self.duration:
+                break
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            for message in messages:
+                self.inflight += 1
+                task = loop.create_task(self._handle(message, due))
+                handlers.add(task)
+                task.add_done_callback(handlers.discard)
+            dispatched += len(messages)
+        dispatch_seconds = loop.time() - started
+
+        drain_started = loop.time()
+        if handlers:
+            await asyncio.wait(set(handlers), timeout=drain_timeout)
+        unfinished = len(handlers)
+        sampler.cancel()
+        if monitor is not None:
+            monitor.stop()
+        try:
+            await asyncio.wait_for(self._drain(), drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        drain_seconds = loop.time() - drain_started
+
+        actions = self.bot.actions.stats()
+        outbox = getattr(self.bot, 'log_outbox', None)
+        return {
+            "messages": dispatched,
+            "sent_by_kind": dict(self.sent),
+            "target_rate": self.rate,
+            "achieved_rate": round(dispatched / dispatch_seconds, 1) if dispatch_seconds else 0.0,
+            "latency": percentiles(self.latencies),
+            "loop_lag": percentiles(self.loop_lag),
+            "queue_depth": {
+                queue: {"max": max(samples, default=0),
+                        "mean": round(statistics.fmean(samples), 1) if samples else 0.0}
+                for queue, samples in self.queue_samples.items()
+            },
+            "dropped": {
+                "handler_errors": self.handler_errors,
+                "unfinished_handlers": unfinished,
+                "failed_actions": actions["failed"],
+                "log_embeds_dropped": outbox.embeds_dropped if outbox is not None else 0,
+                "actions_left_queued": actions["queue_depth"]
+            },
+            "actions": actions,
+            "rest": self.world.rest.stats(),
+            "blocking_sites": monitor.stats()["top_sites"] if monitor is not None else [],
+            "drain_seconds": round(drain_seconds, 2)
+        }
+
+
+def print_report(bot_name: str, report: Dict) -> None:
+    print(f"\n{bot_name}: {report['messages']} messages at {report['achieved_rate']}/s "
+          f"(target {report['target_rate']}/s) {report['sent_by_kind']}")
+    print(f"{'':<22} {'p50 ms':>10} {'p99 ms':>10} {'max ms':>10}")
+    for label, key in (("end-to-end latency", "latency"), ("event loop lag", "loop_lag")):
+        values = report[key]
+        print(f"{label:<22} {values['p50_ms']:>10.2f} {values['p99_ms']:>10.2f} {values['max_ms']:>10.2f}")
+    print(f"{'queue depth':<22} {'mean':>10} {'max':>10}")
+    for queue, depth in report['queue_depth'].items():
+        print(f"  {queue:<20} {depth['mean']:>10} {depth['max']:>10}")
+    print("dropped: " + ", ".join(f"{key}={value}" for key, value in report['dropped'].items()))
+    print(f"REST calls: {report['rest']['total_calls']} {report['rest']['calls']} "
+          f"(max {report['rest']['max_inflight']} in flight), drained in {report['drain_seconds']}s")
+    for site, stalls in report['blocking_sites']:
+        print(f"loop blocked {stalls}x at {site}")
+
+
+def run(args) -> Dict[str, Dict]:
+    reports = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The bots write logs, warnings and config to the working directory
+        sys.path.insert(0, REPO_DIR)
+        previous = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            for bot_name in args.bot:
+                rest = RestSimulator(args.rest_latency, args.rest_jitter, args.rest_errors, seed=args.seed)
+                world = StubWorld(rest, guilds=args.guilds, channels_per_guild=args.channels)
+                with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                    bot = create_bot(bot_name, world)
+                    generator = LoadGenerator(
+                        bot, world, rate=args.rate, duration=args.duration, mix=args.mix,
+                        burst=args.burst, raid_size=args.raid_size, members=args.members, seed=args.seed
+                    )
+                    reports[bot_name] = asyncio.run(generator.run(args.drain_timeout))
+                print_report(bot_name, reports[bot_name])
+        finally:
+            os.chdir(previous)
+    return reports
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Drive the bots' on_message offline with simulated traffic")
+    parser.add_argument("--bot", nargs="+", choices=BOTS, default=["guardify"], help="Bots to drive")
+    parser.add_argument("--rate", type=float, default=100.0, help="Target messages per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of traffic")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Traffic mix, e.g. clean=0.85,abusive=0.1,spam=0.04,raid=0.01")
+    parser.add_argument("--burst", type=int, default=8, help="Messages per spam burst")
+    parser.add_argument("--raid-size", type=int, default=50, help="Accounts per raid wave")
+    parser.add_argument("--members", type=int, default=2000, help="Regular members sending messages")
+    parser.add_argument("--guilds", type=int, default=1, help="Guilds the traffic is spread over")
+    parser.add_argument("--channels", type=int, default=5, help="Channels per guild")
+    parser.add_argument("--rest-latency", type=float, default=0.08, help="Mean simulated REST latency (seconds)")
+    parser.add_argument("--rest-jitter", type=float, default=0.04, help="REST latency jitter (seconds)")
+    parser.add_argument("--rest-errors", type=float, default=0.0, help="Share of REST calls that fail")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="Seconds to wait for the backlog")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--json", default=None, help="Also write the reports to this file")
+    args = parser.parse_args()
+
+    reports = run(args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
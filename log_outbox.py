@@ -0,0 +1,135 @@
+"""
+Batched Moderation Log Delivery
+Packs moderation log embeds into as few log channel messages as possible, so
+a raid produces a handful of sends instead of one per moderation event.
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List
+
+import discord
+
+
+class ChannelOutbox:
+    """Embeds waiting to be delivered to one log channel."""
+
+    __slots__ = ('embeds', 'overflow', 'task')
+
+    def __init__(self):
+        self.embeds: List[discord.Embed] = []
+        self.overflow = 0
+        self.task = None
+
+
+class LogOutbox:
+    """
+    Per-log-channel outbox for moderation log embeds.
+
+    Embeds are sent up to 10 per message (Discord's limit), either `interval`
+    seconds after the first one is queued or as soon as 10 are waiting. At
+    most `max_backlog` embeds are kept per channel; anything beyond that is
+    summarized as "+N more actions" on the next message.
+
+    When a `scheduler` (ActionScheduler) is given, sends are submitted to it
+    as "log" actions; otherwise they are awaited directly.
+    """
+
+    MAX_EMBEDS = 10
+
+    def __init__(self, resolve_channel: Callable[[int], object],
+                 interval: float = 2.0, max_backlog: int = 50, scheduler=None):
+        self.resolve_channel = resolve_channel
+        self.scheduler = scheduler
+        self.interval = interval
+        self.max_backlog = max_backlog
+        self.outboxes: Dict[int, ChannelOutbox] = {}
+        self._tasks = set()  # Early flushes of full batches, kept referenced until done
+        self.messages_sent = 0
+        self.embeds_sent = 0
+        self.embeds_dropped = 0
+        self.last_send_latency = 0.0
+        self.total_send_latency = 0.0
+
+    def put(self, channel_id: int, embed: discord.Embed) -> None:
+        """Queue an embed for a log channel."""
+        outbox = self.outboxes.get(channel_id)
+        if outbox is None:
+            outbox = self.outboxes[channel_id] = ChannelOutbox()
+        if outbox.task is None:
+            outbox.task = asyncio.get_running_loop().create_task(self._flush_later(channel_id))
+
+        if len(outbox.embeds) >= self.max_backlog:
+            outbox.overflow += 1
+            return
+        outbox.embeds.append(embed)
+
+        if len(outbox.embeds) == self.MAX_EMBEDS:
+            outbox.task.cancel()
+            task = outbox.task = asyncio.get_running_loop().create_task(self.flush(channel_id))
+            self._tasks.add(task)  # flush() drops the outbox, so it can't hold the only reference
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush_later(self, channel_id: int):
+        await asyncio.sleep(self.interval)
+        await self.flush(channel_id)
+
+    async def flush(self, channel_id: int) -> None:
+        """Send everything queued for a log channel."""
+        outbox = self.outboxes.pop(channel_id, None)
+        if outbox is None:
+            return
+
+        channel = self.resolve_channel(channel_id)
+        if channel is None:
+            self.embeds_dropped += len(outbox.embeds) + outbox.overflow
+            return
+
+        embeds = outbox.embeds
+        for start in range(0, len(embeds), self.MAX_EMBEDS):
+            chunk = embeds[start:start + self.MAX_EMBEDS]
+            last = start + self.MAX_EMBEDS >= len(embeds)
+            content = f"+{outbox.overflow} more actions" if last and outbox.overflow else None
+            started = time.perf_counter()
+            try:
+                if self.scheduler is None:
+                    await channel.send(content=content, embeds=chunk)
+                else:
+                    await self.scheduler.run(
+                        'log',
+                        lambda: channel.send(content=content, embeds=chunk),
+                        route=('channel', channel_id)
+                    )
+            except discord.HTTPException as e:
+                print(f"Failed to send log to channel: {e}")
+                self.embeds_dropped += len(embeds) - start + outbox.overflow
+                return
+            self.last_send_latency = time.perf_counter() - started
+            self.total_send_latency += self.last_send_latency
+            self.messages_sent += 1
+            self.embeds_sent += len(chunk)
+
+    @property
+    def queue_depth(self) -> int:
+        """Embeds waiting across all log channels."""
+        return sum(len(outbox.embeds) for outbox in self.outboxes.values())
+
+    def stats(self) -> Dict:
+        """Get delivery statistics for the outbox."""
+        return {
+            "queue_depth": self.queue_depth,
+            "channels_pending": len(self.outboxes),
+            "messages_sent": self.messages_sent,
+            "embeds_sent": self.embeds_sent,
+            "embeds_dropped": self.embeds_dropped,
+            "last_send_latency": round(self.last_send_latency, 4),
+            "avg_send_latency": round(self.total_send_latency / self.messages_sent, 4) if self.messages_sent else 0.0
+        }
+
+    async def close(self) -> None:
+        """Flush the backlog of every log channel immediately."""
+        for channel_id in list(self.outboxes):
+            outbox = self.outboxes.get(channel_id)
+            if outbox and outbox.task:
+                outbox.task.cancel()
+            await self.flush(channel_id)
@@ -0,0 +1,162 @@
+"""
+Event Loop Monitor
+Watchdog that measures asyncio event-loop lag and, while the loop is
+blocked, captures the loop thread's stack from a helper thread to show
+which synchronous call stalled it.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+from metrics import Metrics, NULL_METRICS
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Stall:
+    """One period during which the loop was blocked past the threshold."""
+
+    __slots__ = ('detected_at', 'duration', 'site', 'stack')
+
+    def __init__(self, detected_at: float, duration: float, site: str, stack: List[str]):
+        self.detected_at = detected_at  # Unix time
+        self.duration = duration  # Seconds; final once the loop resumes
+        self.site = site
+        self.stack = stack
+
+    def to_dict(self) -> Dict:
+        return {
+            "detected_at": self.detected_at,
+            "duration_ms": round(self.duration * 1000, 1),
+            "site": self.site,
+            "stack": self.stack
+        }
+
+
+def blocking_site(frame) -> str:
+    """
+    Where the loop thread is stuck, as "file.py:123 in function".
+
+    Reports the innermost frame in this repository, so a stall inside
+    json or csv is attributed to the bot code that called it.
+    """
+    innermost = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(REPO_DIR + os.sep):
+            break
+        frame = frame.f_back
+    frame = frame or innermost
+    filename = frame.f_code.co_filename
+    if filename.startswith(REPO_DIR + os.sep):
+        filename = os.path.relpath(filename, REPO_DIR)
+    return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+class LoopMonitor:
+    """
+    Event-loop lag watchdog.
+
+    A coroutine on the loop sleeps for `interval` and records how late it
+    wakes up (the loop lag). A helper thread checks how long it has been
+    since the last wake-up; once that exceeds `threshold` it grabs the
+    loop thread's current frame, which is the blocking call itself, and
+    records one Stall per blocked period. Lag goes to the
+    event_loop_lag_seconds histogram and stalls to
+    event_loop_stalls_total{site=...}.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, metrics: Optional[Metrics] = None,
+                 history: int = 20, window: int = 600, stack_depth: int = 12):
+        self.interval = interval
+        self.threshold = threshold
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.stack_depth = stack_depth
+        self.lag_samples = deque(maxlen=window)  # Most recent lag measurements (seconds)
+        self.max_lag = 0.0
+        self.stalls = deque(maxlen=history)
+        self.stall_count = 0
+        self.sites = Counter()  # Blocking site -> stalls
+        self._lock = threading.Lock()
+        self._last_tick = 0.0
+        self._tick = 0
+        self._captured_tick = -1
+        self._current: Optional[Stall] = None
+        self._loop_thread = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop (call from a coroutine on it)."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._ticker())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the ticker and the helper thread."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._stop.set()
+
+    async def _ticker(self) -> None:
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - self.interval)
+            with self._lock:
+                self._last_tick = now
+                self._tick += 1
+                stall, self._current = self._current, None
+            if stall is not None:
+                stall.duration = max(stall.duration, lag)
+            self.lag_samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self.metrics.observe('event_loop_lag_seconds', lag)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(min(self.interval, self.threshold / 2)):
+            with self._lock:
+                blocked = time.monotonic() - self._last_tick - self.interval
+                if blocked < self.threshold or self._captured_tick == self._tick:
+                    continue
+                self._captured_tick = self._tick  # One capture per blocked period
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stall = Stall(time.time(), blocked, blocking_site(frame),
+                          traceback.format_stack(frame, limit=self.stack_depth))
+            del frame
+            with self._lock:
+                self._current = stall
+            self.stalls.append(stall)
+            self.stall_count += 1
+            self.sites[stall.site] += 1
+            self.metrics.inc('event_loop_stalls_total', site=stall.site)
+
+    def stats(self, top: int = 5) -> Dict:
+        """Recent lag percentiles, stall counts, top blocking sites and the last stall."""
+        samples = sorted(self.lag_samples)
+        stalls = list(self.stalls)
+        return {
+            "lag_p50_ms": round(samples[len(samples) // 2] * 1000, 2) if samples else 0.0,
+            "lag_p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2) if samples else 0.0,
+            "lag_max_ms": round(self.max_lag * 1000, 2),
+            "threshold_ms": round(self.threshold * 1000),
+            "stalls": self.stall_count,
+            "top_sites": self.sites.most_common(top),
+            "last_stall": stalls[-1].to_dict() if stalls else None
+        }
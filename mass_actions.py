@@ -0,0 +1,135 @@
+"""
+Mass Moderation Helpers
+Target selection and bounded fan-out for raid response commands
+(/massban, /masskick, /masstimeout).
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+MENTION_PATTERN = re.compile(r'<@!?(\d+)>|(\d{15,20})')
+FINGERPRINT_NOISE = re.compile(r'<[@#][!&]?\d+>|https?://\S+|\d+')
+
+
+def parse_user_ids(text: Optional[str]) -> List[int]:
+    """Extract user IDs from a list of mentions and/or raw IDs, keeping order."""
+    if not text:
+        return []
+    ids = []
+    seen = set()
+    for mention, raw in MENTION_PATTERN.findall(text):
+        user_id = int(mention or raw)
+        if user_id not in seen:
+            seen.add(user_id)
+            ids.append(user_id)
+    return ids
+
+
+def fingerprint(content: str) -> str:
+    """
+    Fingerprint message content for flood matching.
+
+    Mentions, links and numbers are stripped and whitespace collapsed, so
+    raid messages that only differ in who they ping still match.
+    """
+    normalized = FINGERPRINT_NOISE.sub('', content.lower())
+    normalized = ' '.join(normalized.split())
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+class FloodTracker:
+    """
+    Recent message fingerprints per guild, with the authors who posted them.
+
+    Entries older than `window` seconds are forgotten, and at most
+    `max_fingerprints` are kept per guild (least recently seen dropped first).
+    """
+
+    def __init__(self, window: float = 600.0, max_fingerprints: int = 2000):
+        self.window = window
+        self.max_fingerprints = max_fingerprints
+        # guild_id -> fingerprint -> [last_seen, sample content, {author_id: last_seen}]
+        self.guilds: Dict[int, OrderedDict] = {}
+
+    def record(self, guild_id: int, author_id: int, content: str, now: Optional[float] = None) -> str:
+        """Record a message and return its fingerprint."""
+        if not content:
+            return ''
+        now = time.monotonic() if now is None else now
+        key = fingerprint(content)
+        prints = self.guilds.setdefault(guild_id, OrderedDict())
+        entry = prints.get(key)
+        if entry is None:
+            entry = prints[key] = [now, content[:100], {}]
+        else:
+            prints.move_to_end(key)
+            entry[0] = now
+        entry[2][author_id] = now
+
+        while prints and (len(prints) > self.max_fingerprints
+                          or next(iter(prints.values()))[0] < now - self.window):
+            prints.popitem(last=False)
+        return key
+
+    def authors(self, guild_id: int, key: str, now: Optional[float] = None) -> List[int]:
+        """Authors who posted a fingerprint within the window."""
+        now = time.monotonic() if now is None else now
+        entry = self.guilds.get(guild_id, {}).get(key)
+        if entry is None:
+            return []
+        return [author for author, seen in entry[2].items() if seen >= now - self.window]
+
+    def top(self, guild_id: int, limit: int = 5, now: Optional[float] = None) -> List[Tuple[str, int, str]]:
+        """Fingerprints posted by the most distinct authors: (fingerprint, authors, sample)."""
+        now = time.monotonic() if now is None else now
+        ranked = []
+        for key, (seen, sample, _) in self.guilds.get(guild_id, {}).items():
+            if seen >= now - self.window:
+                ranked.append((key, len(self.authors(guild_id, key, now)), sample))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:limit]
+
+
+async def fan_out(targets: Iterable, action: Callable[[object], Awaitable],
+                  concurrency: int = 10,
+                  progress: Optional[Callable[[int, int], Awaitable]] = None,
+                  progress_interval: float = 1.0) -> Tuple[List, List[Tuple[object, Exception]]]:
+    """
+    Run `action` for every target with at most `concurrency` running at once.
+
+    `progress(done, total)` is awaited at most every `progress_interval`
+    seconds while work is running.
+
+    Returns:
+        (succeeded targets, [(failed target, error), ...])
+    """
+    targets = list(targets)
+    semaphore = asyncio.Semaphore(concurrency)
+    succeeded, failed = [], []
+    last_report = time.monotonic()
+
+    async def worker(target):
+        nonlocal last_report
+        async with semaphore:
+            try:
+                await action(target)
+                succeeded.append(target)
+            except Exception as e:
+                failed.append((target, e))
+        if progress and time.monotonic() - last_report >= progress_interval:
+            last_report = time.monotonic()
+            await progress(len(succeeded) + len(failed), len(targets))
+
+    await asyncio.gather(*(worker(target) for target in targets))
+    return succeeded, failed
+
+
+def chunked(items: List, size: int) -> Iterable[List]:
+    """Split a list into consecutive chunks of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
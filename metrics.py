@@ -0,0 +1,221 @@
+"""
+Bot Metrics
+Counters, latency histograms and gauges for the message pipeline, rendered
+in the Prometheus text exposition format for a /metrics endpoint.
+"""
+
+import bisect
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # Seconds
+
+# Help text for the series the bots record
+DESCRIPTIONS = {
+    'messages_total': "Messages handled by on_message",
+    'messages_flagged_total': "Messages flagged as abusive",
+    'spam_hits_total': "Messages over a spam rate limit, by exhausted level",
+    'caps_hits_total': "Messages removed for excessive caps",
+    'message_stage_seconds': "Time spent in each on_message stage",
+    'discord_request_seconds': "Discord REST call latency, per attempt",
+    'discord_requests_total': "Discord REST call attempts by result",
+    'file_bytes_written_total': "Bytes written to evidence and warnings files",
+    'event_loop_lag_seconds': "How late the event loop ran a timer due every 100 ms",
+    'event_loop_stalls_total': "Times the event loop was blocked past the threshold, by blocking call",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def format_labels(labels: Labels) -> str:
+    """Label pairs as {name="value",...}, escaped for the text format."""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_number(value: float) -> str:
+    if isinstance(value, float):
+        if value != value:
+            return "NaN"
+        if value in (float('inf'), float('-inf')):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values."""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Timer:
+    """Context manager adding its elapsed time to a histogram."""
+
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+
+
+class NullTimer:
+    """Timer used when metrics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class Metrics:
+    """
+    In-process metrics registry.
+
+    Recording is a dict lookup plus an increment, done on the event loop;
+    `render()` may run on another thread (the health server) and works on
+    copies of each series taken under the GIL. Gauges are callbacks read
+    at render time, so queue depths cost nothing between scrapes. With
+    `enabled=False` every recording call is a no-op.
+    """
+
+    def __init__(self, prefix: str = "guardify", enabled: bool = True):
+        self.prefix = prefix
+        self.enabled = enabled
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.callbacks: Dict[str, Tuple[str, str, Callable, Optional[str]]] = {}
+        self._stages: Dict[str, Histogram] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add `value` to a counter."""
+        if not self.enabled:
+            return
+        series = self.counters.get(name)
+        if series is None:
+            series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items())) if labels else ()
+        series[key] = series.get(key, 0) + value
+
+    def _histogram(self, name: str, labels: Dict) -> Histogram:
+        series = self.histograms.get(name)
+        if series is None:
+            series = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items())) if labels else ()
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record one value in a latency histogram."""
+        if self.enabled:
+            self._histogram(name, labels).observe(seconds)
+
+    def time(self, name: str, **labels):
+        """Context manager timing its block into a latency histogram."""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self._histogram(name, labels))
+
+    def stage(self, stage: str):
+        """Time one on_message stage (message_stage_seconds{stage=...})."""
+        if not self.enabled:
+            return NULL_TIMER
+        histogram = self._stages.get(stage)
+        if histogram is None:
+            histogram = self._stages[stage] = self._histogram('message_stage_seconds', {'stage': stage})
+        return Timer(histogram)
+
+    def register(self, name: str, help: str, read: Callable, kind: str = 'gauge',
+                 label: Optional[str] = None) -> None:
+        """
+        Export a value read at render time.
+
+        `read()` returns a number, or a dict of numbers keyed by the value
+        of `label`. `kind` is "gauge" or "counter".
+        """
+        self.callbacks[name] = (help, kind, read, label)
+
+    # ----- Rendering -----
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(full: str, name: str, kind: str, help: str = None) -> None:
+            help = help or DESCRIPTIONS.get(name)
+            if help:
+                lines.append(f"# HELP {full} {help}")
+            lines.append(f"# TYPE {full} {kind}")
+
+        for name, series in sorted(list(self.counters.items())):
+            full = f"{self.prefix}_{name}"
+            header(full, name, 'counter')
+            for labels, value in sorted(list(series.items())):
+                lines.append(f"{full}{format_labels(labels)} {format_number(value)}")
+
+        for name, series in sorted(list(self.histograms.items())):
+            full = f"{self.prefix}_{name}"
+            header(full, name, 'histogram')
+            for labels, histogram in sorted(list(series.items())):
+                counts = list(histogram.counts)
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + (float('inf'),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float('inf') else repr(bound)
+                    lines.append(f"{full}_bucket{format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{full}_sum{format_labels(labels)} {format_number(histogram.sum)}")
+                lines.append(f"{full}_count{format_labels(labels)} {cumulative}")
+
+        for name, (help, kind, read, label) in sorted(list(self.callbacks.items())):
+            try:
+                value = read()
+            except Exception:
+                continue  # Read mid-update from another thread; skip this scrape
+            full = f"{self.prefix}_{name}"
+            header(full, name, kind, help)
+            if isinstance(value, dict):
+                for key, item in sorted(value.items()):
+                    lines.append(f"{full}{format_labels(((label, key),))} {format_number(item)}")
+            else:
+                lines.append(f"{full} {format_number(value)}")
+
+        full = f"{self.prefix}_uptime_seconds"
+        header(full, 'uptime_seconds', 'gauge', "Seconds since the metrics registry was created")
+        lines.append(f"{full} {format_number(round(time.time() - self.started, 3))}")
+        return "\n".join(lines) + "\n"
+
+
+NULL_METRICS = Metrics(enabled=False)  # Default for components created without metrics
@@ -0,0 +1,178 @@
+"""
+Live Profiling
+cProfile sessions over live traffic and tracemalloc snapshot diffs for the
+running bot, so production slowdowns and memory growth can be examined
+without a restart.
+"""
+
+import asyncio
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+SORT_KEYS = {'cumulative': 3, 'tottime': 2, 'calls': 1}  # Index into a pstats entry
+
+
+def short_path(filename: str) -> str:
+    """Repository-relative path for bot code, last two components otherwise."""
+    if filename.startswith(REPO_DIR + os.sep):
+        return os.path.relpath(filename, REPO_DIR)
+    return os.sep.join(filename.split(os.sep)[-2:])
+
+
+class LiveProfiler:
+    """
+    cProfile over the event loop thread for a fixed time.
+
+    The profiler is enabled from a coroutine and left on while the loop
+    keeps handling live traffic, then the stats are dumped to a .pstats
+    file (load it with `python -m pstats <file>` or snakeviz). Work in
+    other threads and processes, e.g. the history scan pool, is not
+    included. One session runs at a time and the newest `keep` dumps are
+    kept.
+    """
+
+    def __init__(self, output_dir: str = "forensics_logs/profiles", keep: int = 10):
+        self.output_dir = output_dir
+        self.keep = keep
+        self.running = False
+
+    async def profile(self, seconds: float) -> Tuple[pstats.Stats, str]:
+        """Profile `seconds` of live traffic. Returns (stats, path of the .pstats dump)."""
+        if self.running:
+            raise RuntimeError("A profiling session is already running")
+        profiler = cProfile.Profile()
+        self.running = True
+        try:
+            profiler.enable()  # ValueError if another profiler is active
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+        finally:
+            self.running = False
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.pstats")
+        profiler.dump_stats(path)
+        self._prune()
+        return pstats.Stats(profiler), path
+
+    def _prune(self) -> None:
+        dumps = sorted(f for f in os.listdir(self.output_dir) if f.endswith('.pstats'))
+        for name in dumps[:-self.keep]:
+            try:
+                os.remove(os.path.join(self.output_dir, name))
+            except OSError:
+                pass
+
+
+def top_functions(stats: pstats.Stats, limit: int = 15, sort: str = 'cumulative') -> List[Dict]:
+    """The `limit` most expensive functions by cumulative time, own time or calls."""
+    index = SORT_KEYS[sort]
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][index], reverse=True)
+    return [
+        {
+            "function": f"{short_path(filename)}:{line}({name})" if line else name,
+            "calls": calls,
+            "tottime": tottime,
+            "cumtime": cumtime
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in entries[:limit]
+    ]
+
+
+class MemoryProfiler:
+    """
+    Memory growth between a baseline and now.
+
+    `start()` turns on tracemalloc (which slows allocation, so it stays off
+    until asked for) and records a baseline snapshot plus the entry counts
+    of the known growth points; `diff()` reports the allocation sites that
+    grew most since then and how each growth point changed.
+    """
+
+    def __init__(self, growth_points: Optional[Dict[str, Callable[[], int]]] = None, frames: int = 1):
+        self.growth_points = growth_points or {}
+        self.frames = frames
+        self.baseline = None
+        self.baseline_sizes: Dict[str, int] = {}
+        self.started_at = None
+        self._started_tracing = False
+
+    @property
+    def running(self) -> bool:
+        return self.baseline is not None
+
+    def sizes(self) -> Dict[str, int]:
+        """Current entry count of each growth point (-1 if it could not be read)."""
+        sizes = {}
+        for name, read in self.growth_points.items():
+            try:
+                sizes[name] = int(read())
+            except Exception:
+                sizes[name] = -1
+        return sizes
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def start(self) -> None:
+        """Start tracing and take the baseline."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.baseline = self._snapshot()
+        self.baseline_sizes = self.sizes()
+        self.started_at = time.time()
+
+    def diff(self, limit: int = 10) -> Dict:
+        """
+        Growth since `start()`.
+
+        Returns:
+            {"elapsed", "traced_bytes", "peak_bytes",
+             "growth": [{"site", "size_diff", "count_diff", "size"}, ...],
+             "growth_points": {name: {"entries", "change"}}}
+        """
+        if self.baseline is None:
+            raise RuntimeError("Memory profiling is not running; start it first")
+        stats = self._snapshot().compare_to(self.baseline, 'lineno')
+        stats.sort(key=lambda stat: stat.size_diff, reverse=True)
+        current, peak = tracemalloc.get_traced_memory()
+        sizes = self.sizes()
+        return {
+            "elapsed": time.time() - self.started_at,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "growth": [
+                {
+                    "site": f"{short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size
+                }
+                for stat in stats[:limit] if stat.size_diff > 0
+            ],
+            "growth_points": {
+                name: {"entries": size, "change": size - self.baseline_sizes.get(name, 0)}
+                for name, size in sizes.items()
+            }
+        }
+
+    def stop(self) -> None:
+        """Drop the baseline and stop tracing if we started it."""
+        self.baseline = None
+        self.baseline_sizes = {}
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -0,0 +1,168 @@
+"""
+Hierarchical Token-Bucket Rate Limiting
+Shared spam limiter for Guardify and Respect Ranger auto-moderation.
+
+Every message is charged against three buckets: the author's bucket in the
+guild, the channel's bucket and the guild's bucket. A message is spam at the
+first level whose bucket is empty.
+"""
+
+import time
+from array import array
+from typing import Callable, Dict, Optional, Tuple
+
+
+USER = "user"
+CHANNEL = "channel"
+GUILD = "guild"
+LEVELS = (USER, CHANNEL, GUILD)
+
+# (capacity, period in seconds) - capacity messages may be sent in a burst,
+# and the bucket refills at capacity/period tokens per second.
+Limit = Tuple[int, float]
+
+
+class BucketTable:
+    """
+    Compact storage for one level of token buckets.
+
+    Each bucket is stored as a single float: the time at which it will be
+    full again (generic cell rate algorithm). Refill is computed lazily on
+    access, so there are no timers, and a bucket that has refilled is
+    indistinguishable from a missing one and can be dropped by `sweep`.
+    """
+
+    __slots__ = ('_slots', '_full_at', '_free')
+
+    def __init__(self):
+        self._slots: Dict[int, int] = {}
+        self._full_at = array('d')
+        self._free = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def tokens(self, key: int, limit: Limit, now: float) -> float:
+        """Return the tokens currently available in a bucket."""
+        capacity, period = limit
+        slot = self._slots.get(key)
+        if slot is None:
+            return float(capacity)
+        backlog = max(self._full_at[slot] - now, 0.0)
+        return capacity - backlog * capacity / period
+
+    def consume(self, key: int, limit: Limit, now: float) -> None:
+        """Take one token from a bucket."""
+        capacity, period = limit
+        interval = period / capacity
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self._full_at[slot] = now + interval
+            else:
+                slot = len(self._full_at)
+                self._full_at.append(now + interval)
+            self._slots[key] = slot
+        else:
+            self._full_at[slot] = max(self._full_at[slot], now) + interval
+
+    def sweep(self, now: float) -> int:
+        """Drop buckets that have refilled completely."""
+        full = [key for key, slot in self._slots.items() if self._full_at[slot] <= now]
+        for key in full:
+            self._free.append(self._slots.pop(key))
+        if not self._slots:
+            self._full_at = array('d')
+            self._free = []
+        return len(full)
+
+
+class HierarchicalRateLimiter:
+    """
+    User -> channel -> guild token-bucket limiter, configurable per guild.
+
+    A level whose limit is None is not enforced. A message only consumes
+    tokens when every enforced level has one available, so a flood that is
+    rejected at the guild level does not also drain the author's bucket.
+    """
+
+    SWEEP_INTERVAL = 4096  # Hits between sweeps of refilled buckets
+
+    def __init__(self, user: Optional[Limit] = (5, 5.0),
+                 channel: Optional[Limit] = None,
+                 guild: Optional[Limit] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.defaults = {USER: user, CHANNEL: channel, GUILD: guild}
+        self.guild_limits: Dict[int, Dict[str, Optional[Limit]]] = {}
+        self.clock = clock
+        self.tables = {level: BucketTable() for level in LEVELS}
+        self._hits = 0
+
+    def configure(self, guild_id: int, level: str, capacity: Optional[int],
+                  period: float = 10.0) -> None:
+        """
+        Set the limit for one level in a guild.
+
+        Args:
+            guild_id: Discord guild ID
+            level: One of "user", "channel" or "guild"
+            capacity: Messages allowed per period, or None to disable the level
+            period: Length of the period in seconds
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown rate limit level: {level}")
+        if capacity is not None and (capacity < 1 or period <= 0):
+            raise ValueError("Capacity and period must be positive")
+        limit = (int(capacity), float(period)) if capacity is not None else None
+        self.guild_limits.setdefault(int(guild_id), {})[level] = limit
+
+    def reset(self, guild_id: int) -> None:
+        """Drop a guild's overrides so the default limits apply again."""
+        self.guild_limits.pop(int(guild_id), None)
+
+    def limits(self, guild_id: int) -> Dict[str, Optional[Limit]]:
+        """Get the effective limits for a guild."""
+        limits = dict(self.defaults)
+        limits.update(self.guild_limits.get(int(guild_id), {}))
+        return limits
+
+    def hit(self, guild_id: int, channel_id: int, user_id: int,
+            now: Optional[float] = None) -> Optional[str]:
+        """
+        Record a message and check it against every level.
+
+        Returns:
+            The first level that is exhausted ("user", "channel" or "guild"),
+            or None if the message is within all limits
+        """
+        now = self.clock() if now is None else now
+        limits = self.limits(guild_id)
+        keys = {
+            USER: (int(guild_id) << 64) | int(user_id),
+            CHANNEL: int(channel_id),
+            GUILD: int(guild_id),
+        }
+
+        for level in LEVELS:
+            limit = limits[level]
+            if limit and self.tables[level].tokens(keys[level], limit, now) < 1 - 1e-9:
+                return level
+
+        for level in LEVELS:
+            limit = limits[level]
+            if limit:
+                self.tables[level].consume(keys[level], limit, now)
+
+        self._hits += 1
+        if self._hits % self.SWEEP_INTERVAL == 0:
+            self.sweep(now)
+        return None
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Free refilled buckets. Returns the number of buckets dropped."""
+        now = self.clock() if now is None else now
+        return sum(table.sweep(now) for table in self.tables.values())
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self.tables.values())
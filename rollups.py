@@ -0,0 +1,217 @@
+"""
+Evidence Time-Series Rollups
+Hourly and daily case counts per guild (by severity, keyword, channel and
+score histogram bins), kept in SQLite so trend charts never scan the log.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+BUCKETS = {'hour': 3600, 'day': 86400}
+DIMENSIONS = ('total', 'severity', 'keyword', 'channel', 'abuse_score', 'vader')
+ALL_GUILDS = '*'  # Rollup rows covering every guild
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    guild_id TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, bucket, dimension, start, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+RollupKey = Tuple[str, str, str, int, str]
+
+
+def record_time(record: Dict) -> Optional[datetime]:
+    """When the message was sent (falling back to when it was logged), in UTC."""
+    for field in ('created_at', 'logged_at'):
+        try:
+            moment = datetime.fromisoformat(record[field])
+        except (KeyError, TypeError, ValueError):
+            continue
+        return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+    return None
+
+
+def score_bin(score, low: float, high: float) -> Optional[str]:
+    """Lower edge of the 0.1-wide histogram bin holding `score`, clamped to [low, high]."""
+    if not isinstance(score, (int, float)):
+        return None
+    edge = min(max(int(score * 10 // 1), int(low * 10)), int(high * 10))
+    return f"{edge / 10:.1f}"
+
+
+def rollup_keys(record: Dict) -> List[RollupKey]:
+    """Every rollup row one evidence record adds 1 to."""
+    moment = record_time(record)
+    if moment is None:
+        return []
+    analysis = record.get('analysis') or {}
+    values = [('total', ''), ('severity', analysis.get('severity', 'low'))]
+    values += [('keyword', keyword) for keyword in set(analysis.get('detected_keywords') or [])]
+    if record.get('channel_name'):
+        values.append(('channel', record['channel_name']))
+    abuse_bin = score_bin(analysis.get('abuse_score'), 0.0, 2.0)
+    if abuse_bin is not None:
+        values.append(('abuse_score', abuse_bin))
+    vader_bin = score_bin(analysis.get('vader_sentiment'), -1.0, 0.9)
+    if vader_bin is not None:
+        values.append(('vader', vader_bin))
+
+    scopes = [ALL_GUILDS]
+    if record.get('guild_id'):
+        scopes.append(str(record['guild_id']))
+    timestamp = int(moment.timestamp())
+    return [(scope, bucket, dimension, timestamp - timestamp % size, value)
+            for scope in scopes
+            for bucket, size in BUCKETS.items()
+            for dimension, value in values]
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Records of a JSONL evidence log, skipping unreadable lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+class EvidenceRollups:
+    """
+    Rollup tables shared by the bot (writer) and the dashboard (reader).
+
+    The bot calls `add()` for each evidence record as it is logged. Records
+    logged before rollups existed are counted once by `backfill()`, which
+    covers everything logged before the first live record (`live_since`).
+    To rebuild from scratch, stop the bot, delete the database and backfill.
+    """
+
+    def __init__(self, path: str = "forensics_logs/rollups.db", busy_timeout: float = 5.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _meta(self, name: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM rollup_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _apply(self, counts: Dict[RollupKey, int]) -> None:
+        self.conn.executemany(
+            "INSERT INTO rollups (guild_id, bucket, dimension, start, value, count) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (guild_id, bucket, dimension, start, value) DO UPDATE SET count = count + excluded.count",
+            [key + (count,) for key, count in counts.items()]
+        )
+
+    # ----- Writes -----
+
+    def add(self, records: Iterable[Dict]) -> None:
+        """Count newly logged evidence records (one short transaction)."""
+        records = list(records)
+        counts = Counter(key for record in records for key in rollup_keys(record))
+        first = min((r['logged_at'] for r in records if r.get('logged_at')), default=None)
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "INSERT OR IGNORE INTO rollup_meta (name, value) VALUES ('live_since', ?)",
+                (first or datetime.now(timezone.utc).isoformat(),)
+            )
+            self._apply(counts)
+
+    def backfill(self, log_path: str) -> int:
+        """
+        Count the records logged before live rollups started (once).
+
+        The log is read outside any transaction, so the bot keeps writing
+        while a large backfill runs.
+
+        Returns:
+            Number of records counted (0 if already backfilled)
+        """
+        if self._meta('backfilled') or not os.path.exists(log_path):
+            return 0
+        cutoff = self._meta('live_since') or datetime.now(timezone.utc).isoformat()
+        counts = Counter()
+        counted = 0
+        for record in read_records(log_path):
+            if (record.get('logged_at') or '') < cutoff:
+                counts.update(rollup_keys(record))
+                counted += 1
+
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self._meta('backfilled'):
+                return 0  # Another backfill finished first
+            self.conn.execute("INSERT OR IGNORE INTO rollup_meta (name, value) VALUES ('live_since', ?)", (cutoff,))
+            self.conn.execute("INSERT INTO rollup_meta (name, value) VALUES ('backfilled', ?)", (cutoff,))
+            self._apply(counts)
+        return counted
+
+    # ----- Reads -----
+
+    def series(self, guild_id: Optional[str], start: datetime, end: datetime,
+               bucket: str = 'hour', dimension: str = 'severity') -> List[Dict]:
+        """
+        Counts per bucket between `start` and `end`, zero-filled.
+
+        Returns:
+            [{"start": ISO time, "counts": {value: count}}, ...] oldest first
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {dimension}")
+        size = BUCKETS[bucket]
+        first = int(start.timestamp()) // size * size
+        last = int(end.timestamp()) // size * size
+
+        points = {t: {} for t in range(first, last + 1, size)}
+        for t, value, count in self.conn.execute(
+                "SELECT start, value, count FROM rollups "
+                "WHERE guild_id = ? AND bucket = ? AND dimension = ? AND start BETWEEN ? AND ?",
+                (str(guild_id) if guild_id else ALL_GUILDS, bucket, dimension, first, last)):
+            points[t][value] = count
+        return [{"start": datetime.fromtimestamp(t, timezone.utc).isoformat(), "counts": counts}
+                for t, counts in points.items()]
+
+
+def main():
+    """Command line entry point: backfill rollups from an existing evidence log."""
+    parser = argparse.ArgumentParser(description="Backfill dashboard rollups from the evidence log")
+    parser.add_argument("--log", default="forensics_logs/abuse_evidence.jsonl", help="Evidence log path")
+    parser.add_argument("--db", default="forensics_logs/rollups.db", help="Rollup database path")
+    args = parser.parse_args()
+
+    rollups = EvidenceRollups(args.db)
+    counted = rollups.backfill(args.log)
+    print(f"[ROLLUPS] Backfilled {counted} records" if counted else "[ROLLUPS] Nothing to backfill")
+    rollups.close()
+
+
+if __name__ == "__main__":
+    main()
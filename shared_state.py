@@ -0,0 +1,186 @@
+"""
+Shared Moderation State
+SQLite (WAL mode) store for state that must be shared by every worker process
+of a cluster: warnings, cross-shard counters and shard status.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS warnings_member ON warnings (guild_id, user_id, id);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    worker_id INTEGER PRIMARY KEY,
+    shard_ids TEXT NOT NULL,
+    guilds INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class SharedState:
+    """
+    Process-safe moderation state backed by one SQLite database.
+
+    Every worker opens its own connection to the same file; WAL mode lets
+    readers proceed while another worker writes, and `busy_timeout` makes
+    concurrent writers wait for each other instead of failing. Each method is
+    a single short transaction, so callers never hold a lock across awaits.
+    The process's threads (the event loop and `asyncio.to_thread` calls)
+    share its connection one method at a time.
+    """
+
+    def __init__(self, path: str = "forensics_logs/shared_state.db", busy_timeout: float = 5.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()  # Serializes this connection's transactions across threads
+
+    def close(self) -> None:
+        """Close this process's connection."""
+        with self.lock:
+            self.conn.close()
+
+    # ----- Warnings -----
+
+    def add_warning(self, guild_id: str, user_id: str, reason: str, timestamp: str) -> int:
+        """Add a warning and return the member's warning count."""
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "INSERT INTO warnings (guild_id, user_id, reason, timestamp) VALUES (?, ?, ?, ?)",
+                (str(guild_id), str(user_id), reason, timestamp)
+            )
+            (count,) = self.conn.execute(
+                "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), str(user_id))
+            ).fetchone()
+        return count
+
+    def get_warnings(self, guild_id: str, user_id: str) -> List[Dict]:
+        """Get a member's warnings, oldest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT reason, timestamp FROM warnings WHERE guild_id = ? AND user_id = ? ORDER BY id",
+                (str(guild_id), str(user_id))
+            ).fetchall()
+        return [{"reason": reason, "timestamp": timestamp} for reason, timestamp in rows]
+
+    def remove_warning(self, guild_id: str, user_id: str, index: int) -> bool:
+        """Remove a member's warning by position (0 = oldest)."""
+        if index < 0:
+            return False
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                "SELECT id FROM warnings WHERE guild_id = ? AND user_id = ? ORDER BY id LIMIT 1 OFFSET ?",
+                (str(guild_id), str(user_id), index)
+            ).fetchone()
+            if row is None:
+                return False
+            self.conn.execute("DELETE FROM warnings WHERE id = ?", row)
+        return True
+
+    def clear_warnings(self, guild_id: str, user_id: str) -> None:
+        """Remove all of a member's warnings."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM warnings WHERE guild_id = ? AND user_id = ?",
+                (str(guild_id), str(user_id))
+            )
+
+    def warnings_snapshot(self) -> Dict[str, List[Dict]]:
+        """All warnings in the warnings.json layout ({"guild:user": [...]})."""
+        snapshot: Dict[str, List[Dict]] = {}
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT guild_id, user_id, reason, timestamp FROM warnings ORDER BY id"
+            ).fetchall()
+        for guild_id, user_id, reason, timestamp in rows:
+            snapshot.setdefault(f"{guild_id}:{user_id}", []).append({"reason": reason, "timestamp": timestamp})
+        return snapshot
+
+    def export_warnings(self, path: str) -> None:
+        """Atomically write the warnings snapshot to a JSON file."""
+        directory = os.path.dirname(path) or '.'
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.warnings-', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.warnings_snapshot(), f, indent=2)
+        os.replace(tmp, path)
+
+    # ----- Cross-shard counters -----
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        """Add to a cluster-wide counter and return its new value."""
+        with self.lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self.conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                (name, amount)
+            )
+            (value,) = self.conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return value
+
+    def counter(self, name: str) -> int:
+        """Current value of a cluster-wide counter."""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    # ----- Shard status -----
+
+    def publish_shard_status(self, worker_id: int, shard_ids: List[int], guilds: int,
+                             latency: float, now: Optional[float] = None) -> None:
+        """Record a worker's heartbeat."""
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO shards (worker_id, shard_ids, guilds, latency, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (worker_id, json.dumps(shard_ids), guilds, latency, time.time() if now is None else now)
+            )
+
+    def cluster_status(self, max_age: float = 120.0, now: Optional[float] = None) -> Dict:
+        """Summary of workers that sent a heartbeat within `max_age` seconds."""
+        now = time.time() if now is None else now
+        workers = []
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT worker_id, shard_ids, guilds, latency, updated FROM shards ORDER BY worker_id"
+            ).fetchall()
+        for worker_id, shard_ids, guilds, latency, updated in rows:
+            if now - updated <= max_age:
+                workers.append({
+                    "worker_id": worker_id,
+                    "shard_ids": json.loads(shard_ids),
+                    "guilds": guilds,
+                    "latency": latency
+                })
+        return {
+            "workers": workers,
+            "guilds": sum(worker["guilds"] for worker in workers),
+            "shards": sum(len(worker["shard_ids"]) for worker in workers)
+        }
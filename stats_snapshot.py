@@ -0,0 +1,96 @@
+"""
+Shared Stats Snapshots
+SQLite cache of serialized /api/stats bodies shared by every dashboard
+worker process, so each log version is usually parsed by one worker only.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    body BLOB NOT NULL
+);
+"""
+
+
+class StatsSnapshots:
+    """
+    Latest serialized body per cache key, tagged with the data version.
+
+    `get_or_build(key, version, build)` returns the stored body when its
+    version matches. Otherwise the body is built outside any transaction
+    and stored unless another worker stored that version first, in which
+    case its body is served so every worker sends the same ETag. If the
+    database stays locked past `busy_timeout`, the fresh body is served
+    without storing it. Only the `max_keys` most recently built keys are
+    kept. Connections are opened per process, so the app may be imported
+    before the WSGI server forks.
+    """
+
+    def __init__(self, path: str = "forensics_logs/stats_snapshots.db", busy_timeout: float = 5.0,
+                 max_keys: int = 1000):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.max_keys = max_keys
+        self._local = threading.local()
+        self._pid = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._local = threading.local()  # Inherited connections must not be reused
+            self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, version: str) -> Optional[Tuple[str, bytes]]:
+        """(etag, body) stored for `key` at `version`, or None."""
+        row = self._conn().execute(
+            "SELECT etag, body FROM snapshots WHERE key = ? AND version = ?", (key, version)
+        ).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def get_or_build(self, key: str, version: str,
+                     build: Callable[[], Tuple[str, bytes]]) -> Tuple[str, bytes]:
+        """Stored (etag, body) for `key` at `version`, calling `build()` if nobody has yet."""
+        try:
+            found = self.get(key, version)
+        except sqlite3.OperationalError:
+            found = None
+        if found is not None:
+            return found
+        etag, body = build()
+        conn = self._conn()
+        try:
+            with conn:
+                # Replaces an older version, but not the same version stored by another worker
+                # meanwhile; reinserting moves the key to the end of the rowid (build) order
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM snapshots WHERE key = ? AND version != ?", (key, version))
+                conn.execute(
+                    "INSERT OR IGNORE INTO snapshots (key, version, etag, body) VALUES (?, ?, ?, ?)",
+                    (key, version, etag, body)
+                )
+                conn.execute(
+                    "DELETE FROM snapshots WHERE rowid <= "
+                    "(SELECT rowid FROM snapshots ORDER BY rowid DESC LIMIT 1 OFFSET ?)", (self.max_keys,)
+                )
+            return self.get(key, version) or (etag, body)
+        except sqlite3.OperationalError as e:
+            print(f"Stats snapshot not stored: {e}")
+            return etag, body
@@ -0,0 +1,174 @@
+"""
+Unit tests for the moderation action scheduler
+"""
+
+import asyncio
+import unittest
+import discord
+from action_scheduler import ActionScheduler
+
+
+class MockResponse:
+    """Minimal aiohttp-like response for building HTTPExceptions."""
+
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.reason = "Error"
+        self.headers = headers or {}
+
+
+class TestActionScheduler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the ActionScheduler class."""
+
+    async def test_run_returns_result(self):
+        """Test that run returns the action's result."""
+        scheduler = ActionScheduler()
+
+        async def action():
+            return 42
+
+        self.assertEqual(await scheduler.run('notice', action), 42)
+
+    async def test_safety_actions_run_first(self):
+        """Test that safety actions overtake queued notices and DMs."""
+        scheduler = ActionScheduler(max_concurrency=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        def record(name):
+            async def action():
+                order.append(name)
+            return action
+
+        scheduler.submit('notice', blocker)
+        scheduler.submit('dm', record('dm'))
+        scheduler.submit('notice', record('notice'))
+        scheduler.submit('ban', record('ban'), target=1)
+        gate.set()
+        await scheduler.close()
+        self.assertEqual(order, ['ban', 'notice', 'dm'])
+
+    async def test_route_concurrency(self):
+        """Test that a busy route does not hold up other routes."""
+        scheduler = ActionScheduler(max_concurrency=4, route_concurrency=1)
+        gate = asyncio.Event()
+        done = []
+
+        async def slow():
+            await gate.wait()
+
+        async def fast():
+            done.append('other-route')
+
+        scheduler.submit('notice', slow, route='a')
+        scheduler.submit('notice', slow, route='a')
+        scheduler.submit('notice', fast, route='b')
+        await asyncio.sleep(0.01)
+        self.assertEqual(done, ['other-route'])
+        self.assertEqual(scheduler.stats()['inflight'], 1)
+        self.assertEqual(scheduler.queue_depth, 1)
+        gate.set()
+        await scheduler.close()
+        self.assertEqual(scheduler.stats()['completed'], 3)
+
+    async def test_retry_on_429(self):
+        """Test that rate-limited calls are retried after Retry-After."""
+        scheduler = ActionScheduler()
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise discord.HTTPException(MockResponse(429, {'Retry-After': '0'}), "rate limited")
+            return "ok"
+
+        self.assertEqual(await scheduler.run('delete', flaky), "ok")
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(scheduler.stats()['retried'], 2)
+
+    async def test_client_errors_not_retried(self):
+        """Test that 4xx errors other than 429 are raised immediately."""
+        scheduler = ActionScheduler()
+        attempts = []
+
+        async def forbidden():
+            attempts.append(1)
+            raise discord.Forbidden(MockResponse(403), "missing permissions")
+
+        with self.assertRaises(discord.Forbidden):
+            await scheduler.run('kick', forbidden, target=1)
+        self.assertEqual(len(attempts), 1)
+
+    async def test_duplicate_actions_merged(self):
+        """Test that repeated actions against the same target run once."""
+        scheduler = ActionScheduler()
+        calls = []
+
+        async def timeout():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+
+        first = scheduler.submit('timeout', timeout, target=7)
+        second = scheduler.submit('timeout', timeout, target=7)
+        self.assertIs(first, second)
+        await scheduler.close()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(scheduler.stats()['deduplicated'], 1)
+
+    async def test_different_requests_not_merged(self):
+        """Test that actions on the same target in other guilds or with other parameters all run."""
+        scheduler = ActionScheduler()
+        calls = []
+
+        async def timeout():
+            calls.append(1)
+
+        first = scheduler.submit('timeout', timeout, target=7, route=('guild', 1), params=60)
+        self.assertIsNot(scheduler.submit('timeout', timeout, target=7, route=('guild', 2), params=60), first)
+        self.assertIsNot(scheduler.submit('timeout', timeout, target=7, route=('guild', 1), params=600), first)
+        self.assertIs(scheduler.submit('timeout', timeout, target=7, route=('guild', 1), params=60), first)
+        await scheduler.close()
+        self.assertEqual(len(calls), 3)
+
+    async def test_held_back_actions_keep_priority(self):
+        """Test that actions waiting for a busy route start in priority order."""
+        scheduler = ActionScheduler(route_concurrency=1)
+        order = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            await gate.wait()
+
+        def record(name):
+            async def action():
+                order.append(name)
+            return action
+
+        scheduler.submit('notice', blocker, route='guild')
+        scheduler.submit('dm', record('dm'), route='guild')
+        scheduler.submit('notice', record('notice'), route='guild')
+        scheduler.submit('ban', record('ban'), target=1, route='guild')
+        await asyncio.sleep(0.01)
+        gate.set()
+        await scheduler.close()
+        self.assertEqual(order, ['ban', 'notice', 'dm'])
+
+    async def test_dms_not_merged(self):
+        """Test that DMs to the same user are all delivered."""
+        scheduler = ActionScheduler()
+        calls = []
+
+        async def dm():
+            calls.append(1)
+
+        scheduler.submit('dm', dm, target=7)
+        scheduler.submit('dm', dm, target=7)
+        await scheduler.close()
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
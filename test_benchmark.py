@@ -0,0 +1,48 @@
+"""
+Unit tests for the benchmark harness
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from benchmark import compare, corpus, measure, write_log
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test cases for measurement, corpora and regression checks."""
+
+    def test_measure_reports_percentiles(self):
+        """Test latency percentiles, throughput and memory are reported per unit."""
+        result = measure(lambda: sum(range(1000)), iterations=20, units=10)
+        self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        self.assertGreater(result["ops_per_sec"], 0)
+        self.assertGreaterEqual(result["peak_kib"], 0)
+        self.assertEqual(result["iterations"], 20)
+
+    def test_compare_flags_regressions(self):
+        """Test only metrics beyond the threshold are flagged."""
+        baseline = {"a": {"p50_ms": 1.0, "p99_ms": 2.0, "peak_kib": 10.0}, "gone": {"p50_ms": 1.0}}
+        results = {
+            "a": {"p50_ms": 1.2, "p99_ms": 3.0, "peak_kib": 10.0},
+            "new": {"p50_ms": 100.0}
+        }
+        regressions = compare(results, baseline, threshold=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("a: p99_ms 2.0 -> 3.0"))
+
+    def test_synthetic_data(self):
+        """Test corpora are deterministic and logs are valid JSONL."""
+        self.assertEqual(corpus(5, 3), corpus(5, 3))
+        self.assertTrue(all(len(message.split()) == 3 for message in corpus(5, 3)))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "log.jsonl")
+            write_log(path, 100)
+            with open(path) as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 100)
+        self.assertEqual(records[-1]["author_id"], "needle")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for the keyset-paginated case index
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from case_index import CaseIndex, decode_cursor, encode_cursor
+
+
+def record(n, guild_id="1", severity="low", author_id="7", logged_at=None):
+    return {
+        "message_id": str(n),
+        "guild_id": guild_id,
+        "author_id": author_id,
+        "channel_id": "50",
+        "logged_at": logged_at or f"2024-01-{n // 24 + 1:02d}T{n % 24:02d}:00:00+00:00",
+        "analysis": {"severity": severity}
+    }
+
+
+class TestCaseIndex(unittest.TestCase):
+    """Test cases for the CaseIndex class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        self.index = CaseIndex(self.log_path, os.path.join(self.tmp.name, "case_index.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp.cleanup()
+
+    def append(self, *records, raw=""):
+        with open(self.log_path, 'a') as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+            f.write(raw)
+
+    def ids(self, page):
+        return [case["message_id"] for case in page["cases"]]
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode to what was encoded and reject garbage."""
+        self.assertEqual(decode_cursor(encode_cursor("2024-01-01T00:00:00", 42)), ("2024-01-01T00:00:00", 42))
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor")
+
+    def test_pages_newest_first_without_gaps(self):
+        """Test walking every page visits each case exactly once."""
+        self.append(*[record(n) for n in range(25)])
+        self.assertEqual(self.index.refresh(), 25)
+
+        seen, cursor = [], None
+        while True:
+            page = self.index.page("1", cursor=cursor, limit=10)
+            seen += self.ids(page)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [str(n) for n in reversed(range(25))])
+
+    def test_equal_timestamps_keep_stable_order(self):
+        """Test cases logged at the same instant are neither skipped nor repeated."""
+        self.append(*[record(n, logged_at="2024-01-01T00:00:00+00:00") for n in range(5)])
+        self.index.refresh()
+        first = self.index.page("1", limit=2)
+        second = self.index.page("1", cursor=first["next_cursor"], limit=3)
+        self.assertEqual(self.ids(first) + self.ids(second), ["4", "3", "2", "1", "0"])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_filters(self):
+        """Test guild, severity, user and date filters."""
+        self.append(record(1, severity="high"), record(2, author_id="8"), record(3, guild_id="2"), record(30))
+        self.index.refresh()
+        self.assertEqual(self.ids(self.index.page("1", severity="high")), ["1"])
+        self.assertEqual(self.ids(self.index.page("1", user="8")), ["2"])
+        self.assertEqual(self.ids(self.index.page("1", since="2024-01-02")), ["30"])
+        self.assertEqual(self.ids(self.index.page("1", until="2024-01-01")), ["2", "1"])
+        self.assertEqual(self.ids(self.index.page(None, until="2024-01-01")), ["3", "2", "1"])
+        self.assertEqual(self.ids(self.index.page("1", until="2024-01-02")), ["30", "2", "1"])
+        self.assertEqual(self.ids(self.index.page("1", until="2024-01-02T06:00:00+00:00")), ["2", "1"])
+        with self.assertRaises(ValueError):
+            self.index.page("1", content="x")
+
+    def test_incremental_and_persistent(self):
+        """Test only new complete lines are indexed, and the offset survives reopening."""
+        self.append(record(1), raw='{"message_id": "2"')
+        self.assertEqual(self.index.refresh(), 1)
+        with open(self.log_path, 'a') as f:
+            f.write(', "guild_id": "1", "logged_at": "2024-02-01"}\n')
+        self.assertEqual(self.index.refresh(), 1)
+
+        reopened = CaseIndex(self.log_path, self.index.path)
+        self.assertEqual(reopened.refresh(), 0)
+        self.assertEqual(self.ids(reopened.page("1")), ["2", "1"])
+        reopened.close()
+
+    def test_rotated_log_reindexed(self):
+        """Test a truncated log is indexed from scratch."""
+        self.append(record(1), record(2))
+        self.index.refresh()
+        open(self.log_path, 'w').close()
+        self.append(record(3))
+        self.assertEqual(self.index.refresh(), 1)
+        self.assertEqual(self.ids(self.index.page("1")), ["3"])
+
+
+if __name__ == '__main__':
+    unittest.main()
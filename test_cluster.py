@@ -0,0 +1,198 @@
+"""
+Unit tests for cluster mode: shard assignment, shared state and the launcher
+"""
+
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from cluster import ClusterLauncher, shard_ranges
+from discord_stubs import RestSimulator, StubWorld
+from shared_state import SharedState
+
+
+def stub_worker(worker_id, shard_ids, shard_count, token, state_path):
+    """Stand-in for a gateway worker: report in through the shared state and exit."""
+    state = SharedState(state_path)
+    for _ in range(50):
+        state.add_warning("1", "2", f"from worker {worker_id}", "2024-01-01T00:00:00")
+    state.incr("worker_starts")
+    state.publish_shard_status(worker_id, shard_ids, guilds=len(shard_ids) * 10, latency=0.05)
+    state.close()
+
+
+class TestShardRanges(unittest.TestCase):
+    """Test cases for shard assignment."""
+
+    def test_even_split(self):
+        """Test that shards are split into contiguous ranges."""
+        self.assertEqual(shard_ranges(4, 2), [[0, 1], [2, 3]])
+
+    def test_uneven_split(self):
+        """Test that leftover shards go to the first workers."""
+        self.assertEqual(shard_ranges(5, 3), [[0, 1], [2, 3], [4]])
+
+    def test_more_workers_than_shards(self):
+        """Test that no worker is started without shards."""
+        self.assertEqual(shard_ranges(2, 8), [[0], [1]])
+
+    def test_invalid(self):
+        """Test that non-positive counts are rejected."""
+        with self.assertRaises(ValueError):
+            shard_ranges(0, 1)
+
+
+class TestSharedState(unittest.TestCase):
+    """Test cases for the SharedState class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = SharedState(os.path.join(self.tmp.name, "state.db"))
+
+    def tearDown(self):
+        self.state.close()
+        self.tmp.cleanup()
+
+    def test_warnings(self):
+        """Test adding, listing, removing and clearing warnings."""
+        self.assertEqual(self.state.add_warning("1", "2", "first", "t1"), 1)
+        self.assertEqual(self.state.add_warning("1", "2", "second", "t2"), 2)
+        self.assertTrue(self.state.remove_warning("1", "2", 0))
+        self.assertFalse(self.state.remove_warning("1", "2", 5))
+        self.assertEqual(self.state.get_warnings("1", "2"), [{"reason": "second", "timestamp": "t2"}])
+        self.state.clear_warnings("1", "2")
+        self.assertEqual(self.state.get_warnings("1", "2"), [])
+
+    def test_export_warnings(self):
+        """Test that the export matches the warnings.json layout."""
+        self.state.add_warning("1", "2", "spam", "t1")
+        path = os.path.join(self.tmp.name, "warnings.json")
+        self.state.export_warnings(path)
+        with open(path) as f:
+            self.assertIn('"1:2"', f.read())
+
+    def test_counters_visible_to_other_connections(self):
+        """Test that a counter incremented by one worker is read by another."""
+        other = SharedState(self.state.path)
+        self.state.incr('flagged_messages')
+        self.assertEqual(other.incr('flagged_messages', 2), 3)
+        self.assertEqual(self.state.counter('flagged_messages'), 3)
+        other.close()
+
+    def test_threads_share_connection(self):
+        """Test that threads writing through one connection don't interleave transactions."""
+        errors = []
+
+        def write(method, *args):
+            try:
+                for _ in range(200):
+                    method(*args)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(self.state.add_warning, "1", "2", "spam", "t")),
+                   threading.Thread(target=write, args=(self.state.incr, 'flagged_messages'))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.state.get_warnings("1", "2")), 200)
+        self.assertEqual(self.state.counter('flagged_messages'), 200)
+
+    def test_cluster_status_ignores_stale_workers(self):
+        """Test that workers without a recent heartbeat are left out."""
+        self.state.publish_shard_status(0, [0, 1], 20, 0.1, now=1000)
+        self.state.publish_shard_status(1, [2, 3], 30, 0.1, now=500)
+        status = self.state.cluster_status(max_age=120, now=1010)
+        self.assertEqual(status["guilds"], 20)
+        self.assertEqual(status["shards"], 2)
+
+
+class TestClusterWorker(unittest.IsolatedAsyncioTestCase):
+    """Test cases for a Guardify worker writing to the shared state."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = os.getcwd()
+        os.chdir(self.tmp.name)  # Importing bot_enhanced creates its files in the working directory
+        self.state = SharedState(os.path.join(self.tmp.name, "state.db"))
+
+    def tearDown(self):
+        self.state.close()
+        os.chdir(self.previous)
+        self.tmp.cleanup()
+
+    async def test_shared_writes_batched(self):
+        """Test flagged messages and warnings reach the shared store without exporting per message."""
+        from load_generator import create_bot
+        world = StubWorld(RestSimulator(latency=0.0, jitter=0.0))
+        with redirect_stdout(io.StringIO()):
+            bot = create_bot("guardify", world)
+            bot.state = bot.forensics_logger.state = self.state
+            channel = next(iter(world.channels.values()))
+            for n in range(3):
+                await bot.on_message(world.message("you are a stupid worthless idiot", 10 + n, channel))
+            await bot.deletion_queue.close()
+
+        logger = bot.forensics_logger
+        self.assertEqual((bot.flagged_pending, self.state.counter('flagged_messages')), (3, 0))
+        self.assertTrue(logger.warnings_dirty)
+        self.assertFalse(os.path.exists(logger.warnings_file))
+
+        await bot.write_shared_state()
+        self.assertEqual((bot.flagged_pending, self.state.counter('flagged_messages')), (0, 3))
+        self.assertFalse(logger.warnings_dirty)
+        with open(logger.warnings_file) as f:
+            self.assertEqual(len(json.load(f)), 3)  # One warned member per author
+        with redirect_stdout(io.StringIO()):
+            await bot.log_outbox.close()
+            await bot.actions.close()
+
+
+class TestClusterLauncher(unittest.TestCase):
+    """Test cases for the ClusterLauncher class, using stub workers."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state.db")
+        self.state = SharedState(self.path)
+
+    def tearDown(self):
+        self.state.close()
+        self.tmp.cleanup()
+
+    def test_workers_share_state(self):
+        """Test that concurrent workers all write to the shared store."""
+        launcher = ClusterLauncher("token", shard_count=4, workers=2, state_path=self.path, target=stub_worker)
+        launcher.start()
+        for process in launcher.processes.values():
+            process.join(30)
+        launcher.stop()
+
+        self.assertEqual(len(self.state.get_warnings("1", "2")), 100)
+        status = self.state.cluster_status()
+        self.assertEqual(status["shards"], 4)
+        self.assertEqual(status["guilds"], 40)
+
+    def test_exited_workers_restarted(self):
+        """Test that the supervisor restarts workers that exit."""
+        launcher = ClusterLauncher("token", shard_count=1, workers=1, state_path=self.path,
+                                   target=stub_worker, restart_delay=0)
+        launcher.start()
+        deadline = time.monotonic() + 30
+        launcher.supervise(
+            interval=0.05,
+            until=lambda: self.state.counter("worker_starts") >= 2 or time.monotonic() > deadline
+        )
+        launcher.stop()
+        self.assertGreaterEqual(launcher.restarts, 1)
+        self.assertGreaterEqual(self.state.counter("worker_starts"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
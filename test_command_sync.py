@@ -0,0 +1,83 @@
+"""
+Unit tests for slash command sync tracking
+"""
+
+import os
+import tempfile
+import unittest
+import discord
+from discord import app_commands
+from command_sync import CommandSyncState, sync_if_changed, tree_hash
+
+
+class MockTree(app_commands.CommandTree):
+    """CommandTree that records sync calls instead of calling Discord."""
+
+    def __init__(self, *commands):
+        super().__init__(discord.Client(intents=discord.Intents.none()))
+        for command in commands:
+            self.add_command(command)
+        self.syncs = 0
+
+    async def sync(self, *, guild=None):
+        self.syncs += 1
+        return self.get_commands()
+
+
+def make_command(name, description="A command"):
+    async def callback(interaction, member: str):
+        pass
+    return app_commands.Command(name=name, description=description, callback=callback)
+
+
+class TestCommandSync(unittest.IsolatedAsyncioTestCase):
+    """Test cases for command tree hashing and conditional sync."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state = CommandSyncState(os.path.join(self.tmp.name, "command_sync.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_ignores_registration_order(self):
+        """Test that the hash only depends on the commands themselves."""
+        a, b = make_command("warn"), make_command("kick")
+        self.assertEqual(tree_hash(MockTree(a, b)), tree_hash(MockTree(b, a)))
+
+    def test_hash_changes_with_description(self):
+        """Test that editing a command changes the hash."""
+        self.assertNotEqual(
+            tree_hash(MockTree(make_command("warn"))),
+            tree_hash(MockTree(make_command("warn", "Warn a user")))
+        )
+
+    async def test_sync_skipped_when_unchanged(self):
+        """Test that an unchanged tree is synced only once."""
+        tree = MockTree(make_command("warn"))
+        count, _ = await sync_if_changed(tree, 1, self.state)
+        self.assertEqual(count, 1)
+        count, _ = await sync_if_changed(tree, 1, self.state)
+        self.assertIsNone(count)
+        self.assertEqual(tree.syncs, 1)
+
+    async def test_sync_when_changed_or_forced(self):
+        """Test that a changed tree or a forced sync reaches Discord."""
+        await sync_if_changed(MockTree(make_command("warn")), 1, self.state)
+        changed = MockTree(make_command("warn"), make_command("kick"))
+        count, _ = await sync_if_changed(changed, 1, self.state)
+        self.assertEqual(count, 2)
+        count, _ = await sync_if_changed(changed, 1, self.state, force=True)
+        self.assertEqual(count, 2)
+        self.assertEqual(changed.syncs, 2)
+
+    async def test_hash_tracked_per_application(self):
+        """Test that another bot application does not share the stored hash."""
+        tree = MockTree(make_command("warn"))
+        await sync_if_changed(tree, 1, self.state)
+        count, _ = await sync_if_changed(tree, 2, self.state)
+        self.assertEqual(count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+Unit tests for the content-addressed evidence content store
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from case_index import CaseIndex
+from content_store import PURGED, ContentStore, content_hash, dedup_report
+from evidence_tail import EvidenceTail
+
+
+class TestContentStore(unittest.TestCase):
+    """Test cases for the ContentStore class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ContentStore(os.path.join(self.tmp.name, "content.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_identical_content_stored_once(self):
+        """Test repeated text is one blob with a reference per put."""
+        for _ in range(1000):
+            digest = self.store.put("raid raid raid 💥")
+        self.store.put("something else")
+
+        self.assertEqual(digest, content_hash("raid raid raid 💥"))
+        self.assertEqual(self.store.get(digest), "raid raid raid 💥")
+        stats = self.store.stats()
+        self.assertEqual((stats["blobs"], stats["references"]), (2, 1001))
+        self.assertGreater(stats["dedup_ratio"], 100)
+
+    def test_release_deletes_unreferenced(self):
+        """Test content is deleted only once its last reference is released."""
+        kept, dropped = self.store.put("kept"), self.store.put("dropped")
+        self.store.put("kept")
+        self.assertEqual(self.store.release([kept, dropped]), 1)
+        self.assertEqual(self.store.get(kept), "kept")
+        self.assertIsNone(self.store.get(dropped))
+        self.assertEqual(self.store.release([kept]), 1)
+
+    def test_reference_and_resolve(self):
+        """Test records round-trip through the reference form, purged content is marked."""
+        text = "you idiot " * 20
+        record = {"message_id": "1", "content": text, "logged_at": "2024-01-01T00:00:00+00:00"}
+        referenced = self.store.reference(record)
+        self.assertEqual(list(referenced), ["message_id", "content_sha256", "logged_at"])
+        self.assertNotIn("idiot", json.dumps(referenced))
+
+        self.assertEqual(self.store.resolve([dict(referenced)])[0]["content"], text)
+        self.store.release([referenced["content_sha256"]])
+        self.assertEqual(self.store.resolve([dict(referenced)])[0]["content"], PURGED)
+
+    def test_min_size(self):
+        """Test short text is stored by default and kept inline below `min_size`."""
+        record = {"message_id": "1", "content": "you idiot"}
+        self.assertEqual(self.store.reference(record)["content_sha256"], content_hash("you idiot"))
+        inline = ContentStore(os.path.join(self.tmp.name, "inline.db"), min_size=128)
+        self.assertIs(inline.reference(record), record)
+        self.assertEqual(inline.stats()["blobs"], 0)
+        inline.close()
+
+    def test_opened_on_first_use(self):
+        """Test creating a store does not touch the disk."""
+        path = os.path.join(self.tmp.name, "lazy", "content.db")
+        store = ContentStore(path)
+        self.assertFalse(os.path.exists(os.path.dirname(path)))
+        store.put("raid")
+        self.assertTrue(os.path.exists(path))
+        store.close()
+
+
+class TestReaders(unittest.TestCase):
+    """Test cases for logging and reading records that reference their content."""
+
+    RAID = "join now you losers, this server is dead, everyone come to the new one " * 3
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = os.getcwd()
+        os.chdir(self.tmp.name)  # Importing bot_enhanced creates its files in the working directory
+        self.store = ContentStore(os.path.join(self.tmp.name, "content.db"))
+
+    def tearDown(self):
+        self.store.close()
+        os.chdir(self.previous)
+        self.tmp.cleanup()
+
+    def log_raid(self, count: int = 50):
+        from benchmark import fake_message
+        with redirect_stdout(io.StringIO()):
+            from bot_enhanced import AbuseDetector, ForensicsLogger
+        logger = ForensicsLogger(log_dir=os.path.join(self.tmp.name, "logs"), content_store=self.store)
+        analysis = AbuseDetector().analyze_message(self.RAID)
+        for n in range(count):
+            logger.log_evidence(fake_message(n, self.RAID), analysis)
+        return logger
+
+    def test_logger_references_content(self):
+        """Test the log holds hashes, one blob is stored and history resolves it."""
+        logger = self.log_raid()
+        with open(logger.log_file, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertTrue(all("content" not in r and r["content_sha256"] == content_hash(self.RAID)
+                            for r in records))
+        self.assertEqual(self.store.stats()["blobs"], 1)
+        self.assertEqual(logger.get_user_history(records[0]["author_id"])[0]["content"], self.RAID)
+        logger.csv_view.materialize()
+        with open(logger.csv_file, 'r', encoding='utf-8') as f:
+            self.assertIn("join now you losers", f.read())
+
+    def test_tail_and_index_resolve(self):
+        """Test the dashboard's readers see the content."""
+        logger = self.log_raid(5)
+        tail = EvidenceTail(logger.log_file, content_store=self.store)
+        tail.refresh()
+        self.assertEqual(tail.statistics()["recent_cases"][0]["content"], self.RAID)
+
+        index = CaseIndex(logger.log_file, os.path.join(self.tmp.name, "case_index.db"), content_store=self.store)
+        index.refresh()
+        self.assertEqual({case["content"] for case in index.page()["cases"]}, {self.RAID})
+        index.close()
+
+    def test_failed_write_releases_content(self):
+        """Test a record that could not be logged leaves no reference behind."""
+        from benchmark import fake_message
+        logger = self.log_raid(1)
+        with self.assertRaises(TypeError):
+            logger.log_evidence(fake_message(2, self.RAID), {"severity": "high", "unserializable": {1}})
+        self.assertEqual(self.store.stats()["references"], 1)
+
+    def test_purge_releases_content(self):
+        """Test retention drops old records and the texts only they referred to."""
+        logger = self.log_raid(5)
+        old = self.store.reference({"message_id": "old", "content": "an old insult",
+                                    "logged_at": "2020-01-01T00:00:00+00:00"})
+        with open(logger.log_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(old) + '\n')
+        self.assertEqual(self.store.stats()["blobs"], 2)
+
+        self.assertEqual(logger.purge_evidence(30), 1)
+        with open(logger.log_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(sum(json.loads(line)["message_id"] != "old" for line in f), 5)
+        self.assertIsNone(self.store.get(old["content_sha256"]))
+        self.assertEqual(self.store.stats()["references"], 5)
+        self.assertEqual(logger.purge_evidence(30), 0)
+
+    def test_dedup_report(self):
+        """Test the dedup ratio counts only the content a store would move."""
+        path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for n in range(10):
+                f.write(json.dumps({"message_id": str(n), "content": "spam" if n < 8 else f"unique {n}"}) + '\n')
+            f.write("not json\n")
+        report = dedup_report(path)
+        self.assertEqual((report["records"], report["unique_contents"]), (10, 3))
+        self.assertEqual(report["dedup_ratio"], round((8 * 4 + 2 * 8) / (4 + 2 * 8), 2))
+        self.assertEqual(report["log_bytes_saved"], 8 * 4 + 2 * 8 - 10 * 64)
+
+        report = dedup_report(path, min_size=5)
+        self.assertEqual((report["records"], report["unique_contents"]), (2, 2))
+        self.assertEqual(report["dedup_ratio"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Unit tests for the incrementally materialized evidence CSV
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from content_store import ContentStore
+from csv_view import FIELDNAMES, CsvView, csv_row
+
+
+def record(n: int, content: str = "you idiot") -> dict:
+    return {
+        "message_id": str(n), "author_id": str(n % 3), "author_name": f"user{n % 3}",
+        "channel_name": "general", "guild_name": "Guild", "content": content,
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "analysis": {"severity": "high", "abuse_score": 0.9, "detected_keywords": ["idiot"]},
+        "evidence_hash": f"{n:016x}"
+    }
+
+
+class TestCsvView(unittest.TestCase):
+    """Test cases for the CsvView class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        self.csv_path = os.path.join(self.tmp.name, "abuse_evidence.csv")
+        self.view = CsvView(self.log_path, self.csv_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, *records, partial: str = ""):
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            for r in records:
+                f.write(json.dumps(r) + '\n')
+            f.write(partial)
+
+    def rows(self):
+        with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+
+    def test_incremental_updates(self):
+        """Test only new complete lines are added, with the header written once."""
+        self.append(record(0), record(1), record(2))
+        self.assertEqual(self.view.materialize(), 3)
+        self.assertEqual(self.view.materialize(), 0)
+
+        partial = json.dumps(record(4))
+        self.append(record(3), partial=partial[:20])
+        self.assertEqual(self.view.materialize(), 1)
+        self.append(partial=partial[20:] + '\n')
+        self.assertEqual(self.view.materialize(), 1)
+
+        rows = self.rows()
+        self.assertEqual([row['message_id'] for row in rows], ['0', '1', '2', '3', '4'])
+        self.assertEqual(rows[0], {k: str(v) for k, v in csv_row(record(0)).items()})
+        self.assertEqual(list(rows[0]), FIELDNAMES)
+
+    def test_recovers_from_interrupted_run(self):
+        """Test rows written after the last checkpoint are not duplicated."""
+        self.append(record(0))
+        self.view.materialize()
+        with open(self.csv_path, 'a', encoding='utf-8') as f:
+            f.write("1,half a row")
+        self.append(record(1))
+        self.view.materialize()
+        self.assertEqual([row['message_id'] for row in self.rows()], ['0', '1'])
+
+    def test_rebuilds(self):
+        """Test a replaced log, a deleted CSV and a CSV left by the old dual-write are rebuilt."""
+        with open(self.csv_path, 'w', encoding='utf-8') as f:
+            f.write("old,dual,write\n1,2,3\n")
+        self.append(record(0), record(1))
+        self.assertEqual(self.view.materialize(), 2)
+        self.assertEqual(len(self.rows()), 2)
+
+        os.remove(self.log_path)
+        self.append(record(5))
+        self.assertEqual(self.view.materialize(), 1)
+        self.assertEqual([row['message_id'] for row in self.rows()], ['5'])
+
+        os.remove(self.csv_path)
+        self.assertEqual(self.view.materialize(), 1)
+        self.assertEqual(len(self.rows()), 1)
+
+    def test_resolves_content(self):
+        """Test content stored by hash is written out in full (up to 500 characters)."""
+        store = ContentStore(os.path.join(self.tmp.name, "content.db"))
+        text = "raid message " * 50
+        self.append(store.reference(record(0, text)))
+        view = CsvView(self.log_path, self.csv_path, content_store=store)
+        view.materialize()
+        self.assertEqual(self.rows()[0]['content'], text[:500])
+        store.close()
+
+    def test_logger_does_not_write_csv(self):
+        """Test log_evidence leaves the CSV to the view."""
+        from benchmark import fake_message
+        previous = os.getcwd()
+        os.chdir(self.tmp.name)  # Importing bot_enhanced creates its files in the working directory
+        try:
+            with redirect_stdout(io.StringIO()):
+                from bot_enhanced import ForensicsLogger
+            logger = ForensicsLogger(log_dir=os.path.join(self.tmp.name, "logs"))
+            logger.log_evidence(fake_message(1, "you idiot"), record(1)["analysis"])
+        finally:
+            os.chdir(previous)
+        self.assertFalse(os.path.exists(logger.csv_file))
+        self.assertEqual(logger.csv_view.materialize(), 1)
+        self.assertTrue(os.path.exists(logger.csv_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
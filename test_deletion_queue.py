@@ -0,0 +1,155 @@
+"""
+Unit tests for the coalesced auto-moderation deletion queue
+"""
+
+import asyncio
+import io
+import unittest
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+import discord
+from deletion_queue import DeletionQueue
+
+
+class MockChannel:
+    """Channel that records delete and send calls."""
+
+    def __init__(self, channel_id=111222333):
+        self.id = channel_id
+        self.bulk_deletes = []
+        self.sent = []
+
+    async def delete_messages(self, messages, reason=None):
+        self.bulk_deletes.append([m.id for m in messages])
+
+    async def send(self, embed=None, delete_after=None):
+        self.sent.append(embed)
+
+
+class MockMessage:
+    """Message that records single deletes."""
+
+    def __init__(self, message_id, channel, age=timedelta(0)):
+        self.id = message_id
+        self.channel = channel
+        self.created_at = datetime.now(timezone.utc) - age
+        self.deleted = False
+
+    async def delete(self):
+        self.deleted = True
+
+
+class MockResponse:
+    """Minimal aiohttp-like response for building HTTPExceptions."""
+
+    def __init__(self, status):
+        self.status = status
+        self.reason = "Forbidden"
+
+
+class ForbiddenChannel(MockChannel):
+    """Channel where the bot may send but not delete."""
+
+    async def delete_messages(self, messages, reason=None):
+        raise discord.Forbidden(MockResponse(403), "missing permissions")
+
+
+class MockMember:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.mention = f"<@{user_id}>"
+
+
+class TestDeletionQueue(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the DeletionQueue class."""
+
+    def setUp(self):
+        self.queue = DeletionQueue(window=0.01)
+        self.channel = MockChannel()
+
+    async def test_bulk_delete_within_window(self):
+        """Test that messages queued in one window are bulk deleted together."""
+        messages = [MockMessage(i, self.channel) for i in range(5)]
+        for message in messages:
+            self.queue.delete(message)
+        await self.queue.close()
+        self.assertEqual(self.channel.bulk_deletes, [[0, 1, 2, 3, 4]])
+        self.assertFalse(any(m.deleted for m in messages))
+
+    async def test_single_message_uses_single_delete(self):
+        """Test that a lone message is deleted individually."""
+        message = MockMessage(1, self.channel)
+        self.queue.delete(message)
+        await self.queue.close()
+        self.assertTrue(message.deleted)
+        self.assertEqual(self.channel.bulk_deletes, [])
+
+    async def test_old_messages_fall_back_to_single_deletes(self):
+        """Test that messages older than 14 days are not bulk deleted."""
+        recent = [MockMessage(i, self.channel) for i in range(3)]
+        old = MockMessage(99, self.channel, age=timedelta(days=15))
+        for message in recent + [old]:
+            self.queue.delete(message)
+        await self.queue.close()
+        self.assertEqual(self.channel.bulk_deletes, [[0, 1, 2]])
+        self.assertTrue(old.deleted)
+
+    async def test_chunks_of_100(self):
+        """Test that more than 100 messages are split into bulk chunks."""
+        for i in range(150):
+            self.queue.delete(MockMessage(i, self.channel))
+        await self.queue.close()
+        self.assertEqual([len(c) for c in self.channel.bulk_deletes], [100, 50])
+
+    async def test_duplicate_message_queued_once(self):
+        """Test that queuing the same message twice deletes it once."""
+        message = MockMessage(1, self.channel)
+        self.queue.delete(message)
+        self.queue.delete(message)
+        self.queue.delete(MockMessage(2, self.channel))
+        await self.queue.close()
+        self.assertEqual(self.channel.bulk_deletes, [[1, 2]])
+
+    async def test_notices_coalesced(self):
+        """Test that notices in one window produce a single channel message."""
+        for user_id in (1, 2, 1):
+            self.queue.notify(self.channel, MockMember(user_id), "please slow down!")
+        await self.queue.close()
+        self.assertEqual(len(self.channel.sent), 1)
+        description = self.channel.sent[0].description
+        self.assertIn("<@1> - please slow down! (x2)", description)
+        self.assertIn("<@2> - please slow down!", description)
+
+    async def test_notices_sent_without_delete_permission(self):
+        """Test that warnings are still sent when deleting is forbidden."""
+        channel = ForbiddenChannel()
+        for message_id in (1, 2):
+            self.queue.delete(MockMessage(message_id, channel))
+        self.queue.notify(channel, MockMember(1), "warning 1/3")
+        with redirect_stdout(io.StringIO()) as output:
+            await self.queue.close()
+        self.assertIn("missing permissions", output.getvalue())
+        self.assertEqual(len(channel.sent), 1)
+        self.assertEqual(channel.sent[0].title, "⚠️ Auto-Mod Warning")
+
+    async def test_full_batch_flush_task_kept(self):
+        """Test that the early flush of a full batch is referenced until it finishes."""
+        for message_id in range(DeletionQueue.BULK_LIMIT):
+            self.queue.delete(MockMessage(message_id, self.channel))
+        self.assertEqual(len(self.queue._tasks), 1)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(self.queue._tasks, set())
+        self.assertEqual(len(self.channel.bulk_deletes), 1)
+
+    async def test_flush_after_window(self):
+        """Test that the queue flushes on its own after the window."""
+        self.queue.delete(MockMessage(1, self.channel))
+        self.queue.delete(MockMessage(2, self.channel))
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.channel.bulk_deletes, [[1, 2]])
+        self.assertEqual(self.queue.batches, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
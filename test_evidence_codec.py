@@ -0,0 +1,131 @@
+"""
+Unit tests for the compact binary evidence record format
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from evidence_codec import EvidenceCodec, StringTable, compare_log
+
+
+def evidence(n: int = 1, guild: bool = True, content: str = "you are such an idiot 🙄") -> dict:
+    return {
+        "message_id": str(1234567890123456789 + n),
+        "author_id": str(987654321098765432 + n % 3),
+        "author_name": f"user{n % 3}",
+        "channel_id": str(555555555555555555),
+        "channel_name": "general" if guild else "DM",
+        "guild_id": "444444444444444444" if guild else None,
+        "guild_name": "Test Guild" if guild else None,
+        "content": content,
+        "created_at": "2024-05-01T12:30:45.123000+00:00",
+        "analysis": {
+            "is_abusive": True,
+            "abuse_score": 1.237,
+            "textblob_sentiment": -0.8,
+            "vader_sentiment": -0.743,
+            "combined_sentiment": -0.772,
+            "vader_details": {"neg": 0.523, "neu": 0.477, "pos": 0.0, "compound": -0.7425},
+            "detected_keywords": ["idiot", "stupid"],
+            "severity": "high",
+            "prevention_tip": "🚨 Severe abuse detected. Document evidence and contact authorities if needed.",
+            "timestamp": "2024-05-01T12:30:45.456789+00:00",
+            "content_hash": "0123456789abcdef"
+        },
+        "logged_at": "2024-05-01T12:30:46+00:00",
+        "evidence_hash": "0123456789abcdef"
+    }
+
+
+class TestEvidenceCodec(unittest.TestCase):
+    """Test cases for the EvidenceCodec class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = os.getcwd()
+        os.chdir(self.tmp.name)  # Importing bot_enhanced creates its files in the working directory
+
+    def tearDown(self):
+        os.chdir(self.previous)
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test decoding gives back exactly the JSONL record, for guild and DM cases."""
+        codec = EvidenceCodec()
+        for record in (evidence(), evidence(2, guild=False)):
+            encoded = codec.encode(record)
+            self.assertEqual(json.dumps(codec.decode(encoded)), json.dumps(record))
+            self.assertLess(len(encoded), len(json.dumps(record).encode('utf-8')) / 3)
+
+    def test_detector_output_round_trips(self):
+        """Test real detector scores survive the float32 encoding."""
+        from bot_enhanced import AbuseDetector
+        detector = AbuseDetector()
+        codec = EvidenceCodec()
+        for text in ("you stupid worthless idiot", "I hate this, shut up loser", "die trash"):
+            record = evidence(content=text)
+            record["analysis"] = detector.analyze_message(text)
+            self.assertEqual(codec.decode(codec.encode(record)), record)
+
+    def test_content_reference_round_trip(self):
+        """Test records that reference their content by hash keep the reference."""
+        codec = EvidenceCodec()
+        record = {("content_sha256" if key == "content" else key): ("ab" * 32 if key == "content" else value)
+                  for key, value in evidence().items()}
+        self.assertEqual(json.dumps(codec.decode(codec.encode(record))), json.dumps(record))
+
+    def test_string_table_persists(self):
+        """Test ids written by one codec resolve in a codec opened later."""
+        path = os.path.join(self.tmp.name, "strings.jsonl")
+        first = EvidenceCodec(StringTable(path))
+        encoded = first.encode(evidence())
+        second = EvidenceCodec(StringTable(path))
+        self.assertEqual(len(second.table), len(first.table))
+        self.assertEqual(second.decode(encoded), evidence())
+
+    def test_file_framing_and_peek(self):
+        """Test length-prefixed files, a torn final record, and header-only peeks."""
+        codec = EvidenceCodec()
+        f = io.BytesIO()
+        for n in range(3):
+            codec.write(f, evidence(n))
+        f.write(b"\x40\x00\x00\x00partial")
+        f.seek(0)
+        records = list(codec.iter_file(f))
+        self.assertEqual([r["message_id"] for r in records], [evidence(n)["message_id"] for n in range(3)])
+
+        peeked = codec.peek(codec.encode(evidence(4, guild=False)))
+        self.assertEqual(peeked["author_id"], evidence(4)["author_id"])
+        self.assertIsNone(peeked["guild_id"])
+        self.assertEqual(peeked["severity"], "high")
+
+    def test_rejects_unrepresentable_records(self):
+        """Test records missing fields or with odd hashes and timestamps raise ValueError."""
+        codec = EvidenceCodec()
+        partial = evidence()
+        del partial["analysis"]["textblob_sentiment"]
+        bad_hash = evidence()
+        bad_hash["evidence_hash"] = "abc"
+        local_time = evidence()
+        local_time["logged_at"] = "2024-05-01T14:30:46+02:00"
+        for record in (partial, bad_hash, local_time):
+            with self.assertRaises(ValueError):
+                codec.encode(record)
+
+    def test_compare_log(self):
+        """Test the JSONL comparison counts skipped records and reports sizes."""
+        path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for n in range(10):
+                f.write(json.dumps(evidence(n), ensure_ascii=False) + '\n')
+            f.write('{"message_id": "1"}\n')
+        report = compare_log(path)
+        self.assertEqual((report["records"], report["skipped"]), (11, 1))
+        self.assertLess(report["binary_bytes"], report["jsonl_bytes"] / 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
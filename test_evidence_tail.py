@@ -0,0 +1,104 @@
+"""
+Unit tests for incremental evidence log statistics
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from evidence_tail import EvidenceTail
+
+
+def record(n, guild_id="1", severity="low", author_id=None):
+    return {
+        "message_id": str(n),
+        "author_id": author_id or str(100 + n),
+        "guild_id": guild_id,
+        "analysis": {"severity": severity},
+        "logged_at": f"2024-01-01T00:00:{n:02d}"
+    }
+
+
+class TestEvidenceTail(unittest.TestCase):
+    """Test cases for the EvidenceTail class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        self.tail = EvidenceTail(self.path, recent_limit=3)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, *records, raw=""):
+        with open(self.path, 'a') as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+            f.write(raw)
+
+    def test_missing_file(self):
+        """Test empty statistics before the bot has logged anything."""
+        self.assertEqual(self.tail.refresh(), [])
+        self.assertEqual(self.tail.statistics()["total_cases"], 0)
+
+    def test_aggregates_per_guild(self):
+        """Test totals, severity and unique counts overall and per guild."""
+        self.append(record(1, "1", "high"), record(2, "2", "medium"), record(3, "1", "low", author_id="101"))
+        self.tail.refresh()
+        overall = self.tail.statistics()
+        self.assertEqual(overall["total_cases"], 3)
+        self.assertEqual(overall["unique_guilds"], 2)
+        guild = self.tail.statistics("1")
+        self.assertEqual(guild["total_cases"], 2)
+        self.assertEqual(guild["unique_users"], 1)
+        self.assertEqual(guild["severity_breakdown"], {"low": 1, "medium": 0, "high": 1})
+        self.assertEqual(self.tail.statistics("999")["total_cases"], 0)
+
+    def test_recent_cases_bounded_and_newest_first(self):
+        """Test that only the newest cases are kept, newest first."""
+        self.append(*[record(n) for n in (5, 1, 9, 3, 7)])
+        self.tail.refresh()
+        recent = self.tail.statistics()["recent_cases"]
+        self.assertEqual([r["message_id"] for r in recent], ["9", "7", "5"])
+
+    def test_only_new_records_read(self):
+        """Test that a refresh picks up appended records only."""
+        self.append(record(1))
+        self.assertEqual(len(self.tail.refresh()), 1)
+        self.assertEqual(self.tail.refresh(), [])
+        self.append(record(2))
+        self.assertEqual([r["message_id"] for r in self.tail.refresh()], ["2"])
+        self.assertEqual(self.tail.statistics()["total_cases"], 2)
+
+    def test_partial_line_waits(self):
+        """Test that a half-written record is read once it is complete."""
+        line = json.dumps(record(1))
+        self.append(raw=line[:10])
+        self.assertEqual(self.tail.refresh(), [])
+        self.append(raw=line[10:] + "\n")
+        self.assertEqual(len(self.tail.refresh()), 1)
+
+    def test_corrupt_lines_skipped(self):
+        """Test that invalid JSON lines are ignored."""
+        self.append(raw="not json\n")
+        self.append(record(1))
+        self.tail.refresh()
+        self.assertEqual(self.tail.statistics()["total_cases"], 1)
+
+    def test_rotation_rebuilds(self):
+        """Test that a replaced or truncated log is re-read from the start."""
+        self.append(record(1), record(2))
+        self.tail.refresh()
+        os.remove(self.path)
+        self.append(record(3))
+        self.tail.refresh()
+        self.assertEqual(self.tail.statistics()["total_cases"], 1)
+
+        with open(self.path, 'w') as f:
+            f.write("")
+        self.tail.refresh()
+        self.assertEqual(self.tail.statistics()["total_cases"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the guild configuration store
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from guild_config import GuildConfigStore
+
+
+class TestGuildConfigStore(unittest.TestCase):
+    """Test cases for the GuildConfigStore class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "guild_config.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_defaults(self):
+        """Test that unset keys return their defaults."""
+        store = GuildConfigStore(self.path)
+        self.assertFalse(store.get(1, 'auto_mod'))
+        self.assertIsNone(store.get(1, 'log_channel'))
+        self.assertEqual(store.get(1, 'spam_limits'), {})
+
+    def test_unknown_key_rejected(self):
+        """Test that typos in setting names are caught."""
+        store = GuildConfigStore(self.path)
+        with self.assertRaises(ValueError):
+            store.set(1, 'automod', True)
+
+    def test_persisted_incrementally(self):
+        """Test that each change is one journal line and survives a restart."""
+        store = GuildConfigStore(self.path)
+        store.set(1, 'auto_mod', True)
+        store.update(1, welcome_channel=5, welcome_message="Hi {user}")
+        with open(store.journal_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        reopened = GuildConfigStore(self.path)
+        self.assertTrue(reopened.get(1, 'auto_mod'))
+        self.assertEqual(reopened.get(1, 'welcome_message'), "Hi {user}")
+
+    def test_none_resets(self):
+        """Test that setting None restores the default."""
+        store = GuildConfigStore(self.path)
+        store.set(1, 'log_channel', 42)
+        store.set(1, 'log_channel', None)
+        self.assertIsNone(GuildConfigStore(self.path).get(1, 'log_channel'))
+        self.assertEqual(store.guilds, {})
+
+    def test_compaction(self):
+        """Test that the journal is folded into the snapshot."""
+        store = GuildConfigStore(self.path, compact_after=3)
+        for channel_id in range(3):
+            store.set(1, 'log_channel', channel_id)
+        self.assertEqual(os.path.getsize(store.journal_path), 0)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["guilds"]["1"]["log_channel"], 2)
+        self.assertEqual(GuildConfigStore(self.path).get(1, 'log_channel'), 2)
+
+    def test_change_notifications(self):
+        """Test that listeners hear about local changes."""
+        store = GuildConfigStore(self.path)
+        changes = []
+        store.subscribe(lambda guild_id, key, value: changes.append((guild_id, key, value)))
+        store.set(1, 'auto_mod', True)
+        store.set(1, 'auto_mod', None)
+        self.assertEqual(changes, [(1, 'auto_mod', True), (1, 'auto_mod', False)])
+
+    def test_hot_reload_from_other_process(self):
+        """Test that changes written by another store are picked up."""
+        store = GuildConfigStore(self.path)
+        other = GuildConfigStore(self.path, compact_after=2)
+        changes = []
+        store.subscribe(lambda guild_id, key, value: changes.append((guild_id, key, value)))
+
+        self.assertFalse(store.reload_if_changed())
+        other.set(7, 'log_channel', 99)
+        self.assertTrue(store.reload_if_changed())
+        self.assertEqual(store.get(7, 'log_channel'), 99)
+
+        other.set(7, 'auto_mod', True)  # Triggers compaction in the other store
+        self.assertTrue(store.reload_if_changed())
+        self.assertTrue(store.get(7, 'auto_mod'))
+        self.assertEqual(changes, [(7, 'log_channel', 99), (7, 'auto_mod', True)])
+
+    def test_import_legacy(self):
+        """Test importing the old log channel and welcome files."""
+        log_path = os.path.join(self.tmp.name, "log_channels.json")
+        welcome_path = os.path.join(self.tmp.name, "welcome_config.json")
+        with open(log_path, 'w') as f:
+            json.dump({"1": "100"}, f)
+        with open(welcome_path, 'w') as f:
+            json.dump({"channels": {"1": "200"}, "messages": {"1": "Welcome!"}}, f)
+
+        store = GuildConfigStore(self.path)
+        self.assertTrue(store.import_legacy(log_path, welcome_path))
+        self.assertEqual(store.get(1, 'log_channel'), 100)
+        self.assertEqual(store.get(1, 'welcome_channel'), 200)
+        self.assertFalse(store.import_legacy(log_path, welcome_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
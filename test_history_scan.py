@@ -0,0 +1,112 @@
+"""
+Unit tests for the retroactive history scanner
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from history_scan import HistoryScanner, ScanCheckpoints, _init_worker
+
+
+class KeywordDetector:
+    """Detector stand-in that flags messages containing "bad"."""
+
+    def analyze_message(self, content):
+        abusive = "bad" in content
+        return {"is_abusive": abusive, "severity": "high" if abusive else "low"}
+
+
+class MockChannel:
+    """Channel with `count` messages whose IDs are 1..count."""
+
+    def __init__(self, count, channel_id=10):
+        self.id = channel_id
+        self.requests = 0
+        author = SimpleNamespace(bot=False)
+        self.messages = [
+            SimpleNamespace(id=i, content="bad word" if i % 10 == 0 else "hello", author=author)
+            for i in range(1, count + 1)
+        ]
+
+    async def history(self, limit, after=None, oldest_first=True):
+        self.requests += 1
+        start = after.id if after else 0
+        for message in [m for m in self.messages if m.id > start][:limit]:
+            yield message
+
+
+class TestHistoryScanner(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the HistoryScanner class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "checkpoints.json")
+        self.executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(KeywordDetector,))
+        self.logged = []
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.tmp.cleanup()
+
+    def scanner(self):
+        return HistoryScanner(
+            self.executor,
+            lambda message, analysis: self.logged.append(message.id),
+            ScanCheckpoints(self.path),
+            rest_budget=1000, rest_share=1.0
+        )
+
+    async def test_full_scan(self):
+        """Test that every page is scanned and abusive messages are logged."""
+        channel = MockChannel(250)
+        checkpoint = await self.scanner().scan_channel(channel)
+        self.assertTrue(checkpoint["done"])
+        self.assertEqual(checkpoint["scanned"], 250)
+        self.assertEqual(checkpoint["flagged"], 25)
+        self.assertEqual(checkpoint["severity"]["high"], 25)
+        self.assertEqual(len(self.logged), 25)
+        self.assertEqual(channel.requests, 3)
+
+    async def test_resume_from_checkpoint(self):
+        """Test that a stopped scan continues after the last processed message."""
+        channel = MockChannel(250)
+        first = await self.scanner().scan_channel(channel, max_messages=150)
+        self.assertFalse(first["done"])
+        self.assertEqual(first["last_message_id"], 150)
+
+        # A new scanner (e.g. after a restart) picks up the saved checkpoint
+        second = await self.scanner().scan_channel(channel)
+        self.assertTrue(second["done"])
+        self.assertEqual(second["scanned"], 250)
+        self.assertEqual(sorted(self.logged), list(range(10, 251, 10)))
+
+    async def test_progress_reported_per_page(self):
+        """Test that progress is reported after each page."""
+        reports = []
+
+        async def progress(channel_id, checkpoint):
+            reports.append(checkpoint["scanned"])
+
+        await self.scanner().scan_channel(MockChannel(250), progress=progress)
+        self.assertEqual(reports, [100, 200, 250])
+
+    async def test_empty_channel_and_bad_limit(self):
+        """Test an empty channel completes and a limit below one is rejected."""
+        checkpoint = await self.scanner().scan_channel(MockChannel(0))
+        self.assertTrue(checkpoint["done"])
+        self.assertEqual(checkpoint["scanned"], 0)
+        with self.assertRaises(ValueError):
+            await self.scanner().scan_channel(MockChannel(5, channel_id=11), max_messages=0)
+
+    def test_rest_share_pacing(self):
+        """Test that the request interval follows the REST budget share."""
+        scanner = HistoryScanner(self.executor, print, ScanCheckpoints(self.path), rest_budget=50, rest_share=0.1)
+        self.assertAlmostEqual(scanner.min_interval, 0.2)
+        with self.assertRaises(ValueError):
+            HistoryScanner(self.executor, print, ScanCheckpoints(self.path), rest_share=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
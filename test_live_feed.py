@@ -0,0 +1,174 @@
+"""
+Unit tests for the dashboard live feed
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from evidence_tail import EvidenceTail
+from live_feed import ALL_GUILDS, LiveFeed, event_id, parse_event_id
+
+
+def record(n, guild_id="1", severity="low"):
+    return {
+        "message_id": str(n),
+        "author_id": str(100 + n),
+        "author_name": f"user{n}",
+        "guild_id": guild_id,
+        "content": "bad words",
+        "analysis": {"severity": severity, "scores": {"toxicity": 0.9}},
+        "logged_at": f"2024-01-01T00:00:{n:02d}"
+    }
+
+
+class TestLiveFeed(unittest.TestCase):
+    """Test cases for the LiveFeed class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.evidence_path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        self.warnings_path = os.path.join(self.tmp.name, "warnings.json")
+        self.feed = LiveFeed(EvidenceTail(self.evidence_path), self.warnings_path, history=50)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, *records):
+        with open(self.evidence_path, 'a') as f:
+            for r in records:
+                f.write(json.dumps(r) + "\n")
+
+    def write_warnings(self, warnings):
+        with open(self.warnings_path, 'w') as f:
+            json.dump(warnings, f)
+
+    def kinds(self, audience, position=(0, 0, 0)):
+        events, _ = self.feed.events_after(position, audience, timeout=0)
+        return [(event.kind, event.data) for event in events]
+
+    def test_case_and_counter_events(self):
+        """Test new records become case events plus per-guild counters."""
+        self.append(record(1, "1", "high"), record(2, "2"))
+        self.feed.poll()
+
+        events = self.kinds("1")
+        self.assertEqual([kind for kind, _ in events], ["case", "counters"])
+        case, counters = events[0][1], events[1][1]
+        self.assertEqual(case["author_name"], "user1")
+        self.assertEqual(case["analysis"], {"severity": "high"})
+        self.assertEqual(counters["total_cases"], 1)
+        self.assertEqual(counters["severity_breakdown"]["high"], 1)
+        self.assertNotIn("recent_cases", counters)
+
+        events = self.kinds(ALL_GUILDS)
+        self.assertEqual([kind for kind, _ in events], ["case", "case", "counters"])
+        self.assertEqual(events[-1][1]["total_cases"], 2)
+
+    def test_audience_filtering(self):
+        """Test a guild dashboard never sees another guild's events."""
+        self.append(record(1, "2"))
+        self.feed.poll()
+        self.assertEqual(self.kinds("1"), [])
+        self.assertEqual(self.feed.position[1], os.path.getsize(self.evidence_path))
+
+    def test_warning_changes(self):
+        """Test changed warning counts are published after the baseline."""
+        self.write_warnings({"1:10": [{}]})
+        self.feed.check_warnings()
+        baseline = self.feed.position
+        self.assertEqual(len(self.feed.events), 0)
+
+        self.write_warnings({"1:10": [{}, {}], "2:20": [{}]})
+        self.feed.check_warnings()
+        events = sorted(data["guild_id"] for kind, data in self.kinds(ALL_GUILDS, baseline))
+        self.assertEqual(events, ["1", "2"])
+        self.assertEqual(self.kinds("1", baseline), [("warning", {"guild_id": "1", "user_id": "10", "count": 2})])
+
+        second = self.feed.position
+        self.write_warnings({"2:20": [{}]})  # Likely within the same mtime tick
+        self.feed.check_warnings()
+        self.assertEqual(self.kinds("1", second), [("warning", {"guild_id": "1", "user_id": "10", "count": 0})])
+        self.assertIsNone(self.feed.events_after((0, 0, 0), "1", timeout=0)[0])  # From before the baseline
+
+    def test_resume_and_reset(self):
+        """Test resuming from an event ID, and resets when it is out of range."""
+        self.append(record(1))
+        self.feed.poll()
+        first = self.feed.position
+        self.append(record(2))
+        self.feed.poll()
+
+        events, position = self.feed.events_after(first, "1", timeout=0)
+        self.assertEqual([event.data.get("message_id") for event in events], ["2", None])
+        self.assertEqual(position, self.feed.position)
+
+        # Older than the buffer, or from a log that was since truncated or replaced
+        small = LiveFeed(EvidenceTail(self.evidence_path), self.warnings_path, history=2)
+        small.poll()
+        self.assertIsNone(small.events_after((first[0], 0, 0), "1", timeout=0)[0])
+        self.assertIsNone(self.feed.events_after((first[0], 10 ** 6, 0), "1", timeout=0)[0])
+        self.assertIsNone(self.feed.events_after((first[0] + 1, 0, 0), "1", timeout=0)[0])
+
+    def test_resume_on_another_worker(self):
+        """Test an event ID from one feed resumes on another following the same files."""
+        other = LiveFeed(EvidenceTail(self.evidence_path), self.warnings_path)
+        self.append(record(1))
+        self.feed.poll()
+        self.append(record(2), record(3))
+        self.feed.poll()
+        other.poll()  # Reads all three records in one batch
+
+        seen = self.kinds("1")[0]
+        self.assertEqual(seen[1]["message_id"], "1")
+        resume = parse_event_id(self.feed.events[0].id)
+        events, _ = other.events_after(resume, "1", timeout=0)
+        self.assertEqual([event.data.get("message_id") for event in events], ["2", "3", None])
+        self.assertEqual([event.id for event in events[:2]],
+                         [event.id for event in self.feed.events if event.kind == "case"][1:])
+
+        # A worker that hasn't read the newest records yet waits for them instead of resetting
+        lagging = LiveFeed(EvidenceTail(self.evidence_path), self.warnings_path)
+        lagging.tail.inode = resume[0]
+        lagging.position = (resume[0], 0, 0)
+        self.assertEqual(lagging.events_after(self.feed.position, "1", timeout=0)[0], [])
+
+    def test_rotation_publishes_reset(self):
+        """Test truncating the evidence log sends a reset to every dashboard."""
+        self.append(record(1))
+        self.feed.poll()
+        position = self.feed.position
+        open(self.evidence_path, 'w').close()
+        self.feed.poll()
+        self.assertIsNone(self.feed.events_after(position, "5", timeout=0)[0])
+        self.assertEqual(len(self.feed.events), 0)
+
+    def test_stream(self):
+        """Test the SSE stream: retry hint, events, heartbeat."""
+        stream = self.feed.stream("1", heartbeat=0.01)
+        self.assertEqual(next(stream), "retry: 3000\n\n")
+        self.append(record(1))
+        self.feed.poll()
+        chunk = next(stream)
+        position = (os.stat(self.evidence_path).st_ino, os.path.getsize(self.evidence_path), 0)
+        self.assertTrue(chunk.startswith(f"id: {event_id(position)}\nevent: case\ndata: "))
+        self.assertIn("event: counters", chunk)
+        self.assertEqual(next(stream), ": heartbeat\n\n")
+
+    def test_stream_resume_out_of_range(self):
+        """Test a stale Last-Event-ID gets a reset event."""
+        self.append(record(1))
+        self.feed.poll()
+        stream = self.feed.stream("1", last_event_id="1-999-0", heartbeat=0.01)
+        next(stream)
+        self.assertEqual(next(stream), f"id: {event_id(self.feed.position)}\nevent: reset\ndata: {{}}\n\n")
+
+    def test_parse_event_id(self):
+        """Test malformed Last-Event-IDs are ignored."""
+        self.assertEqual(parse_event_id("12-340-5"), (12, 340, 5))
+        for text in (None, "", "42", "1-2", "a-b-c", "1--2-3"):
+            self.assertIsNone(parse_event_id(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Unit tests for the Discord stubs and the offline load generator
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+import discord
+
+from discord_stubs import RestSimulator, StubWorld
+from load_generator import LoadGenerator, create_bot, parse_mix
+
+
+class TestStubs(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the simulated REST API and stub objects."""
+
+    async def test_rest_calls_counted(self):
+        """Test REST calls made through stub objects are counted per kind."""
+        world = StubWorld(RestSimulator(latency=0.0, jitter=0.0))
+        channel = next(iter(world.channels.values()))
+        message = world.message("hello", 42, channel)
+        await message.delete()
+        await channel.edit(slowmode_delay=10)
+        await message.author.timeout(None)
+        self.assertEqual(world.rest.stats()["calls"], {"delete": 1, "channel_edit": 1, "timeout": 1})
+        self.assertEqual(channel.slowmode_delay, 10)
+        self.assertIs(world.member(42, channel.guild), message.author)
+
+    async def test_simulated_errors(self):
+        """Test failing calls raise HTTPException like the real API."""
+        rest = RestSimulator(latency=0.0, jitter=0.0, error_rate=1.0)
+        with self.assertRaises(discord.HTTPException):
+            await rest.call('send')
+        self.assertEqual(rest.errors, 1)
+
+
+class TestLoadGenerator(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the LoadGenerator class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.world = StubWorld(RestSimulator(latency=0.0, jitter=0.0))
+
+    def tearDown(self):
+        os.chdir(self.previous)
+        self.tmp.cleanup()
+
+    def test_parse_mix(self):
+        """Test mixes are normalized and unknown kinds rejected."""
+        self.assertEqual(parse_mix("clean=3,raid=1"), {"clean": 0.75, "raid": 0.25})
+        with self.assertRaises(ValueError):
+            parse_mix("ddos=1")
+
+    def test_raid_wave(self):
+        """Test a raid event is one message from each of many new accounts."""
+        generator = LoadGenerator(None, self.world, mix={"raid": 1.0}, raid_size=20)
+        wave = next(generator.events())
+        self.assertEqual(len(wave), 20)
+        self.assertEqual(len({m.author.id for m in wave}), 20)
+        self.assertEqual(len({m.content for m in wave}), 1)
+
+    async def test_run_reports(self):
+        """Test a short run through Guardify.on_message handles and reports every message."""
+        with redirect_stdout(io.StringIO()):
+            bot = create_bot("guardify", self.world)
+            generator = LoadGenerator(bot, self.world, rate=200, duration=0.2, mix={"abusive": 1.0})
+            report = await generator.run(drain_timeout=5)
+
+        self.assertEqual(report["messages"], 40)
+        self.assertEqual(len(generator.latencies), 40)
+        self.assertLessEqual(report["latency"]["p50_ms"], report["latency"]["p99_ms"])
+        self.assertEqual(set(report["dropped"].values()), {0})
+        self.assertGreater(report["rest"]["calls"].get("bulk_delete", 0), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
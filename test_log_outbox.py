@@ -0,0 +1,94 @@
+"""
+Unit tests for batched moderation log delivery
+"""
+
+import asyncio
+import unittest
+import discord
+from log_outbox import LogOutbox
+
+
+class MockChannel:
+    """Log channel that records sent messages."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content=None, embeds=None):
+        self.sent.append((content, embeds))
+
+
+class TestLogOutbox(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the LogOutbox class."""
+
+    def setUp(self):
+        self.channel = MockChannel()
+        self.outbox = LogOutbox(lambda channel_id: self.channel, interval=0.01, max_backlog=30)
+
+    def embed(self, i):
+        return discord.Embed(title=f"Action {i}")
+
+    async def test_embeds_packed_per_message(self):
+        """Test that up to 10 embeds are sent in one message."""
+        for i in range(25):
+            self.outbox.put(1, self.embed(i))
+        await self.outbox.close()
+        self.assertEqual([len(embeds) for _, embeds in self.channel.sent], [10, 10, 5])
+
+    async def test_flush_on_interval(self):
+        """Test that a partial batch is sent after the interval."""
+        self.outbox.put(1, self.embed(0))
+        self.outbox.put(1, self.embed(1))
+        self.assertEqual(self.outbox.queue_depth, 2)
+        await asyncio.sleep(0.05)
+        self.assertEqual(len(self.channel.sent), 1)
+        self.assertEqual(self.outbox.queue_depth, 0)
+
+    async def test_flush_when_full(self):
+        """Test that a full batch is sent without waiting for the interval."""
+        self.outbox.interval = 60
+        for i in range(10):
+            self.outbox.put(1, self.embed(i))
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.channel.sent), 1)
+        await self.outbox.close()
+
+    async def test_full_batch_flush_task_kept(self):
+        """Test that the early flush of a full batch is referenced until it finishes."""
+        self.outbox.interval = 60
+        for i in range(10):
+            self.outbox.put(1, self.embed(i))
+        self.assertEqual(len(self.outbox._tasks), 1)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertEqual(self.outbox._tasks, set())
+
+    async def test_overflow_summarized(self):
+        """Test that embeds beyond the backlog are summarized."""
+        for i in range(167):
+            self.outbox.put(1, self.embed(i))
+        await self.outbox.close()
+        self.assertEqual(sum(len(embeds) for _, embeds in self.channel.sent), 30)
+        self.assertEqual(self.channel.sent[-1][0], "+137 more actions")
+
+    async def test_stats(self):
+        """Test that delivery statistics are reported."""
+        for i in range(12):
+            self.outbox.put(1, self.embed(i))
+        await self.outbox.close()
+        stats = self.outbox.stats()
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertEqual(stats['messages_sent'], 2)
+        self.assertEqual(stats['embeds_sent'], 12)
+        self.assertGreaterEqual(stats['avg_send_latency'], 0)
+
+    async def test_missing_channel_drops(self):
+        """Test that embeds for an unknown channel are counted as dropped."""
+        outbox = LogOutbox(lambda channel_id: None)
+        outbox.put(1, self.embed(0))
+        await outbox.close()
+        self.assertEqual(outbox.stats()['embeds_dropped'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Unit tests for the event loop lag watchdog
+"""
+
+import asyncio
+import copy
+import sys
+import time
+import unittest
+
+from loop_monitor import LoopMonitor, blocking_site
+from metrics import Metrics
+
+
+def block_loop(seconds):
+    time.sleep(seconds)  # Synchronous call stalling the loop
+
+
+class TestLoopMonitor(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the LoopMonitor class."""
+
+    async def asyncSetUp(self):
+        self.metrics = Metrics(prefix="test")
+        self.monitor = LoopMonitor(interval=0.02, threshold=0.1, metrics=self.metrics)
+        self.monitor.start()
+
+    async def asyncTearDown(self):
+        self.monitor.stop()
+
+    async def test_idle_loop_has_no_stalls(self):
+        """Test an idle loop records lag samples but no stalls."""
+        await asyncio.sleep(0.2)
+        stats = self.monitor.stats()
+        self.assertGreater(len(self.monitor.lag_samples), 3)
+        self.assertEqual(stats["stalls"], 0)
+        self.assertIsNone(stats["last_stall"])
+
+    async def test_blocking_call_captured(self):
+        """Test a blocked loop is reported once, with the blocking call's stack."""
+        await asyncio.sleep(0.05)
+        block_loop(0.4)
+        await asyncio.sleep(0.05)
+
+        stats = self.monitor.stats()
+        self.assertEqual(stats["stalls"], 1)
+        site = stats["last_stall"]["site"]
+        self.assertTrue(site.startswith("test_loop_monitor.py:"), site)
+        self.assertTrue(site.endswith("in block_loop"), site)
+        self.assertGreaterEqual(stats["last_stall"]["duration_ms"], 300)
+        self.assertGreaterEqual(stats["lag_max_ms"], 300)
+        self.assertIn("time.sleep(seconds)", "".join(stats["last_stall"]["stack"]))
+        text = self.metrics.render()
+        self.assertIn('test_event_loop_stalls_total{site="' + site + '"} 1', text)
+        self.assertIn("test_event_loop_lag_seconds_count", text)
+
+    def test_site_is_innermost_repo_frame(self):
+        """Test library frames are skipped when naming the site."""
+        sites = []
+
+        class Probe:
+            def __deepcopy__(self, memo):
+                sites.append(blocking_site(sys._getframe(1)))  # Innermost frame is in copy.py
+                return self
+
+        copy.deepcopy(Probe())
+        self.assertTrue(sites[0].startswith("test_loop_monitor.py:"), sites[0])
+        self.assertTrue(sites[0].endswith("in test_site_is_innermost_repo_frame"), sites[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Unit tests for the mass moderation helpers
+"""
+
+import asyncio
+import unittest
+from mass_actions import FloodTracker, chunked, fan_out, fingerprint, parse_user_ids
+
+
+class TestTargetParsing(unittest.TestCase):
+    """Test cases for user ID parsing and fingerprints."""
+
+    def test_parse_mentions_and_ids(self):
+        """Test that mentions and raw IDs are parsed in order without duplicates."""
+        text = "<@123456789012345678> <@!223456789012345678> 323456789012345678 <@123456789012345678>"
+        self.assertEqual(
+            parse_user_ids(text),
+            [123456789012345678, 223456789012345678, 323456789012345678]
+        )
+
+    def test_parse_empty(self):
+        """Test that no input gives no IDs."""
+        self.assertEqual(parse_user_ids(None), [])
+        self.assertEqual(parse_user_ids("nobody"), [])
+
+    def test_fingerprint_ignores_mentions_and_links(self):
+        """Test that raid variants differing only in pings and links match."""
+        a = fingerprint("FREE NITRO <@111> https://a.example/x")
+        b = fingerprint("free   nitro <@!222> https://b.example/y")
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, fingerprint("hello there"))
+
+    def test_chunked(self):
+        """Test chunk splitting."""
+        self.assertEqual(list(chunked([1, 2, 3, 4, 5], 2)), [[1, 2], [3, 4], [5]])
+
+
+class TestFloodTracker(unittest.TestCase):
+    """Test cases for the FloodTracker class."""
+
+    def test_authors_and_top(self):
+        """Test that repeated content is grouped by distinct authors."""
+        tracker = FloodTracker(window=60)
+        for author in range(5):
+            key = tracker.record(1, author, f"join my server <@{author}>", now=0)
+        tracker.record(1, 9, "normal chat", now=0)
+        self.assertEqual(sorted(tracker.authors(1, key, now=1)), [0, 1, 2, 3, 4])
+        top = tracker.top(1, now=1)
+        self.assertEqual(top[0][0], key)
+        self.assertEqual(top[0][1], 5)
+
+    def test_window_expiry(self):
+        """Test that old fingerprints are forgotten."""
+        tracker = FloodTracker(window=60)
+        key = tracker.record(1, 1, "spam", now=0)
+        tracker.record(1, 2, "other", now=100)
+        self.assertEqual(tracker.authors(1, key, now=100), [])
+        self.assertEqual(len(tracker.guilds[1]), 1)
+
+    def test_max_fingerprints(self):
+        """Test that the least recently seen fingerprints are dropped first."""
+        tracker = FloodTracker(window=60, max_fingerprints=2)
+        first = tracker.record(1, 1, "one", now=0)
+        tracker.record(1, 1, "two", now=0)
+        tracker.record(1, 1, "three", now=0)
+        self.assertNotIn(first, tracker.guilds[1])
+
+
+class TestFanOut(unittest.IsolatedAsyncioTestCase):
+    """Test cases for bounded fan-out."""
+
+    async def test_concurrency_bounded(self):
+        """Test that no more than `concurrency` actions run at once."""
+        running = 0
+        peak = 0
+
+        async def action(target):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            if target == 3:
+                raise ValueError("boom")
+
+        succeeded, failed = await fan_out(range(50), action, concurrency=5)
+        self.assertEqual(peak, 5)
+        self.assertEqual(len(succeeded), 49)
+        self.assertEqual(failed[0][0], 3)
+
+    async def test_progress_reported(self):
+        """Test that progress is reported while work runs."""
+        reports = []
+
+        async def action(target):
+            await asyncio.sleep(0)
+
+        async def progress(done, total):
+            reports.append((done, total))
+
+        await fan_out(range(10), action, concurrency=2, progress=progress, progress_interval=0)
+        self.assertTrue(reports)
+        self.assertEqual(reports[-1], (10, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
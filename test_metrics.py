@@ -0,0 +1,114 @@
+"""
+Unit tests for the pipeline metrics registry
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from action_scheduler import ActionScheduler
+from discord_stubs import RestSimulator, StubWorld
+from metrics import Metrics, format_labels
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the Metrics class."""
+
+    def test_counters_and_histograms_render(self):
+        """Test counters and cumulative histogram buckets in the text format."""
+        metrics = Metrics(prefix="test")
+        metrics.inc('messages_total')
+        metrics.inc('messages_total', 2)
+        metrics.inc('spam_hits_total', level="user")
+        metrics.observe('discord_request_seconds', 0.003, kind="dm")
+        metrics.observe('discord_request_seconds', 2.0, kind="dm")
+        text = metrics.render()
+
+        self.assertIn("# TYPE test_messages_total counter\ntest_messages_total 3\n", text)
+        self.assertIn('test_spam_hits_total{level="user"} 1\n', text)
+        self.assertIn('test_discord_request_seconds_bucket{kind="dm",le="0.0025"} 0\n', text)
+        self.assertIn('test_discord_request_seconds_bucket{kind="dm",le="0.005"} 1\n', text)
+        self.assertIn('test_discord_request_seconds_bucket{kind="dm",le="+Inf"} 2\n', text)
+        self.assertIn('test_discord_request_seconds_count{kind="dm"} 2\n', text)
+
+    def test_stage_timer(self):
+        """Test stage timers record into message_stage_seconds."""
+        metrics = Metrics(prefix="test")
+        for _ in range(3):
+            with metrics.stage('detection'):
+                pass
+        self.assertIn('test_message_stage_seconds_count{stage="detection"} 3\n', metrics.render())
+
+    def test_callbacks(self):
+        """Test gauges are read at render time and failing reads are skipped."""
+        metrics = Metrics(prefix="test")
+        depth = {'actions': 4}
+        metrics.register('queue_depth', "Queued items", lambda: dict(depth), label='queue')
+        metrics.register('broken', "Always fails", lambda: 1 / 0)
+        depth['actions'] = 7
+        text = metrics.render()
+        self.assertIn('test_queue_depth{queue="actions"} 7\n', text)
+        self.assertNotIn("test_broken", text)
+
+    def test_disabled_records_nothing(self):
+        """Test a disabled registry ignores every recording call."""
+        metrics = Metrics(prefix="test", enabled=False)
+        metrics.inc('messages_total')
+        with metrics.stage('detection'):
+            pass
+        self.assertEqual(metrics.counters, {})
+        self.assertEqual(metrics.histograms, {})
+
+    def test_label_escaping(self):
+        """Test quotes, backslashes and newlines in label values are escaped."""
+        self.assertEqual(format_labels((('name', 'a"b\\c\nd'),)), '{name="a\\"b\\\\c\\nd"}')
+
+
+class TestInstrumentation(unittest.IsolatedAsyncioTestCase):
+    """Test cases for metrics recorded by the scheduler and the bot."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.previous = os.getcwd()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.previous)
+        self.tmp.cleanup()
+
+    async def test_scheduler_records_requests(self):
+        """Test each REST attempt is timed and counted by result."""
+        metrics = Metrics(prefix="test")
+        scheduler = ActionScheduler(metrics=metrics)
+        rest = RestSimulator(latency=0.0, jitter=0.0)
+        await scheduler.run('delete', lambda: rest.call('delete'), target=1)
+        text = metrics.render()
+        self.assertIn('test_discord_requests_total{kind="delete",result="ok"} 1\n', text)
+        self.assertIn('test_discord_request_seconds_count{kind="delete"} 1\n', text)
+
+    async def test_guardify_stages(self):
+        """Test on_message records messages, flagged messages, stages and bytes written."""
+        from load_generator import create_bot
+        world = StubWorld(RestSimulator(latency=0.0, jitter=0.0))
+        with redirect_stdout(io.StringIO()):
+            bot = create_bot("guardify", world)
+            channel = next(iter(world.channels.values()))
+            await bot.on_message(world.message("have a great day", 10, channel))
+            await bot.on_message(world.message("you are a stupid worthless idiot", 11, channel))
+            await bot.deletion_queue.close()
+            await bot.log_outbox.close()
+            await bot.actions.close()
+
+        text = bot.metrics.render()
+        self.assertIn("guardify_messages_total 2\n", text)
+        self.assertIn("guardify_messages_flagged_total 1\n", text)
+        for stage in ("total", "spam_check", "detection", "evidence_write", "warning_write", "moderation"):
+            self.assertIn(f'guardify_message_stage_seconds_count{{stage="{stage}"}}', text)
+        self.assertIn('guardify_file_bytes_written_total{file="evidence_jsonl"}', text)
+        self.assertIn('guardify_queue_depth{queue="actions"} 0\n', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for live CPU and memory profiling
+"""
+
+import asyncio
+import os
+import pstats
+import tempfile
+import tracemalloc
+import unittest
+
+from profiler import LiveProfiler, MemoryProfiler, top_functions
+
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+
+class TestLiveProfiler(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the LiveProfiler class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.profiler = LiveProfiler(self.tmp.name, keep=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def traffic(self):
+        while True:
+            busy_work()
+            await asyncio.sleep(0.005)
+
+    async def test_profiles_concurrent_traffic(self):
+        """Test work done by other tasks during the session is profiled and dumped."""
+        task = asyncio.create_task(self.traffic())
+        try:
+            stats, path = await self.profiler.profile(0.2)
+        finally:
+            task.cancel()
+
+        rows = top_functions(stats, limit=50)
+        self.assertTrue(any(row["function"].endswith("(busy_work)") for row in rows))
+        self.assertEqual(rows, sorted(rows, key=lambda row: row["cumtime"], reverse=True))
+        self.assertIn("test_profiler.py", next(r["function"] for r in rows if "busy_work" in r["function"]))
+        self.assertTrue(pstats.Stats(path).stats)
+
+    async def test_one_session_at_a_time(self):
+        """Test a second session is refused while one is running."""
+        first = asyncio.create_task(self.profiler.profile(0.1))
+        await asyncio.sleep(0)
+        with self.assertRaises(RuntimeError):
+            await self.profiler.profile(0.1)
+        await first
+        self.assertFalse(self.profiler.running)
+
+    async def test_old_dumps_pruned(self):
+        """Test only the newest `keep` dumps are kept."""
+        for name in ("profile-20240101T000000Z.pstats", "profile-20240102T000000Z.pstats"):
+            open(os.path.join(self.tmp.name, name), 'w').close()
+        _, path = await self.profiler.profile(0.01)
+        remaining = sorted(os.listdir(self.tmp.name))
+        self.assertEqual(len(remaining), 2)
+        self.assertEqual(remaining[-1], os.path.basename(path))
+
+
+class TestMemoryProfiler(unittest.TestCase):
+    """Test cases for the MemoryProfiler class."""
+
+    def setUp(self):
+        self.cache = []
+        self.profiler = MemoryProfiler({'cache': lambda: len(self.cache), 'broken': lambda: 1 / 0})
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def grow(self):
+        self.cache.extend(f"entry {n}" * 10 for n in range(5000))
+
+    def test_diff_reports_growth(self):
+        """Test growth is attributed to the allocating line and growth points."""
+        self.profiler.start()
+        self.grow()
+        report = self.profiler.diff()
+
+        self.assertTrue(report["growth"][0]["site"].startswith("test_profiler.py:"))
+        self.assertGreater(report["growth"][0]["size_diff"], 100_000)
+        self.assertEqual(report["growth_points"]["cache"], {"entries": 5000, "change": 5000})
+        self.assertEqual(report["growth_points"]["broken"]["entries"], -1)
+
+    def test_requires_start_and_stops_tracing(self):
+        """Test diff needs a baseline and stop ends tracing it started."""
+        with self.assertRaises(RuntimeError):
+            self.profiler.diff()
+        self.profiler.start()
+        self.assertTrue(tracemalloc.is_tracing())
+        self.profiler.stop()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertFalse(self.profiler.running)
+
+
+if __name__ == '__main__':
+    unittest.main()
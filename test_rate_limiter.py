@@ -0,0 +1,120 @@
+"""
+Unit tests for the hierarchical token-bucket rate limiter
+"""
+
+import unittest
+from rate_limiter import HierarchicalRateLimiter, BucketTable, USER, CHANNEL, GUILD
+
+
+class TestHierarchicalRateLimiter(unittest.TestCase):
+    """Test cases for the HierarchicalRateLimiter class."""
+
+    def setUp(self):
+        """Set up a limiter allowing 5 messages per 5 seconds per user."""
+        self.limiter = HierarchicalRateLimiter(user=(5, 5.0))
+
+    def test_burst_within_limit(self):
+        """Test that a burst up to the capacity is allowed."""
+        for _ in range(5):
+            self.assertIsNone(self.limiter.hit(1, 10, 100, now=0.0))
+
+    def test_burst_over_limit(self):
+        """Test that the message after the burst is flagged at the user level."""
+        for _ in range(5):
+            self.limiter.hit(1, 10, 100, now=0.0)
+        self.assertEqual(self.limiter.hit(1, 10, 100, now=0.0), USER)
+
+    def test_lazy_refill(self):
+        """Test that tokens refill over time without timers."""
+        for _ in range(5):
+            self.limiter.hit(1, 10, 100, now=0.0)
+        self.assertEqual(self.limiter.hit(1, 10, 100, now=0.5), USER)
+        self.assertIsNone(self.limiter.hit(1, 10, 100, now=1.0))
+
+    def test_users_are_independent(self):
+        """Test that one user's bucket does not affect another user."""
+        for _ in range(5):
+            self.limiter.hit(1, 10, 100, now=0.0)
+        self.assertIsNone(self.limiter.hit(1, 10, 200, now=0.0))
+
+    def test_user_buckets_scoped_per_guild(self):
+        """Test that a user's messages in one guild do not count in another."""
+        for _ in range(5):
+            self.limiter.hit(1, 10, 100, now=0.0)
+        self.assertIsNone(self.limiter.hit(2, 20, 100, now=0.0))
+
+    def test_channel_level(self):
+        """Test that a channel limit catches floods spread across users."""
+        self.limiter.configure(1, CHANNEL, 3, 10.0)
+        for user_id in range(3):
+            self.assertIsNone(self.limiter.hit(1, 10, user_id, now=0.0))
+        self.assertEqual(self.limiter.hit(1, 10, 99, now=0.0), CHANNEL)
+        # Other channels are unaffected
+        self.assertIsNone(self.limiter.hit(1, 11, 99, now=0.0))
+
+    def test_guild_level(self):
+        """Test that a guild limit catches floods spread across channels."""
+        self.limiter.configure(1, GUILD, 2, 10.0)
+        self.limiter.hit(1, 10, 100, now=0.0)
+        self.limiter.hit(1, 11, 200, now=0.0)
+        self.assertEqual(self.limiter.hit(1, 12, 300, now=0.0), GUILD)
+
+    def test_rejected_message_does_not_drain_other_levels(self):
+        """Test that a message rejected at one level consumes no tokens."""
+        self.limiter.configure(1, GUILD, 1, 10.0)
+        self.limiter.hit(1, 10, 100, now=0.0)
+        for _ in range(10):
+            self.assertEqual(self.limiter.hit(1, 10, 200, now=0.0), GUILD)
+        self.limiter.configure(1, GUILD, None)
+        self.assertIsNone(self.limiter.hit(1, 10, 200, now=0.0))
+
+    def test_per_guild_configuration(self):
+        """Test that limits can be configured per guild."""
+        self.limiter.configure(1, USER, 2, 10.0)
+        self.assertEqual(self.limiter.limits(1)[USER], (2, 10.0))
+        self.assertEqual(self.limiter.limits(2)[USER], (5, 5.0))
+
+    def test_disable_level(self):
+        """Test that a level configured as None is not enforced."""
+        self.limiter.configure(1, USER, None)
+        for _ in range(50):
+            self.assertIsNone(self.limiter.hit(1, 10, 100, now=0.0))
+
+    def test_invalid_configuration(self):
+        """Test that invalid levels and limits are rejected."""
+        with self.assertRaises(ValueError):
+            self.limiter.configure(1, "role", 5, 10.0)
+        with self.assertRaises(ValueError):
+            self.limiter.configure(1, USER, 0, 10.0)
+
+    def test_sweep_drops_refilled_buckets(self):
+        """Test that refilled buckets are freed and their slots reused."""
+        for user_id in range(100):
+            self.limiter.hit(1, 10, user_id, now=0.0)
+        self.assertEqual(len(self.limiter), 100)
+        self.assertEqual(self.limiter.sweep(now=60.0), 100)
+        self.assertEqual(len(self.limiter), 0)
+
+
+class TestBucketTable(unittest.TestCase):
+    """Test cases for the compact BucketTable storage."""
+
+    def test_missing_bucket_is_full(self):
+        """Test that an untouched bucket reports full capacity."""
+        table = BucketTable()
+        self.assertEqual(table.tokens(1, (5, 5.0), 0.0), 5.0)
+        self.assertEqual(len(table), 0)
+
+    def test_slot_reuse(self):
+        """Test that swept slots are reused for new buckets."""
+        table = BucketTable()
+        table.consume(1, (5, 5.0), 0.0)
+        table.consume(2, (5, 5.0), 100.0)
+        table.sweep(50.0)
+        table.consume(3, (5, 5.0), 50.0)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(len(table._full_at), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
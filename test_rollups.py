@@ -0,0 +1,95 @@
+"""
+Unit tests for evidence time-series rollups
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from rollups import EvidenceRollups, rollup_keys, score_bin
+
+
+def record(hour, guild_id="1", severity="low", keywords=(), channel="general",
+           abuse_score=0.55, vader=-0.35, logged_at="2024-03-01T00:00:00+00:00"):
+    return {
+        "guild_id": guild_id,
+        "channel_name": channel,
+        "created_at": f"2024-01-01T{hour:02d}:30:00+00:00",
+        "logged_at": logged_at,
+        "analysis": {"severity": severity, "detected_keywords": list(keywords),
+                     "abuse_score": abuse_score, "vader_sentiment": vader}
+    }
+
+
+def at(text):
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+
+class TestRollups(unittest.TestCase):
+    """Test cases for the EvidenceRollups class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rollups = EvidenceRollups(os.path.join(self.tmp.name, "rollups.db"))
+
+    def tearDown(self):
+        self.rollups.close()
+        self.tmp.cleanup()
+
+    def test_score_bins(self):
+        """Test histogram bins are 0.1 wide and clamped."""
+        self.assertEqual(score_bin(0.55, 0.0, 2.0), "0.5")
+        self.assertEqual(score_bin(7.0, 0.0, 2.0), "2.0")
+        self.assertEqual(score_bin(-0.35, -1.0, 0.9), "-0.4")
+        self.assertEqual(score_bin(1.0, -1.0, 0.9), "0.9")
+        self.assertIsNone(score_bin(None, 0.0, 1.0))
+
+    def test_keys_cover_guild_and_all_guilds(self):
+        """Test one record updates its guild's and the all-guild rollups."""
+        keys = rollup_keys(record(5, keywords=("idiot", "idiot")))
+        scopes = {key[0] for key in keys}
+        self.assertEqual(scopes, {"1", "*"})
+        self.assertIn(("1", "hour", "keyword", 1704085200, "idiot"), keys)
+        self.assertEqual(len([k for k in keys if k[2] == "keyword"]), 4)  # Duplicates counted once
+        self.assertEqual(rollup_keys({"analysis": {}}), [])
+
+    def test_hourly_and_daily_series(self):
+        """Test counts land in the right buckets and gaps are zero-filled."""
+        self.rollups.add([record(1, severity="high"), record(1), record(3, guild_id="2")])
+
+        hourly = self.rollups.series("1", at("2024-01-01T00:00:00"), at("2024-01-01T03:00:00"))
+        self.assertEqual([point["counts"] for point in hourly], [{}, {"high": 1, "low": 1}, {}, {}])
+        self.assertEqual(hourly[1]["start"], "2024-01-01T01:00:00+00:00")
+
+        daily = self.rollups.series(None, at("2024-01-01T00:00:00"), at("2024-01-02T00:00:00"),
+                                    bucket="day", dimension="total")
+        self.assertEqual([point["counts"] for point in daily], [{"": 3}, {}])
+
+        channels = self.rollups.series("2", at("2024-01-01T00:00:00"), at("2024-01-01T00:00:00"),
+                                       bucket="day", dimension="channel")
+        self.assertEqual(channels[0]["counts"], {"general": 1})
+
+        with self.assertRaises(ValueError):
+            self.rollups.series("1", at("2024-01-01T00:00:00"), at("2024-01-02T00:00:00"), dimension="content")
+
+    def test_backfill_counts_only_older_records_once(self):
+        """Test backfill skips live records and never runs twice."""
+        log_path = os.path.join(self.tmp.name, "abuse_evidence.jsonl")
+        old = [record(1, logged_at="2024-01-01T01:30:00+00:00"), record(2, logged_at="2024-01-01T02:30:00+00:00")]
+        live = record(3, logged_at="2024-01-01T03:30:00+00:00")
+        with open(log_path, 'w') as f:
+            for r in old + [live]:
+                f.write(json.dumps(r) + "\n")
+            f.write("not json\n")
+        self.rollups.add([live])
+
+        self.assertEqual(self.rollups.backfill(log_path), 2)
+        self.assertEqual(self.rollups.backfill(log_path), 0)
+        daily = self.rollups.series("1", at("2024-01-01T00:00:00"), at("2024-01-01T00:00:00"),
+                                    bucket="day", dimension="total")
+        self.assertEqual(daily[0]["counts"], {"": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Unit tests for the shared stats snapshots
+"""
+
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from stats_snapshot import StatsSnapshots
+
+
+class TestStatsSnapshots(unittest.TestCase):
+    """Test cases for the StatsSnapshots class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "snapshots.db")
+        self.builds = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self):
+        self.builds += 1
+        return f"etag{self.builds}", f"body{self.builds}".encode()
+
+    def test_built_once_per_version(self):
+        """Test a version is built once and then read back."""
+        snapshots = StatsSnapshots(self.path)
+        self.assertEqual(snapshots.get_or_build("all", "v1", self.build), ("etag1", b"body1"))
+        self.assertEqual(snapshots.get_or_build("all", "v1", self.build), ("etag1", b"body1"))
+        self.assertEqual(self.builds, 1)
+
+        self.assertEqual(snapshots.get_or_build("all", "v2", self.build), ("etag2", b"body2"))
+        self.assertIsNone(snapshots.get("all", "v1"))  # Only the latest version is kept
+
+    def test_shared_between_workers(self):
+        """Test a second worker reads the first worker's snapshot instead of building."""
+        StatsSnapshots(self.path).get_or_build("guild:1", "v1", self.build)
+        other = StatsSnapshots(self.path)
+        self.assertEqual(other.get_or_build("guild:1", "v1", self.build), ("etag1", b"body1"))
+        self.assertEqual(self.builds, 1)
+
+    def test_first_stored_body_wins(self):
+        """Test a worker that built the same version concurrently serves the stored body."""
+        snapshots = StatsSnapshots(self.path)
+        other = StatsSnapshots(self.path)
+
+        def racing_build():
+            other.get_or_build("all", "v1", self.build)  # Finishes while this build runs
+            return "late", b"late body"
+
+        self.assertEqual(snapshots.get_or_build("all", "v1", racing_build), ("etag1", b"body1"))
+
+    def test_locked_database_serves_fresh_build(self):
+        """Test a write lock held elsewhere does not fail the request."""
+        snapshots = StatsSnapshots(self.path, busy_timeout=0.05)
+        snapshots.get_or_build("all", "v1", self.build)
+        blocker = sqlite3.connect(self.path, isolation_level=None)
+        blocker.execute("BEGIN EXCLUSIVE")
+        try:
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(snapshots.get_or_build("all", "v2", self.build), ("etag2", b"body2"))
+        finally:
+            blocker.execute("ROLLBACK")
+            blocker.close()
+        self.assertIsNone(snapshots.get("all", "v2"))
+
+    def test_oldest_keys_evicted(self):
+        """Test only the most recently built keys are kept."""
+        snapshots = StatsSnapshots(self.path, max_keys=2)
+        for key in ("a", "b", "c"):
+            snapshots.get_or_build(key, "v1", self.build)
+        snapshots.get_or_build("b", "v2", self.build)
+        snapshots.get_or_build("d", "v1", self.build)
+        self.assertIsNone(snapshots.get("a", "v1"))
+        self.assertIsNone(snapshots.get("c", "v1"))
+        self.assertIsNotNone(snapshots.get("b", "v2"))
+        self.assertIsNotNone(snapshots.get("d", "v1"))
+
+    def test_reconnects_after_fork(self):
+        """Test a connection inherited from another process is not reused."""
+        snapshots = StatsSnapshots(self.path)
+        snapshots.get_or_build("all", "v1", self.build)
+        first = snapshots._conn()
+        snapshots._pid = -1  # As seen from a forked child
+        self.assertIsNot(snapshots._conn(), first)
+        self.assertEqual(snapshots.get("all", "v1"), ("etag1", b"body1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
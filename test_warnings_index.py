@@ -0,0 +1,80 @@
+"""
+Unit tests for the dashboard warnings index
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from warnings_index import WarningsIndex
+
+
+class TestWarningsIndex(unittest.TestCase):
+    """Test cases for the WarningsIndex class."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "warnings.json")
+        self.index = WarningsIndex(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, warnings):
+        with open(self.path, 'w') as f:
+            json.dump(warnings, f)
+
+    @staticmethod
+    def warns(count, timestamp="2024-01-01T00:00:00"):
+        return [{"reason": "spam", "timestamp": timestamp}] * count
+
+    def test_missing_file(self):
+        """Test an empty view before any warning was issued."""
+        self.index.refresh()
+        self.assertEqual(self.index.top("1"), [])
+        self.assertEqual(self.index.page("1"), {"warnings": [], "total": 0})
+
+    def test_top_offenders_per_guild(self):
+        """Test ranking by count, then most recent warning."""
+        self.write({
+            "1:10": self.warns(1),
+            "1:11": self.warns(3),
+            "1:12": self.warns(1, "2024-02-01T00:00:00"),
+            "2:20": self.warns(5),
+            "1:13": []
+        })
+        self.assertTrue(self.index.refresh())
+        self.assertEqual([w["user_id"] for w in self.index.top("1")], ["11", "12", "10"])
+        self.assertEqual([w["user_id"] for w in self.index.top(None, 2)], ["20", "11"])
+        self.assertEqual(self.index.top("1")[0], {
+            "user_id": "11", "guild_id": "1", "count": 3, "last_warning": "2024-01-01T00:00:00"
+        })
+
+    def test_reload_only_when_changed(self):
+        """Test the file is parsed again only after it changes."""
+        self.write({"1:10": self.warns(1)})
+        self.assertTrue(self.index.refresh())
+        self.assertFalse(self.index.refresh())
+        self.write({"1:10": self.warns(2), "1:11": self.warns(1)})
+        self.assertTrue(self.index.refresh())
+        self.assertEqual(self.index.member("1", "10")["count"], 2)
+
+    def test_pages_beyond_top_k(self):
+        """Test pagination covers every member, not just the precomputed top."""
+        self.write({f"1:{user}": self.warns(user) for user in range(1, 26)})
+        self.index.refresh()
+        page = self.index.page("1", offset=20, limit=10)
+        self.assertEqual([w["count"] for w in page["warnings"]], [5, 4, 3, 2, 1])
+        self.assertEqual(page["total"], 25)
+        self.assertEqual(len(self.index.top("1", 15)), 15)
+
+    def test_malformed_keys_skipped(self):
+        """Test keys that are not "guild:user" are ignored instead of failing."""
+        self.write({"oops": self.warns(2), "1:10": self.warns(1)})
+        self.index.refresh()
+        self.assertEqual([w["user_id"] for w in self.index.top(None)], ["10"])
+        self.assertIsNone(self.index.member("1", "11"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,275 @@
+"""
+Unit tests for the web dashboard
+"""
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import web_dashboard
+from evidence_tail import EvidenceTail
+from live_feed import LiveFeed
+from rollups import EvidenceRollups
+from case_index import CaseIndex
+from warnings_index import WarningsIndex
+from stats_snapshot import StatsSnapshots
+
+
+class MockResponse:
+    """Minimal requests.Response stand-in."""
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return self.body
+
+
+class MockHTTP:
+    """Discord API stand-in that replays queued responses."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+GUILDS = [{"id": "1", "name": "Alpha"}, {"id": "2", "name": "Beta"}]
+
+
+class TestDashboard(unittest.TestCase):
+    """Test cases for guild access and the stats API."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_http = web_dashboard.discord_http
+        self.original_tail = web_dashboard.evidence_tail
+        web_dashboard.evidence_tail = EvidenceTail(os.path.join(self.tmp.name, "abuse_evidence.jsonl"))
+        self.original_logs = web_dashboard.LOGS_DIR
+        web_dashboard.LOGS_DIR = self.tmp.name
+        web_dashboard.guild_cache.clear()
+        web_dashboard.stats_cache.clear()
+        self.original_rollups = web_dashboard.rollups
+        web_dashboard.rollups = EvidenceRollups(os.path.join(self.tmp.name, "rollups.db"))
+        self.original_snapshots = web_dashboard.stats_snapshots
+        web_dashboard.stats_snapshots = StatsSnapshots(os.path.join(self.tmp.name, "stats_snapshots.db"))
+        self.original_warnings = web_dashboard.warnings_index
+        web_dashboard.warnings_index = WarningsIndex(os.path.join(self.tmp.name, "warnings.json"))
+        self.original_case_index = web_dashboard.case_index
+        web_dashboard.case_index = CaseIndex(web_dashboard.evidence_tail.path,
+                                             os.path.join(self.tmp.name, "case_index.db"))
+        self.client = web_dashboard.app.test_client()
+        with self.client.session_transaction() as sess:
+            sess['user'] = {"id": "42", "username": "mod"}
+            sess['access_token'] = "token"
+
+    def tearDown(self):
+        web_dashboard.discord_http = self.original_http
+        web_dashboard.evidence_tail = self.original_tail
+        web_dashboard.LOGS_DIR = self.original_logs
+        web_dashboard.rollups.close()
+        web_dashboard.rollups = self.original_rollups
+        web_dashboard.warnings_index = self.original_warnings
+        web_dashboard.stats_snapshots = self.original_snapshots
+        web_dashboard.case_index.close()
+        web_dashboard.case_index = self.original_case_index
+        self.tmp.cleanup()
+
+    def test_guild_list_cached(self):
+        """Test that repeated requests reuse the cached guild list."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/stats/1').status_code, 200)
+        self.assertEqual(web_dashboard.discord_http.calls, 1)
+
+    def test_access_denied_for_other_guilds(self):
+        """Test that guilds the user is not in are rejected."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        self.assertEqual(self.client.get('/api/stats/3').status_code, 403)
+        self.assertEqual(self.client.get('/api/stream/3').status_code, 403)
+        self.assertEqual(self.client.get('/api/stream').status_code, 403)
+        self.assertEqual(web_dashboard.app.test_client().get('/api/stream/1').status_code, 401)
+
+    def test_stream_limit(self):
+        """Test that streams over the per-worker limit are refused until one closes."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        feed = LiveFeed(web_dashboard.evidence_tail, os.path.join(self.tmp.name, "warnings.json"), poll_interval=60)
+        with mock.patch.object(web_dashboard, 'stream_slots', threading.BoundedSemaphore(1)), \
+                mock.patch.object(web_dashboard, 'live_feed', feed):
+            first = self.client.get('/api/stream/1')
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(self.client.get('/api/stream/1').status_code, 503)
+            first.close()
+            second = self.client.get('/api/stream/1')
+            self.assertEqual(second.status_code, 200)
+            second.close()
+
+    def test_short_rate_limit_retried(self):
+        """Test that a short 429 is waited out and retried once."""
+        web_dashboard.discord_http = MockHTTP(
+            MockResponse(429, headers={'Retry-After': '0'}),
+            MockResponse(200, GUILDS)
+        )
+        self.assertEqual(self.client.get('/api/stats/2').status_code, 200)
+        self.assertEqual(web_dashboard.discord_http.calls, 2)
+
+    def test_stale_list_served_while_rate_limited(self):
+        """Test that an expired list is reused while Discord asks us to wait."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        self.client.get('/api/stats/1')
+        for entry in web_dashboard.guild_cache.values():
+            entry['expires'] = 0
+        web_dashboard.discord_http = MockHTTP(MockResponse(429, headers={'Retry-After': '30'}))
+        self.assertEqual(self.client.get('/api/stats/1').status_code, 200)
+        self.assertEqual(self.client.get('/api/stats/1').status_code, 200)
+        self.assertEqual(web_dashboard.discord_http.calls, 1)
+
+    def write_cases(self, *guild_ids, mode='w'):
+        with open(web_dashboard.evidence_tail.path, mode) as f:
+            for guild_id in guild_ids:
+                f.write(json.dumps({"guild_id": guild_id, "author_id": "9", "content": "x" * 300,
+                                    "analysis": {"severity": "high", "vader_details": {"neg": 0.9}},
+                                    "logged_at": ""}) + "\n")
+
+    def test_stats_filtered_by_guild(self):
+        """Test that /api/stats/<guild_id> only counts that guild's cases."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        self.write_cases("1", "1", "2")
+        data = self.client.get('/api/stats/1').get_json()
+        self.assertEqual(data["stats"]["total_cases"], 2)
+        self.assertEqual(data["stats"]["severity_breakdown"]["high"], 2)
+
+
+    def test_conditional_get(self):
+        """Test ETag revalidation until the evidence log or warnings change."""
+        self.write_cases("1")
+        response = self.client.get('/api/stats')
+        etag = response.headers['ETag']
+        self.assertEqual(self.client.get('/api/stats', headers={'If-None-Match': etag}).status_code, 304)
+
+        self.write_cases("1", mode='a')
+        response = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["stats"]["total_cases"], 2)
+        etag = response.headers['ETag']
+
+        with open(os.path.join(self.tmp.name, "warnings.json"), 'w') as f:
+            json.dump({"1:9": [{"reason": "spam", "timestamp": "now"}]}, f)
+        response = self.client.get('/api/stats', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["warnings"][0]["count"], 1)
+
+    def test_gzip_and_field_projection(self):
+        """Test compressed responses and ?fields= trimming of recent cases."""
+        self.write_cases("1", "1", "1")
+        response = self.client.get('/api/stats', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        full = json.loads(gzip.decompress(response.data))
+        self.assertIn("vader_details", full["stats"]["recent_cases"][0]["analysis"])
+
+        data = self.client.get('/api/stats?fields=author_id,analysis.severity').get_json()
+        self.assertEqual(data["stats"]["recent_cases"][0], {"author_id": "9", "analysis": {"severity": "high"}})
+        self.assertEqual(data["stats"]["total_cases"], 3)
+        same = self.client.get('/api/stats?fields=analysis.severity,author_id,author_id').get_json()
+        self.assertEqual(same, data)
+        self.assertEqual(len(web_dashboard.stats_cache), 2)  # The reordered list shares an entry
+
+        self.assertEqual(self.client.get('/api/stats?fields=author_id,made_up').status_code, 400)
+        self.assertEqual(self.client.get('/api/stats?fields=analysis.made_up').status_code, 400)
+        self.assertEqual(len(web_dashboard.stats_cache), 2)
+
+
+    def test_timeseries(self):
+        """Test /api/timeseries answers a year of daily points from the rollups."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        web_dashboard.rollups.add([{"guild_id": "1", "created_at": web_dashboard.datetime.now(web_dashboard.timezone.utc).isoformat(),
+                                    "analysis": {"severity": "high"}}])
+        data = self.client.get('/api/timeseries/1?range=1y').get_json()
+        self.assertEqual(data["bucket"], "day")
+        self.assertEqual(len(data["points"]), 366)
+        self.assertEqual(data["points"][-1]["counts"], {"high": 1})
+
+        self.assertEqual(self.client.get('/api/timeseries/1?range=2y&bucket=hour').status_code, 400)
+        self.assertEqual(self.client.get('/api/timeseries/1?range=soon').status_code, 400)
+        self.assertEqual(self.client.get('/api/timeseries/3').status_code, 403)
+        self.assertEqual(self.client.get('/api/timeseries').status_code, 403)
+        self.assertEqual(web_dashboard.app.test_client().get('/api/timeseries/1').status_code, 401)
+
+
+    def test_case_browser_pages(self):
+        """Test /api/cases pages through one guild's cases with a cursor."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        self.write_cases("1", "2", "1", "1")
+        first = self.client.get('/api/cases/1?limit=2').get_json()
+        self.assertEqual(len(first["cases"]), 2)
+        second = self.client.get(f'/api/cases/1?limit=2&cursor={first["next_cursor"]}').get_json()
+        self.assertEqual(len(second["cases"]), 1)
+        self.assertIsNone(second["next_cursor"])
+
+        self.assertEqual(self.client.get('/api/cases/1?cursor=bogus').status_code, 400)
+        self.assertEqual(self.client.get('/api/cases/1?since=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/cases/3').status_code, 403)
+
+    def test_case_browser_requires_access(self):
+        """Test /api/cases needs a login, and all guilds at once only for dashboard admins."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        self.write_cases("1", "2")
+        self.assertEqual(self.client.get('/api/cases').status_code, 403)
+        with mock.patch.object(web_dashboard, 'DASHBOARD_ADMINS', {"42"}):
+            self.assertEqual(len(self.client.get('/api/cases').get_json()["cases"]), 2)
+
+        anonymous = web_dashboard.app.test_client()
+        self.assertEqual(anonymous.get('/api/cases').status_code, 401)
+        self.assertEqual(anonymous.get('/api/cases/1').status_code, 401)
+
+
+    def test_warnings_pages_and_member_lookup(self):
+        """Test /api/warnings pagination and per-member lookups."""
+        web_dashboard.discord_http = MockHTTP(MockResponse(200, GUILDS))
+        warnings = {f"1:{user}": [{"reason": "spam", "timestamp": "t"}] * user for user in range(1, 6)}
+        warnings["legacy-key"] = [{"reason": "old", "timestamp": "t"}]
+        with open(os.path.join(self.tmp.name, "warnings.json"), 'w') as f:
+            json.dump(warnings, f)
+
+        first = self.client.get('/api/warnings/1?limit=2').get_json()
+        self.assertEqual([w["user_id"] for w in first["warnings"]], ["5", "4"])
+        self.assertEqual((first["total"], first["next_offset"]), (5, 2))
+        last = self.client.get('/api/warnings/1?offset=4&limit=2').get_json()
+        self.assertEqual([w["user_id"] for w in last["warnings"]], ["1"])
+        self.assertIsNone(last["next_offset"])
+
+        member = self.client.get('/api/warnings/1/3').get_json()
+        self.assertEqual(member["count"], 3)
+        self.assertEqual(len(member["warnings"]), 3)
+        self.assertEqual(self.client.get('/api/warnings/1/9').status_code, 404)
+        self.assertEqual(self.client.get('/api/warnings/3').status_code, 403)
+        self.assertEqual(self.client.get('/api/warnings/3/1').status_code, 403)
+        self.assertEqual(self.client.get('/api/warnings').status_code, 403)
+
+        anonymous = web_dashboard.app.test_client()
+        self.assertEqual(anonymous.get('/api/warnings/1').status_code, 401)
+        self.assertEqual(anonymous.get('/api/warnings/1/3').status_code, 401)
+
+
+    def test_other_workers_serve_shared_snapshot(self):
+        """Test a worker with a cold cache answers from the shared snapshot without reading logs."""
+        self.write_cases("1", "2")
+        first = self.client.get('/api/stats')
+        web_dashboard.stats_cache.clear()
+        web_dashboard.evidence_tail = EvidenceTail(web_dashboard.evidence_tail.path)
+        second = self.client.get('/api/stats')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+        self.assertIsNone(web_dashboard.evidence_tail.inode)  # Never refreshed
+
+
+if __name__ == '__main__':
+    unittest.main()
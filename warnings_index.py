@@ -0,0 +1,115 @@
+"""
+Warnings Index
+In-memory view of warnings.json for the dashboard: per-guild top offenders,
+per-member lookups and pages, rebuilt only when the file changes.
+"""
+
+import heapq
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+ALL_GUILDS = '*'  # Index key ranking members across every guild
+TOP_K = 10  # Offenders precomputed per guild
+
+
+def rank(entry: Dict):
+    """Sort key: most warnings first, most recently warned first on ties."""
+    return (entry['count'], entry['last_warning'] or '', entry['user_id'])
+
+
+class WarningsIndex:
+    """
+    Cached warnings.json, reloaded when its inode, size or mtime changes.
+
+    The bot rewrites the whole file on every change (atomically in cluster
+    mode), so a changed stat signature is the cue to rebuild. A rebuild
+    groups members by guild and keeps each guild's top `TOP_K` with a heap;
+    full rankings for pagination are sorted on first use and cached until
+    the next rebuild.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.signature = None
+        self._members: Dict[str, Dict[str, Dict]] = {}  # guild_id -> user_id -> entry
+        self._top: Dict[str, List[Dict]] = {}
+        self._ranked: Dict[str, List[Dict]] = {}
+
+    def refresh(self) -> bool:
+        """Reload if the file changed. Returns True if it was reloaded."""
+        with self.lock:
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                signature = None
+            if signature == self.signature:
+                return False
+            warnings = {}
+            if signature is not None:
+                try:
+                    with open(self.path, 'r') as f:
+                        warnings = json.load(f)
+                except (OSError, ValueError):
+                    return False  # Mid-write outside cluster mode; keep the old view
+            self._build(warnings)
+            self.signature = signature
+            return True
+
+    def _build(self, warnings: Dict[str, List[Dict]]) -> None:
+        members: Dict[str, Dict[str, Dict]] = {ALL_GUILDS: {}}
+        for key, warns in warnings.items():
+            guild_id, sep, user_id = key.partition(':')
+            if not sep or not warns:
+                continue  # Not a "guild:user" key
+            entry = {
+                "user_id": user_id,
+                "guild_id": guild_id,
+                "count": len(warns),
+                "last_warning": warns[-1].get('timestamp'),
+                "warnings": warns
+            }
+            members.setdefault(guild_id, {})[user_id] = entry
+            members[ALL_GUILDS][key] = entry
+        self._members = members
+        self._top = {guild_id: heapq.nlargest(TOP_K, entries.values(), key=rank)
+                     for guild_id, entries in members.items()}
+        self._ranked = {}
+
+    @staticmethod
+    def _summary(entry: Dict) -> Dict:
+        return {field: entry[field] for field in ("user_id", "guild_id", "count", "last_warning")}
+
+    def top(self, guild_id: Optional[str] = None, limit: int = TOP_K) -> List[Dict]:
+        """Most-warned members of a guild (or of all guilds)."""
+        if limit > TOP_K:
+            return self.page(guild_id, 0, limit)['warnings']
+        with self.lock:
+            return [self._summary(e) for e in self._top.get(str(guild_id) if guild_id else ALL_GUILDS, [])[:limit]]
+
+    def page(self, guild_id: Optional[str] = None, offset: int = 0, limit: int = 50) -> Dict:
+        """
+        One page of a guild's members ranked by warnings.
+
+        Returns:
+            {"warnings": [...], "total": number of warned members}
+        """
+        key = str(guild_id) if guild_id else ALL_GUILDS
+        with self.lock:
+            ranked = self._ranked.get(key)
+            if ranked is None:
+                ranked = self._ranked[key] = sorted(self._members.get(key, {}).values(), key=rank, reverse=True)
+            return {
+                "warnings": [self._summary(e) for e in ranked[offset:offset + limit]],
+                "total": len(ranked)
+            }
+
+    def member(self, guild_id: str, user_id: str) -> Optional[Dict]:
+        """A member's warnings in a guild, or None if they have none."""
+        with self.lock:
+            entry = self._members.get(str(guild_id), {}).get(str(user_id))
+            return dict(entry) if entry else None
@@ -3,29 +3,124 @@ Guardify Web Dashboard
 Simple web interface for viewing bot statistics and logs
 """
 
-from flask import Flask, render_template, jsonify, session, redirect, url_for, request
+from flask import Flask, Response, render_template, jsonify, session, redirect, url_for, request
 import json
 import os
-from datetime import datetime
-from collections import Counter
+import gzip
+import hashlib
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from collections import Counter, OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
 from functools import wraps
+from evidence_tail import EvidenceTail
+from live_feed import LiveFeed
+from rollups import BUCKETS, DIMENSIONS, EvidenceRollups
+from case_index import CaseIndex
+from warnings_index import WarningsIndex
+from stats_snapshot import StatsSnapshots
+from content_store import ContentStore
 
-app = Flask(__name__)
-app.secret_key = os.urandom(24)  # For session management
+try:
+    import brotli
+except ImportError:  # Optional; gzip is used instead
+    brotli = None
 
-LOGS_DIR = "forensics_logs"
+app = Flask(__name__)
 
 # Load config
-with open('config.json', 'r') as f:
-    config = json.load(f)
-    DISCORD_CLIENT_ID = config.get('discord_client_id')
-    DISCORD_CLIENT_SECRET = config.get('discord_client_secret')
-    DASHBOARD_URL = config.get('dashboard_url', 'http://localhost:5000')
+config = {}
+if os.path.exists('config.json'):
+    with open('config.json', 'r') as f:
+        config = json.load(f)
+
+LOGS_DIR = os.environ.get('GUARDIFY_LOGS_DIR') or config.get('log_directory', 'forensics_logs')
+
+# Session signing key; must be the same in every worker process or logins break
+app.secret_key = os.environ.get('DASHBOARD_SECRET_KEY') or config.get('dashboard_secret_key')
+if not app.secret_key:
+    app.secret_key = os.urandom(24)
+    print("WARNING: No dashboard_secret_key configured; sessions only work with a single worker")
+
+STATIC_MAX_AGE = 86400  # Seconds browsers may reuse static files before revalidating
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+DISCORD_CLIENT_ID = config.get('discord_client_id')
+DISCORD_CLIENT_SECRET = config.get('discord_client_secret')
+DASHBOARD_URL = config.get('dashboard_url', 'http://localhost:5000')
+
+# Discord user IDs allowed to view every guild at once (e.g. /api/cases without a guild)
+DASHBOARD_ADMINS = {
+    str(user_id).strip()
+    for user_id in (os.environ.get('DASHBOARD_ADMINS', '').split(',') + config.get('dashboard_admins', []))
+    if str(user_id).strip()
+}
 
 DISCORD_API_BASE = 'https://discord.com/api/v10'
 OAUTH2_REDIRECT_URI = f'{DASHBOARD_URL}/callback'
 
+# Shared HTTP session for Discord API calls (connection pooling and keep-alive)
+discord_http = requests.Session()
+discord_http.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+GUILD_CACHE_TTL = 60  # Seconds a user's guild list is reused
+GUILD_CACHE_SIZE = 1000  # Logged-in users whose guild lists are cached
+MAX_RATE_LIMIT_WAIT = 1.0  # Longest a request waits out a Discord rate limit
+
+# sha256(access token) -> {"expires", "retry_at", "guilds", "by_id"}
+guild_cache = OrderedDict()
+guild_cache_lock = threading.Lock()
+
+# Message text of evidence records, stored once per distinct text by the bot (opened on first use)
+content_store = ContentStore(os.path.join(LOGS_DIR, "content.db"))
+
+# Running aggregates over the evidence log, shared by all requests
+evidence_tail = EvidenceTail(os.path.join(LOGS_DIR, "abuse_evidence.jsonl"), content_store=content_store)
+
+# Parsed warnings.json, reloaded only when the file changes
+warnings_index = WarningsIndex(os.path.join(LOGS_DIR, "warnings.json"))
+
+# Pushes new cases, counters and warning changes to open dashboards
+live_feed = LiveFeed(evidence_tail, os.path.join(LOGS_DIR, "warnings.json"))
+
+# Each open stream holds a server thread for its whole life; cap them so other requests
+# keep the rest (half of gunicorn.conf.py's threads unless DASHBOARD_MAX_STREAMS is set)
+MAX_STREAMS = int(os.environ.get('DASHBOARD_MAX_STREAMS') or max(1, int(os.environ.get('DASHBOARD_THREADS', 16)) // 2))
+stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+# Hourly/daily counts written by the bot, for trend charts (opened on first use)
+rollups = None
+rollups_lock = threading.Lock()
+
+# Keyset-paginated index of the evidence log for the case browser (opened on first use)
+case_index = None
+case_index_lock = threading.Lock()
+
+RANGE_UNITS = {'h': 3600, 'd': 86400, 'w': 7 * 86400, 'y': 365 * 86400}
+MAX_TIMESERIES_POINTS = 10000  # e.g. just over a year of hourly buckets
+
+# Serialized /api/stats bodies shared by all worker processes
+stats_snapshots = StatsSnapshots(os.path.join(LOGS_DIR, "stats_snapshots.db"))
+
+# Names ?fields= may select from each recent case; "analysis.<name>" selects a nested one
+CASE_FIELDS = frozenset({
+    'message_id', 'author_id', 'author_name', 'channel_id', 'channel_name', 'guild_id',
+    'guild_name', 'content', 'created_at', 'analysis', 'logged_at', 'evidence_hash'
+})
+ANALYSIS_FIELDS = frozenset({
+    'is_abusive', 'abuse_score', 'textblob_sentiment', 'vader_sentiment', 'combined_sentiment',
+    'vader_details', 'detected_keywords', 'severity', 'prevention_tip', 'timestamp', 'content_hash'
+})
+
+STATS_CACHE_SIZE = 256  # Serialized /api/stats bodies kept (per guild and field list)
+MIN_COMPRESS_SIZE = 512  # Smaller bodies are sent uncompressed
+
+# (guild_id, fields) -> {"version", "etag", "body", encoding: compressed body}
+stats_cache = OrderedDict()
+stats_cache_lock = threading.Lock()
+
 
 def login_required(f):
     """Decorator to require Discord login."""
@@ -37,96 +132,233 @@ def login_required(f):
     return decorated_function
 
 
-def get_user_guilds():
-    """Get guilds the logged-in user is in."""
-    if 'access_token' not in session:
-        return []
+def rate_limit_delay(response):
+    """Seconds until Discord accepts requests on this route again, or 0."""
+    if response.status_code == 429:
+        for header in ('Retry-After', 'X-RateLimit-Reset-After'):
+            try:
+                return float(response.headers[header])
+            except (KeyError, ValueError):
+                continue
+        return 1.0
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        try:
+            return float(response.headers.get('X-RateLimit-Reset-After', 0))
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def fetch_user_guilds(access_token):
+    """
+    Fetch a user's guilds from Discord.
     
+    Returns:
+        (guild list or None on failure, seconds to wait before the next call)
+    """
     headers = {
-        'Authorization': f"Bearer {session['access_token']}"
+        'Authorization': f"Bearer {access_token}"
     }
     
-    response = requests.get(f'{DISCORD_API_BASE}/users/@me/guilds', headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    return []
+    for attempt in range(2):
+        try:
+            response = discord_http.get(f'{DISCORD_API_BASE}/users/@me/guilds', headers=headers, timeout=10)
+        except requests.RequestException:
+            return None, 0.0
+        delay = rate_limit_delay(response)
+        if response.status_code == 200:
+            return response.json(), delay
+        if response.status_code != 429 or delay > MAX_RATE_LIMIT_WAIT or attempt:
+            return None, delay
+        time.sleep(delay)
+    return None, 0.0
 
 
-def get_statistics(guild_id=None):
-    """Get bot statistics from logs."""
-    log_file = os.path.join(LOGS_DIR, "abuse_evidence.jsonl")
-    
-    if not os.path.exists(log_file):
-        return {
-            "total_cases": 0,
-            "severity_breakdown": {"low": 0, "medium": 0, "high": 0},
-            "unique_users": 0,
-            "unique_guilds": 0,
-            "recent_cases": []
-        }
-    
-    cases = []
-    users = set()
-    guilds = set()
-    severity_count = {"low": 0, "medium": 0, "high": 0}
+def guild_cache_key(access_token):
+    """Cache key for a user's guild list (the token itself is not kept in memory)."""
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+def cached_guilds():
+    """Cache entry for the logged-in user's guilds, refreshed when older than GUILD_CACHE_TTL."""
+    if 'access_token' not in session:
+        return None
     
-    with open(log_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                record = json.loads(line)
-                
-                # Filter by guild if specified
-                if guild_id and str(record.get('guild_id')) != str(guild_id):
-                    continue
-                
-                cases.append(record)
-                users.add(record.get('author_id'))
-                if record.get('guild_id'):
-                    guilds.add(record.get('guild_id'))
-                
-                severity = record.get('analysis', {}).get('severity', 'low')
-                severity_count[severity] += 1
-            except:
-                continue
+    key = guild_cache_key(session['access_token'])
+    now = time.monotonic()
+    with guild_cache_lock:
+        entry = guild_cache.get(key)
+        if entry is not None:
+            guild_cache.move_to_end(key)
+            if now < entry['expires'] or now < entry['retry_at']:
+                return entry  # Fresh, or stale but Discord asked us to wait
     
-    # Get 10 most recent cases
-    recent_cases = sorted(cases, key=lambda x: x.get('logged_at', ''), reverse=True)[:10]
+    guilds, delay = fetch_user_guilds(session['access_token'])
+    with guild_cache_lock:
+        if guilds is None:
+            if entry is not None:
+                entry['retry_at'] = now + delay
+            return entry
+        entry = {
+            'expires': now + GUILD_CACHE_TTL,
+            'retry_at': now + delay,
+            'guilds': guilds,
+            'by_id': {str(g['id']): g for g in guilds}
+        }
+        guild_cache[key] = entry
+        guild_cache.move_to_end(key)
+        while len(guild_cache) > GUILD_CACHE_SIZE:
+            guild_cache.popitem(last=False)
+    return entry
+
+
+def get_user_guilds():
+    """Get guilds the logged-in user is in."""
+    entry = cached_guilds()
+    return entry['guilds'] if entry else []
+
+
+def get_user_guild(guild_id):
+    """Get one of the logged-in user's guilds, or None if they are not in it."""
+    entry = cached_guilds()
+    return entry['by_id'].get(str(guild_id)) if entry else None
+
+
+def guild_access_error(guild_id):
+    """
+    Check the logged-in user may read `guild_id` (None: every guild, admins only).
     
-    return {
-        "total_cases": len(cases),
-        "severity_breakdown": severity_count,
-        "unique_users": len(users),
-        "unique_guilds": len(guilds),
-        "recent_cases": recent_cases
-    }
+    Returns:
+        An error response for the API endpoint to return, or None if allowed
+    """
+    user = session.get('user')
+    if user is None:
+        return jsonify({"error": "Login required"}), 401
+    if guild_id is None:
+        if str(user.get('id')) not in DASHBOARD_ADMINS:
+            return jsonify({"error": "Access denied"}), 403
+    elif get_user_guild(guild_id) is None:
+        return jsonify({"error": "Access denied"}), 403
+    return None
 
 
-def get_warnings(guild_id=None):
-    """Get warning statistics."""
-    warnings_file = os.path.join(LOGS_DIR, "warnings.json")
+def get_statistics(guild_id=None):
+    """Get bot statistics from logs (only records added since the last call are read)."""
+    evidence_tail.refresh()
+    return evidence_tail.statistics(guild_id)
+
+
+def get_warnings(guild_id=None, limit=10):
+    """Get the most-warned members (of one guild, or of all guilds)."""
+    warnings_index.refresh()
+    return warnings_index.top(guild_id, limit)
+
+
+def file_signature(path):
+    """(inode, size, mtime) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def stats_version():
+    """Cheap token (two stat calls) that changes whenever the evidence log or warnings change."""
+    return (file_signature(evidence_tail.path), file_signature(warnings_index.path))
+
+
+def project(record, fields):
+    """Keep only `fields` of a case record; "analysis.severity" selects a nested field."""
+    projected = {}
+    for field in fields:
+        name, _, sub = field.partition('.')
+        if name not in record:
+            continue
+        if sub:
+            if isinstance(record[name], dict) and sub in record[name]:
+                projected.setdefault(name, {})[sub] = record[name][sub]
+        else:
+            projected[name] = record[name]
+    return projected
+
+
+def stats_body(guild_id, fields):
+    """
+    Serialized /api/stats payload, cached until the data changes.
     
-    if not os.path.exists(warnings_file):
-        return []
+    Looks in this process's cache, then in the snapshots shared with the
+    other workers; only if neither has the current version are the logs read.
     
-    with open(warnings_file, 'r') as f:
-        warnings = json.load(f)
+    Returns:
+        The cache entry: {"version", "etag", "body"} plus compressed bodies
+    """
+    key = (guild_id, fields)
+    version = stats_version()
+    with stats_cache_lock:
+        entry = stats_cache.get(key)
+        if entry is not None and entry['version'] == version:
+            stats_cache.move_to_end(key)
+            return entry
     
-    warning_list = []
-    for key, warns in warnings.items():
-        g_id, user_id = key.split(':')
-        
-        # Filter by guild if specified
-        if guild_id and str(g_id) != str(guild_id):
-            continue
-        
-        warning_list.append({
-            "user_id": user_id,
-            "guild_id": g_id,
-            "count": len(warns),
-            "last_warning": warns[-1]['timestamp'] if warns else None
-        })
+    def build():
+        stats = get_statistics(guild_id)
+        if fields:
+            stats['recent_cases'] = [project(case, fields) for case in stats['recent_cases']]
+        body = json.dumps({
+            "stats": stats,
+            "warnings": get_warnings(guild_id)  # Top 10 warned users
+        }, separators=(',', ':')).encode()
+        return hashlib.sha256(repr((version, key)).encode()).hexdigest()[:32], body
     
-    return sorted(warning_list, key=lambda x: x['count'], reverse=True)
+    etag, body = stats_snapshots.get_or_build(json.dumps(key), repr(version), build)
+    entry = {"version": version, "etag": etag, "body": body}
+    
+    with stats_cache_lock:
+        stats_cache[key] = entry
+        stats_cache.move_to_end(key)
+        while len(stats_cache) > STATS_CACHE_SIZE:
+            stats_cache.popitem(last=False)
+    return entry
+
+
+def compressed(entry, accept_encodings):
+    """Pick the best encoding the client accepts and return (encoding, body)."""
+    body = entry['body']
+    if len(body) < MIN_COMPRESS_SIZE:
+        return None, body
+    if brotli is not None and accept_encodings['br']:
+        encoding = 'br'
+    elif accept_encodings['gzip']:
+        encoding = 'gzip'
+    else:
+        return None, body
+    if encoding not in entry:
+        # Racing requests may both compress; either result is correct
+        if encoding == 'br':
+            entry[encoding] = brotli.compress(body)
+        else:
+            entry[encoding] = gzip.compress(body, compresslevel=6)
+    return encoding, entry[encoding]
+
+
+def get_rollups():
+    """The rollup database, opened on first use."""
+    global rollups
+    with rollups_lock:
+        if rollups is None:
+            rollups = EvidenceRollups(os.path.join(LOGS_DIR, "rollups.db"))
+        return rollups
+
+
+def get_case_index():
+    """The case index, opened on first use."""
+    global case_index
+    with case_index_lock:
+        if case_index is None:
+            case_index = CaseIndex(os.path.join(LOGS_DIR, "abuse_evidence.jsonl"),
+                                   os.path.join(LOGS_DIR, "case_index.db"), content_store=content_store)
+        return case_index
 
 
 @app.route('/')
@@ -170,7 +402,7 @@ def callback():
         'Content-Type': 'application/x-www-form-urlencoded'
     }
     
-    response = requests.post(f'{DISCORD_API_BASE}/oauth2/token', data=data, headers=headers)
+    response = discord_http.post(f'{DISCORD_API_BASE}/oauth2/token', data=data, headers=headers, timeout=10)
     
     if response.status_code != 200:
         return redirect(url_for('index'))
@@ -183,7 +415,7 @@ def callback():
         'Authorization': f"Bearer {token_data['access_token']}"
     }
     
-    user_response = requests.get(f'{DISCORD_API_BASE}/users/@me', headers=headers)
+    user_response = discord_http.get(f'{DISCORD_API_BASE}/users/@me', headers=headers, timeout=10)
     
     if user_response.status_code == 200:
         session['user'] = user_response.json()
@@ -194,6 +426,9 @@ def callback():
 @app.route('/logout')
 def logout():
     """Logout user."""
+    if 'access_token' in session:
+        with guild_cache_lock:
+            guild_cache.pop(guild_cache_key(session['access_token']), None)
     session.clear()
     return redirect(url_for('index'))
 
@@ -213,14 +448,12 @@ def dashboard(guild_id=None):
     """Main dashboard page."""
     if guild_id:
         # Verify user has access to this guild
-        user_guilds = get_user_guilds()
-        guild_ids = [str(g['id']) for g in user_guilds]
+        guild = get_user_guild(guild_id)
         
-        if str(guild_id) not in guild_ids:
+        if guild is None:
             return "Access denied", 403
         
-        # Get guild name
-        guild_name = next((g['name'] for g in user_guilds if str(g['id']) == str(guild_id)), 'Unknown')
+        guild_name = guild.get('name', 'Unknown')
         return render_template('dashboard_new.html', guild_id=guild_id, guild_name=guild_name, user=session.get('user'))
     
     return render_template('dashboard_new.html', user=session.get('user'))
@@ -232,22 +465,160 @@ def api_stats(guild_id=None):
     """API endpoint for statistics."""
     # If guild_id provided and user logged in, verify access
     if guild_id and 'user' in session:
-        user_guilds = get_user_guilds()
-        guild_ids = [str(g['id']) for g in user_guilds]
-        
-        if str(guild_id) not in guild_ids:
+        if get_user_guild(guild_id) is None:
             return jsonify({"error": "Access denied"}), 403
     
-    stats = get_statistics(guild_id)
-    warnings = get_warnings(guild_id)
+    # ?fields=author_name,content,analysis.severity trims each recent case
+    fields = request.args.get('fields')
+    fields = tuple(sorted({f.strip() for f in fields.split(',') if f.strip()})) if fields else None
+    if fields:
+        unknown = [f for f in fields if f not in CASE_FIELDS and not (
+            f.startswith('analysis.') and f[len('analysis.'):] in ANALYSIS_FIELDS)]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+    
+    entry = stats_body(guild_id, fields)
+    headers = {
+        'ETag': f'W/"{entry["etag"]}"',
+        'Cache-Control': 'private, no-cache',
+        'Vary': 'Accept-Encoding, Cookie'
+    }
+    if request.if_none_match.contains_weak(entry['etag']):
+        return Response(status=304, headers=headers)
+    
+    encoding, body = compressed(entry, request.accept_encodings)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(body, mimetype='application/json', headers=headers)
+
+
+@app.route('/api/timeseries')
+@app.route('/api/timeseries/<guild_id>')
+def api_timeseries(guild_id=None):
+    """
+    Case counts over time from the rollup tables.
+    
+    Query parameters: range (e.g. 24h, 30d, 1y; default 7d), bucket (hour or
+    day; default hour up to 2 days, day beyond) and dimension (default severity).
+    """
+    error = guild_access_error(guild_id)
+    if error:
+        return error
     
+    match = re.fullmatch(r'(\d+)([hdwy])', request.args.get('range', '7d'))
+    if not match or int(match.group(1)) == 0:
+        return jsonify({"error": "range must look like 24h, 30d, 12w or 1y"}), 400
+    seconds = int(match.group(1)) * RANGE_UNITS[match.group(2)]
+    bucket = request.args.get('bucket', 'hour' if seconds <= 2 * 86400 else 'day')
+    dimension = request.args.get('dimension', 'severity')
+    if bucket not in BUCKETS:
+        return jsonify({"error": f"bucket must be one of: {', '.join(BUCKETS)}"}), 400
+    if dimension not in DIMENSIONS:
+        return jsonify({"error": f"dimension must be one of: {', '.join(DIMENSIONS)}"}), 400
+    if seconds // BUCKETS[bucket] > MAX_TIMESERIES_POINTS:
+        return jsonify({"error": "Too many points; use a larger bucket"}), 400
+    
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(seconds=seconds)
     return jsonify({
-        "stats": stats,
-        "warnings": warnings[:10]  # Top 10 warned users
+        "guild_id": guild_id,
+        "bucket": bucket,
+        "dimension": dimension,
+        "points": get_rollups().series(guild_id, start, end, bucket, dimension)
     })
 
 
+@app.route('/api/cases')
+@app.route('/api/cases/<guild_id>')
+def api_cases(guild_id=None):
+    """
+    Browse cases newest first, one page at a time.
+    
+    Query parameters: cursor (from the previous page's next_cursor), limit
+    (default 50, max 200), severity, user, channel, since and until (ISO dates or
+    times; an until date includes that day).
+    """
+    error = guild_access_error(guild_id)
+    if error:
+        return error
+    
+    args = request.args
+    try:
+        for bound in ('since', 'until'):
+            if args.get(bound):
+                datetime.fromisoformat(args[bound])
+        index = get_case_index()
+        index.refresh()
+        page = index.page(
+            guild_id,
+            cursor=args.get('cursor'),
+            limit=args.get('limit', 50, type=int),
+            since=args.get('since'),
+            until=args.get('until'),
+            severity=args.get('severity'),
+            user=args.get('user'),
+            channel=args.get('channel')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify(page)
+
+
+@app.route('/api/warnings')
+@app.route('/api/warnings/<guild_id>')
+def api_warnings(guild_id=None):
+    """Warned members ranked by warning count (query parameters: offset, limit up to 200)."""
+    error = guild_access_error(guild_id)
+    if error:
+        return error
+    
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    warnings_index.refresh()
+    page = warnings_index.page(guild_id, offset, limit)
+    page["next_offset"] = offset + limit if offset + limit < page["total"] else None
+    return jsonify(page)
+
+
+@app.route('/api/warnings/<guild_id>/<user_id>')
+def api_member_warnings(guild_id, user_id):
+    """One member's warnings in a guild."""
+    error = guild_access_error(guild_id)
+    if error:
+        return error
+    
+    warnings_index.refresh()
+    member = warnings_index.member(guild_id, user_id)
+    if member is None:
+        return jsonify({"error": "No warnings"}), 404
+    return jsonify(member)
+
+
+@app.route('/api/stream')
+@app.route('/api/stream/<guild_id>')
+def api_stream(guild_id=None):
+    """Server-sent events with live updates (new cases, counters, warning changes)."""
+    error = guild_access_error(guild_id)
+    if error:
+        return error
+    
+    if not stream_slots.acquire(blocking=False):
+        return jsonify({'error': 'Too many live feeds open on this worker'}), 503  # The page polls instead
+    
+    live_feed.start()
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    response = Response(
+        live_feed.stream(guild_id, last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    response.call_on_close(stream_slots.release)
+    return response
+
+
 if __name__ == '__main__':
-    # Create templates folder
+    # Development server; use wsgi.py (gunicorn) in production
     os.makedirs('templates', exist_ok=True)
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(debug=os.environ.get('DASHBOARD_DEBUG') == '1', threaded=True, host='0.0.0.0', port=5000)
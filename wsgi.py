@@ -0,0 +1,12 @@
+"""
+Guardify Web Dashboard - Production Entry Point
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Set DASHBOARD_SECRET_KEY (or dashboard_secret_key in config.json) so every
+worker signs sessions with the same key.
+"""
+
+from web_dashboard import app
+
+application = app  # Name some WSGI servers look for